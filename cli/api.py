@@ -1,21 +1,23 @@
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import aiohttp
 
-from cli.constants import DEFAULT_TIMEOUTS
+from cli.constants import DEFAULT_TIMEOUTS, JOB_STATUS_BATCH_SIZE
 from cli.ui import SimpleUI
 
 
 class APIClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, connections: int = 5):
         self.base_url = base_url.rstrip("/")
+        self.connections = connections
         self._session = None
 
     async def __aenter__(self):
+        # Connections are kept alive and reused by the requests of a session
         self._session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=30),
-            connector=aiohttp.TCPConnector(limit_per_host=5, force_close=True),
+            connector=aiohttp.TCPConnector(limit_per_host=self.connections),
         )
         return self
 
@@ -38,7 +40,9 @@ class APIClient:
                     return await response.text()
                 return await response.read()
         except aiohttp.ClientResponseError as e:
-            SimpleUI.show_error(f"Error HTTP {e.status}: {e.message}")
+            # 429 is the admission control of the API, retried by the caller
+            if e.status != 429:
+                SimpleUI.show_error(f"Error HTTP {e.status}: {e.message}")
             raise
         except asyncio.TimeoutError:
             SimpleUI.show_error("Tiempo de espera agotado")
@@ -63,5 +67,17 @@ class APIClient:
     async def get_job_status(self, job_id: str) -> Dict:
         return await self._request("GET", f"job-status/{job_id}")
 
+    async def get_job_statuses(self, job_ids: List[str]) -> Dict:
+        statuses = {"jobs": {}, "missing": []}
+        for start in range(0, len(job_ids), JOB_STATUS_BATCH_SIZE):
+            result = await self._request(
+                "POST",
+                "job-status:batch",
+                json={"job_ids": job_ids[start : start + JOB_STATUS_BATCH_SIZE]},
+            )
+            statuses["jobs"].update(result["jobs"])
+            statuses["missing"].extend(result["missing"])
+        return statuses
+
     async def download_report(self, job_id: str) -> bytes:
         return await self._request("GET", f"job-result/{job_id}")
@@ -0,0 +1,230 @@
+import asyncio
+import csv
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import yaml
+from rich.live import Live
+from rich.table import Table
+
+from cli.api import APIClient
+from cli.constants import DEFAULT_RETRY_AFTER, DEFAULT_TIMEOUTS
+from cli.ui import SimpleUI, console
+
+NUMERIC_FIELDS = ("Mw", "h", "lat0", "lon0")
+FINAL_STATUSES = ("completed", "failed", "error")
+STATUS_LABELS = {
+    "pending": "Pendiente",
+    "waiting": "En espera",
+    "queued": "Queued",
+    "running": "Ejecutándose",
+    "completed": "Completa",
+    "failed": "Fallida",
+    "error": "Error",
+}
+
+
+def load_scenarios(path: Path) -> List[Dict]:
+    """
+    Read the scenarios of a batch from a CSV file with a header row or a YAML
+    list of mappings (or a mapping with a "scenarios" list). Each scenario has
+    the fields of /calculate plus an optional "name" and any /run-tsdhn option.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(f))
+        elif path.suffix.lower() in (".yaml", ".yml"):
+            # Every value as text, like CSV: YAML 1.1 reads 0030 as octal
+            rows = yaml.load(f, Loader=yaml.BaseLoader) or []
+            if isinstance(rows, dict):
+                rows = rows.get("scenarios", [])
+        else:
+            raise ValueError(f"Formato no soportado: {path.suffix} (use CSV o YAML)")
+
+    scenarios = []
+    for i, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise ValueError(f"Escenario {i}: se esperaba un objeto")
+        scenario = {k: v for k, v in row.items() if v not in (None, "")}
+        try:
+            for field in NUMERIC_FIELDS:
+                scenario[field] = float(scenario[field])
+        except KeyError as e:
+            raise ValueError(f"Escenario {i}: falta el campo {e}") from e
+        except ValueError as e:
+            raise ValueError(f"Escenario {i}: {e}") from e
+        scenario["name"] = str(scenario.get("name", f"escenario_{i:03d}"))
+        scenarios.append(scenario)
+    return scenarios
+
+
+class BatchRunner:
+    """
+    Non-interactive run of many scenarios: each one is submitted to /assess
+    with run_tsdhn, at most `concurrency` requests at a time over a single
+    keep-alive session, every job is followed in one table with
+    /job-status:batch and the reports are downloaded as the jobs finish.
+    """
+
+    def __init__(self, config: Dict, scenarios: List[Dict], concurrency: int):
+        self.config = config
+        self.concurrency = concurrency
+        self.rows = [
+            {"scenario": scenario, "status": "pending", "job_id": None}
+            for scenario in scenarios
+        ]
+        self.start_time = time.time()
+        self._submissions = asyncio.Semaphore(concurrency)
+        self._downloads = asyncio.Semaphore(concurrency)
+
+    async def run(self) -> List[Dict]:
+        async with APIClient(self.config["base_url"], self.concurrency) as client:
+            if not await client.check_connection():
+                SimpleUI.show_error("Conexión a la API: Fallida")
+                return self.rows
+
+            intervalo = self.config.get("check_interval", 60)
+            submissions = asyncio.gather(
+                *(self._submit(client, row) for row in self.rows)
+            )
+            downloads = []
+            last_api_check = time.time()
+            with Live(self._table(), refresh_per_second=4, console=console) as live:
+                while not (
+                    submissions.done()
+                    and all(row["status"] in FINAL_STATUSES for row in self.rows)
+                    and all(task.done() for task in downloads)
+                ):
+                    now = time.time()
+                    if now - last_api_check >= intervalo:
+                        for row in await self._poll(client):
+                            downloads.append(
+                                asyncio.create_task(self._download(client, row))
+                            )
+                        last_api_check = now
+                    live.update(self._table())
+                    await asyncio.sleep(1)
+                live.update(self._table())
+            await submissions
+        return self.rows
+
+    async def _submit(self, client: APIClient, row: Dict) -> None:
+        scenario = row["scenario"]
+        payload = {k: v for k, v in scenario.items() if k != "name"}
+        payload.setdefault("skip_steps", self.config.get("skip_steps", []))
+        payload["run_tsdhn"] = True
+        while True:
+            async with self._submissions:
+                try:
+                    result = await client.call_endpoint(
+                        "assess", payload, timeout=DEFAULT_TIMEOUTS["assess"]
+                    )
+                    break
+                except aiohttp.ClientResponseError as e:
+                    if e.status != 429:
+                        row.update(status="error", error=f"HTTP {e.status}")
+                        return
+                    retry_after = (e.headers or {}).get("Retry-After")
+                except Exception as e:
+                    row.update(status="error", error=str(e) or type(e).__name__)
+                    return
+            # Admission control: queue full or too many jobs of this client,
+            # retry when the API suggests. The wait does not hold a slot, so
+            # the other scenarios keep being submitted
+            row["status"] = "waiting"
+            await asyncio.sleep(
+                int(retry_after) if retry_after else DEFAULT_RETRY_AFTER
+            )
+
+        job = result.get("job") or {}
+        if not job.get("job_id"):
+            row.update(status="error", error="La API no encoló la simulación")
+            return
+        row.update(
+            status="queued",
+            job_id=job.get("job_id"),
+            resolution=job.get("resolution"),
+            submitted=time.time(),
+        )
+
+    async def _poll(self, client: APIClient) -> List[Dict]:
+        """Update the status of the active jobs, return the completed ones."""
+        active = {
+            row["job_id"]: row
+            for row in self.rows
+            if row["job_id"] and row["status"] not in FINAL_STATUSES
+        }
+        if not active:
+            return []
+        try:
+            statuses = await client.get_job_statuses(list(active))
+        except Exception:
+            return []
+
+        completed = []
+        for job_id, row in active.items():
+            if job_id in statuses["missing"]:
+                row.update(status="error", error="Trabajo no encontrado")
+                continue
+            estado = statuses["jobs"].get(job_id, {})
+            row["status"] = estado.get("status", row["status"])
+            row["resolution"] = estado.get("resolution") or row.get("resolution")
+            if row["status"] in FINAL_STATUSES:
+                row["finished"] = time.time()
+                row["error"] = estado.get("error")
+            if row["status"] == "completed" and self.config.get("save_results", True):
+                completed.append(row)
+        return completed
+
+    async def _download(self, client: APIClient, row: Dict) -> None:
+        async with self._downloads:
+            try:
+                datos = await client.download_report(row["job_id"])
+                nombre = Path(f"informe_tsunami_{row['job_id']}.pdf")
+                nombre.write_bytes(datos)
+                row["report"] = str(nombre)
+            except Exception as e:
+                row["error"] = f"Error al descargar informe: {e}"
+
+    def _table(self) -> Table:
+        elapsed = timedelta(seconds=int(time.time() - self.start_time))
+        table = Table(title=f"Lote de simulaciones - {elapsed}", title_justify="left")
+        for column in ("Escenario", "Estado", "Resolución", "Duración", "Resultado"):
+            table.add_column(column)
+        for row in self.rows:
+            table.add_row(
+                row["scenario"]["name"],
+                STATUS_LABELS.get(row["status"], row["status"]),
+                row.get("resolution") or "",
+                self._duration(row),
+                row.get("report") or row.get("error") or row["job_id"] or "",
+            )
+        return table
+
+    @staticmethod
+    def _duration(row: Dict) -> str:
+        submitted: Optional[float] = row.get("submitted")
+        if submitted is None:
+            return ""
+        end = row.get("finished", time.time())
+        return str(timedelta(seconds=int(end - submitted)))
+
+
+async def run_batch(config: Dict, path: Path, concurrency: int) -> None:
+    try:
+        scenarios = load_scenarios(path)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        SimpleUI.show_error(f"Error leyendo escenarios: {e}")
+        return
+    if not scenarios:
+        SimpleUI.show_error(f"No hay escenarios en {path}")
+        return
+
+    SimpleUI.show_success(f"{len(scenarios)} escenarios en {path}")
+    rows = await BatchRunner(config, scenarios, concurrency).run()
+    SimpleUI.show_info("")
+    completed = sum(row["status"] == "completed" for row in rows)
+    SimpleUI.show_success(f"Simulaciones completadas: {completed}/{len(rows)}")
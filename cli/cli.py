@@ -1,6 +1,8 @@
 import argparse
 import asyncio
+from pathlib import Path
 
+from cli.constants import DEFAULT_BATCH_CONCURRENCY
 from cli.main import main
 
 
@@ -11,6 +13,24 @@ def parse_args():
         action="store_true",
         help="Activar modo desarrollador para opciones avanzadas",
     )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        metavar="ARCHIVO",
+        help="Ejecutar sin interacción los escenarios de un archivo CSV o YAML",
+    )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Calcular parámetros y tiempos de arribo en este equipo, sin la API",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help="Solicitudes simultáneas en modo --batch "
+        f"(predeterminado: {DEFAULT_BATCH_CONCURRENCY})",
+    )
     return parser.parse_args()
 
 
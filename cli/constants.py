@@ -17,10 +17,18 @@ DEFAULT_CONFIG = {
 
 CONFIG_FILE = Path("configuracion_simulacion.json")
 JOB_ID_FILE = Path("last_job_id.txt")
+LOCAL_RESULTS_FILE = Path("resultados_locales.json")
 DEFAULT_TIMEOUTS = {
     "calculate": 30,
     "tsunami-travel-times": 60,
     "run-tsdhn": 30,
+    "assess": 60,
     "status_check": 15,
+    "job-status:batch": 15,
     "report_download": 60,
 }
+
+# Batch mode (cli/batch.py)
+JOB_STATUS_BATCH_SIZE = 500  # limit of /job-status:batch
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_RETRY_AFTER = 60  # s, when a 429 response has no Retry-After
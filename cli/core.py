@@ -125,43 +125,29 @@ class SimulationManager:
                 )
 
     async def _execute_calculation_steps(self, client: APIClient) -> Optional[str]:
-        pasos = [
-            (1, "Parámetros iniciales", "calculate"),
-            (2, "Tiempos de arribo", "tsunami-travel-times"),
-            (3, "Simulación TSDHN", "run-tsdhn"),
-        ]
-        resultados = {}
-        total = len(pasos)
-        for num, descripcion, endpoint in pasos:
-            t0 = time.time()
-
-            # Prepare the payload based on the endpoint:
-            if endpoint == "run-tsdhn":
-                payload = {
-                    **self.config["simulation_params"],
-                    "skip_steps": self.config.get("skip_steps", []),
-                }
-            else:
-                payload = self.config["simulation_params"]
-
-            try:
-                resultado = await client.call_endpoint(
-                    endpoint,
-                    payload,
-                    timeout=DEFAULT_TIMEOUTS.get(endpoint, 30),
-                )
-                dt = time.time() - t0
-                SimpleUI.show_success(
-                    f"[Endpoint {num}/{total}] {descripcion}... ({dt:.1f}s)",
-                    add_separator=False,
-                )
-                resultados[endpoint] = resultado
-            except Exception as e:
-                SimpleUI.show_error(f"Error en el paso {num}: {str(e)}")
-                raise
+        # /assess returns the parameters and arrival times and enqueues the
+        # TSDHN job in a single request
+        payload = {
+            **self.config["simulation_params"],
+            "skip_steps": self.config.get("skip_steps", []),
+            "run_tsdhn": True,
+        }
+        t0 = time.time()
+        try:
+            resultado = await client.call_endpoint(
+                "assess", payload, timeout=DEFAULT_TIMEOUTS["assess"]
+            )
+        except Exception as e:
+            SimpleUI.show_error(f"Error en la evaluación: {str(e)}")
+            raise
+        dt = time.time() - t0
+        SimpleUI.show_success(
+            f"Parámetros, tiempos de arribo y simulación TSDHN... ({dt:.1f}s)",
+            add_separator=False,
+        )
 
         SimpleUI.show_info("")
-        job_id = resultados.get("run-tsdhn", {}).get("job_id")
+        job_id = (resultado.get("job") or {}).get("job_id")
         if job_id:
             SimpleUI.show_success(f"ID de simulación: {job_id}")
         return job_id
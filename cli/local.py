@@ -0,0 +1,115 @@
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+from rich.table import Table
+
+from cli.batch import load_scenarios
+from cli.constants import LOCAL_RESULTS_FILE
+from cli.ui import SimpleUI, console
+
+
+def run_local(config: Dict, batch: Optional[Path] = None) -> None:
+    """
+    Compute /assess (parameters and arrival times) in this process, without
+    the API or Redis, for the scenarios of a batch file or the parameters of
+    the configuration. The TSDHN simulation is not run.
+    """
+    try:
+        scenarios = (
+            load_scenarios(batch)
+            if batch
+            else [{**config["simulation_params"], "name": "simulacion"}]
+        )
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        SimpleUI.show_error(f"Error leyendo escenarios: {e}")
+        return
+
+    # The model is only needed here, the API modes do not import it
+    from pydantic import ValidationError
+
+    from orchestrator.core.model_bundle import load_calculator
+    from orchestrator.models.schemas import EarthquakeInput
+
+    t0 = time.perf_counter()
+    try:
+        calculator = load_calculator()
+    except (OSError, ValueError) as e:
+        SimpleUI.show_error(f"Error cargando los datos del modelo: {e}")
+        return
+    dt = (time.perf_counter() - t0) * 1000
+    SimpleUI.show_success(f"Datos del modelo cargados ({dt:.0f} ms)")
+
+    results: List[Dict] = []
+    for scenario in scenarios:
+        result = {"name": scenario["name"]}
+        try:
+            event = EarthquakeInput(**scenario)
+            t0 = time.perf_counter()
+            calculation, travel_times = calculator.assess(event)
+        except (ValidationError, ValueError) as e:
+            result["error"] = str(e)
+        else:
+            result.update(
+                input=event.model_dump(),
+                calculation=calculation.model_dump(exclude={"similar_events"}),
+                travel_times=travel_times.model_dump(),
+                elapsed_ms=round((time.perf_counter() - t0) * 1000, 1),
+            )
+        results.append(result)
+
+    if batch is None:
+        _show_result(results[0])
+    else:
+        console.print(_batch_table(results))
+    SimpleUI.show_info("")
+    try:
+        with LOCAL_RESULTS_FILE.open("w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        SimpleUI.show_success(f"Resultados guardados en: {LOCAL_RESULTS_FILE}")
+    except OSError as e:
+        SimpleUI.show_error(f"Error guardando resultados: {e}")
+
+
+def _batch_table(results: List[Dict]) -> Table:
+    table = Table(title="Evaluación local", title_justify="left")
+    for column in ("Escenario", "Alerta", "Ubicación", "Tiempo (ms)"):
+        table.add_column(column)
+    for result in results:
+        if "error" in result:
+            table.add_row(result["name"], "Error", result["error"], "")
+            continue
+        calculation = result["calculation"]
+        table.add_row(
+            result["name"],
+            calculation["tsunami_warning"],
+            calculation["epicenter_location"],
+            f"{result['elapsed_ms']:.1f}",
+        )
+    return table
+
+
+def _show_result(result: Dict) -> None:
+    if "error" in result:
+        SimpleUI.show_error(result["error"])
+        return
+
+    calculation = result["calculation"]
+    SimpleUI.show_info(f"   * Alerta: {calculation['tsunami_warning']}")
+    SimpleUI.show_info(f"   * Ubicación: {calculation['epicenter_location']}")
+    SimpleUI.show_info(
+        f"   * Distancia a la costa: {calculation['distance_to_coast']:.1f} km",
+        add_separator=True,
+    )
+    table = Table(
+        title=f"Tiempos de arribo ({result['elapsed_ms']:.1f} ms)",
+        title_justify="left",
+    )
+    for column in ("Puerto", "Arribo", "Distancia (km)"):
+        table.add_column(column)
+    travel_times = result["travel_times"]
+    for port, arrival in travel_times["arrival_times"].items():
+        table.add_row(port, arrival, f"{travel_times['distances'][port]:.1f}")
+    console.print(table)
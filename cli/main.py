@@ -1,12 +1,24 @@
 import asyncio
 
+from cli.batch import run_batch
 from cli.config import ConfigManager
 from cli.core import JobMonitor, SimulationManager
+from cli.local import run_local
 from cli.ui import SimpleUI
 
 
 async def main(args):
     config = ConfigManager().load_config()
+    if args.local:
+        run_local(config, args.batch)
+        SimpleUI.print_exit()
+        return
+
+    if args.batch:
+        await run_batch(config, args.batch, max(args.concurrency, 1))
+        SimpleUI.print_exit()
+        return
+
     sim = SimulationManager(config, dev_mode=args.dev)
     job_id = await sim.full_test_flow()
     if job_id:
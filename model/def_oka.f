@@ -10,7 +10,7 @@
 !C --- Parameters required to be changed for each computation ---
 !C     IDS,IDE,JDS,JDE: Relative position of grid deformation on grid_a
 !C     IA,JA    : Grid Dimension of the computational domain
-!C     DX,DY    : Grid size (in meters)
+!C     DX,DY    : Grid size (in meters, from bathy/ya.dat)
 !C     NP       : Number of fault segments (NP=1 : Simple fault event)
 !C     SGL      : Parameter for definition of event type
 !C                SGL=0 : Single fault event, SGL=1 : Multiple fault event
@@ -35,7 +35,7 @@
 !c      PARAMETER (IDS=1,IDE=300,JDS=1050,JDE=1350)
 !c      PARAMETER (IA=IDE-IDS+1, JA=JDE-JDS+1)
 !     PARAMETER (DX=9266.243887,DY=DX)
-      PARAMETER (DX=7412.9951096,DY=DX)
+!     PARAMETER (DX=7412.9951096,DY=DX)
       PARAMETER (NP=1) 
 !C  -------- Correction Parameters for the Fault Position ---
 !C  -------- You don't have to change parameters below -------
@@ -43,6 +43,7 @@
       PARAMETER (E2=0.006694470,RE=6377397.155)
       PARAMETER (EPS=1.0E-8)
 !C  -----------------------------------------------------------
+      DOUBLE PRECISION YA1,YA2
       real(4), allocatable :: Z(:,:), UX(:,:), UY(:,:)
 !c     DIMENSION Z(IA,JA),UX(IA,JA),UY(IA,JA)
       DIMENSION I0(NP),J0(NP)
@@ -70,6 +71,17 @@
 	  IA=IDE-IDS+1
 	  JA=JDE-JDS+1
       allocate(Z(IA,JA),UX(IA,JA),UY(IA,JA))
+      Z=0.0
+      UX=0.0
+      UY=0.0
+
+!C     --- Grid size from the spacing of the bathymetry latitudes ---
+      OPEN(3,FILE='./bathy/ya.dat',STATUS='OLD')
+        READ(3,*)YA1
+        READ(3,*)YA2
+      CLOSE(3)
+      DX=NINT((YA2-YA1)*3600.0D0)/3600.0D0*111194.926644D0
+      DY=DX
 	  
       OPEN(2,FILE='pfalla.inp',STATUS='OLD')
       DO N=1,NP
@@ -1,12 +1,13 @@
 ! fault_plane automatico en Fortran
 ! Cesar Jimenez 23 Mar 2022
-! IA,JA : dimensiones de la grilla de batimetria
+! IA,JA : dimensiones de la grilla de batimetria (lineas de bathy/xa.dat, ya.dat)
 ! m n   : dimensiones del archivo mecfoc.dat
 ! Modificado: 14 Mar 2024
 
-PARAMETER (IA=2461, JA=2056, m=310, n=11)
-DIMENSION xa(IA),dx(IA),ya(JA),dy(JA),lon(m),lat(m),dist(m)
+PARAMETER (m=310, n=11)
+DIMENSION lon(m),lat(m),dist(m)
 real, dimension(:,:), allocatable:: A1
+real, dimension(:), allocatable:: xa,dx,ya,dy
 integer i,j,k,pos,I0,J0
 real    xo,yo,xep,yep,a,b,slip,L,W,Az,echado,rake,h,M0,Mw
 character(len=4) :: t0
@@ -73,6 +74,25 @@ b = 0.5*h*cos((alfa+beta)*pi/180)/1000
 xo = xep+b/111.0 
 yo = yep-a/111.0 
 
+! Dimensiones de la grilla a partir de los ejes de la batimetria
+IA = 0
+OPEN(2,FILE='./bathy/xa.dat',STATUS='OLD')
+DO
+  READ(2,*,IOSTAT=ios) dummy
+  IF (ios /= 0) EXIT
+  IA = IA+1
+end do
+CLOSE(2)
+JA = 0
+OPEN(3,FILE='./bathy/ya.dat',STATUS='OLD')
+DO
+  READ(3,*,IOSTAT=ios) dummy
+  IF (ios /= 0) EXIT
+  JA = JA+1
+end do
+CLOSE(3)
+allocate (xa(IA),dx(IA),ya(JA),dy(JA))
+
  OPEN(2,FILE='./bathy/xa.dat')
  DO I=1,IA
    READ(2,*) xa(I)
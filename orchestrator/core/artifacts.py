@@ -0,0 +1,349 @@
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import netCDF4
+import numpy as np
+
+from orchestrator.core.config import (
+    ARTIFACT_DIR,
+    ARTIFACT_INDEX,
+    SIMILAR_EVENTS_LIMIT,
+    SIMILARITY_SCALES,
+    SIMILARITY_THRESHOLD,
+)
+from orchestrator.modules.reporte import SALIDA_STATIONS
+from orchestrator.utils.geo import DEG_TO_KM, EARTH_RADIUS
+from orchestrator.utils.stations import gauge_layout, load_gauges
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = Path(__file__).resolve().parent.parent.parent / ARTIFACT_DIR
+
+# Chunks of the zmax grid, a lat/lon window only reads the chunks it covers
+ZMAX_CHUNKS = (256, 256)
+COMPRESSION_LEVEL = 4
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    lon REAL,
+    lat REAL,
+    depth REAL,
+    strike REAL,
+    dip REAL,
+    rake REAL,
+    mw REAL,
+    grid_minutes INTEGER,
+    n_times INTEGER,
+    gauges TEXT,
+    lat_min REAL,
+    lat_max REAL,
+    lon_min REAL,
+    lon_max REAL
+)
+"""
+# Range scans of the similar-event search
+SOURCE_INDEX = "CREATE INDEX IF NOT EXISTS jobs_source ON jobs (mw, lat)"
+
+
+def _connect() -> sqlite3.Connection:
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(STORE_DIR / ARTIFACT_INDEX)
+    connection.row_factory = sqlite3.Row
+    connection.execute(INDEX_SCHEMA)
+    connection.execute(SOURCE_INDEX)
+    return connection
+
+
+def _read_zmax(work_dir: Path, nlon: int, nlat: int) -> np.ndarray:
+    """zmax_a.grd as (lat, lon) rows, south to north."""
+    data = np.loadtxt(work_dir / "zfolder" / "zmax_a.grd", dtype=np.float32)
+    if data.size != nlon * nlat:
+        raise ValueError(f"zmax size mismatch: expected {nlon * nlat}, got {data.size}")
+    return data.reshape((nlon, nlat), order="F").T
+
+
+def ingest_job(job_id: str, work_dir: Path) -> Path:
+    """
+    Store the numeric outputs of a job in one compressed, chunked NetCDF-4
+    file and register it in the SQLite index, replacing any previous entry.
+
+    The file holds the raw and Green's law scaled gauge series of green.dat,
+    the arrival and maximum of every gauge from ttt_max.dat and the zmax grid
+    with its axes.
+
+    Args:
+        job_id: Job identifier.
+        work_dir: Working directory of the job.
+
+    Returns:
+        Path of the stored file.
+    """
+    gauges = load_gauges()
+    green = np.loadtxt(work_dir / "zfolder" / "green.dat", ndmin=2)
+    time, raw = green[:, 0], green[:, 1:]
+    layout = gauge_layout(gauges, raw.shape[1])
+    heights = raw * np.array([gauges[i].green_factor for i in layout])
+    ttt_max = np.loadtxt(work_dir / "ttt_max.dat", ndmin=2)
+    xa = np.loadtxt(work_dir / "bathy" / "xa.dat")
+    ya = np.loadtxt(work_dir / "bathy" / "ya.dat")
+    zmax = _read_zmax(work_dir, xa.size, ya.size)
+    meca = np.loadtxt(work_dir / "meca.dat", usecols=range(7))
+
+    path = STORE_DIR / f"{job_id}.nc"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        with netCDF4.Dataset(tmp_path, "w", format="NETCDF4") as ds:
+            ds.job_id = job_id
+            ds.gauges = ",".join(gauges[i].name for i in layout)
+            ds.all_gauges = ",".join(g.name for g in gauges)
+            ds.createDimension("time", time.size)
+            ds.createDimension("gauge", len(layout))
+            ds.createDimension("station", len(gauges))
+            ds.createDimension("lat", ya.size)
+            ds.createDimension("lon", xa.size)
+
+            options = {"zlib": True, "complevel": COMPRESSION_LEVEL}
+            ds.createVariable("time", "f8", ("time",))[:] = time
+            ds["time"].units = "minutes"
+            for name, values in (("raw", raw), ("height", heights)):
+                ds.createVariable(
+                    name,
+                    "f4",
+                    ("time", "gauge"),
+                    chunksizes=(time.size, 1),
+                    **options,
+                )[:] = values
+            ds.createVariable("arrival", "f4", ("station",))[:] = ttt_max[:, 0]
+            ds.createVariable("max_height", "f4", ("station",))[:] = ttt_max[:, 1]
+            ds.createVariable("lat", "f8", ("lat",))[:] = ya
+            ds.createVariable("lon", "f8", ("lon",))[:] = xa
+            ds.createVariable(
+                "zmax",
+                "f4",
+                ("lat", "lon"),
+                chunksizes=(min(ZMAX_CHUNKS[0], ya.size), min(ZMAX_CHUNKS[1], xa.size)),
+                **options,
+            )[:] = zmax
+        tmp_path.replace(path)
+    except (OSError, RuntimeError) as e:
+        tmp_path.unlink(missing_ok=True)
+        raise IOError(f"Failed to store artifacts of {job_id}: {e}") from e
+
+    lon0 = meca[0] - 360.0 if meca[0] > 180.0 else meca[0]
+    with closing(_connect()) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO jobs VALUES "
+            "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job_id,
+                path.name,
+                datetime.now().isoformat(timespec="seconds"),
+                float(lon0),
+                float(meca[1]),
+                float(meca[2]),
+                float(meca[3]),
+                float(meca[4]),
+                float(meca[5]),
+                float(meca[6]),
+                round((ya[1] - ya[0]) * 60),
+                int(time.size),
+                ",".join(gauges[i].name for i in layout),
+                float(ya[0]),
+                float(ya[-1]),
+                float(xa[0]),
+                float(xa[-1]),
+            ),
+        )
+    logger.info(f"Stored artifacts of {job_id} in {path}")
+    return path
+
+
+def get_entry(job_id: str) -> Optional[Dict]:
+    with closing(_connect()) as connection:
+        row = connection.execute(
+            "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def list_entries() -> List[Dict]:
+    with closing(_connect()) as connection:
+        rows = connection.execute("SELECT * FROM jobs").fetchall()
+    return [dict(row) for row in rows]
+
+
+def _open(job_id: str) -> netCDF4.Dataset:
+    entry = get_entry(job_id)
+    if entry is None:
+        raise KeyError(f"No stored artifacts for job {job_id}")
+    return netCDF4.Dataset(STORE_DIR / entry["path"], "r")
+
+
+def _range_slice(axis: np.ndarray, start: Optional[float], end: Optional[float]):
+    """Indices of the increasing axis between start and end, inclusive."""
+    lo = 0 if start is None else int(np.searchsorted(axis, start, side="left"))
+    hi = axis.size if end is None else int(np.searchsorted(axis, end, side="right"))
+    return slice(lo, hi)
+
+
+def read_gauge_series(
+    job_id: str,
+    gauge: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Dict:
+    """
+    Raw and scaled series of one gauge, or of every gauge, between start and
+    end (minutes). Only the requested samples are read from disk.
+    """
+    with _open(job_id) as ds:
+        names = ds.gauges.split(",")
+        if gauge is not None and gauge not in names:
+            raise KeyError(f"Gauge {gauge} not stored for job {job_id}")
+        columns = [names.index(gauge)] if gauge else list(range(len(names)))
+        window = _range_slice(ds["time"][:], start, end)
+        time = ds["time"][window]
+        return {
+            "time": time.tolist(),
+            "gauges": {
+                names[k]: {
+                    "raw": ds["raw"][window, k].tolist(),
+                    "height": ds["height"][window, k].tolist(),
+                }
+                for k in columns
+            },
+        }
+
+
+def read_zmax_window(
+    job_id: str,
+    lat_min: float,
+    lat_max: float,
+    lon_min: float,
+    lon_max: float,
+    stride: int = 1,
+    max_cells: int = 1_000_000,
+) -> Dict:
+    """
+    Maximum wave height over a lat/lon window (degrees, longitudes in the
+    0-360 range of the model grid). Only the chunks covering the window are
+    read and decompressed.
+    """
+    with _open(job_id) as ds:
+        lat = ds["lat"][:]
+        lon = ds["lon"][:]
+        rows = _range_slice(lat, lat_min, lat_max)
+        cols = _range_slice(lon, lon_min, lon_max)
+        rows = slice(rows.start, rows.stop, stride)
+        cols = slice(cols.start, cols.stop, stride)
+        n_cells = len(range(*rows.indices(lat.size))) * len(
+            range(*cols.indices(lon.size))
+        )
+        if n_cells > max_cells:
+            raise ValueError(
+                f"Window has {n_cells} cells, more than {max_cells}; "
+                "narrow it or increase the stride"
+            )
+        zmax = np.ma.filled(ds["zmax"][rows, cols], np.nan)
+        return {
+            "lat": lat[rows].tolist(),
+            "lon": lon[cols].tolist(),
+            "zmax": np.where(np.isnan(zmax), None, zmax).tolist(),
+        }
+
+
+def source_distance(source: Dict[str, float], candidates: Dict) -> np.ndarray:
+    """
+    Distance between a source and archived sources (scalars or arrays keyed
+    like the index: lat, lon, depth, mw, strike), in units of
+    SIMILARITY_SCALES. Sources closer than SIMILARITY_THRESHOLD are similar.
+    """
+    lat1, lon1 = np.radians(source["lat"]), np.radians(source["lon"])
+    lat2 = np.radians(np.asarray(candidates["lat"], dtype=float))
+    lon2 = np.radians(np.asarray(candidates["lon"], dtype=float))
+    hav = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    distance = 2.0 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(hav, 0.0, 1.0)))
+    strike = np.abs(np.asarray(candidates["strike"], dtype=float) - source["strike"])
+    strike = np.minimum(strike % 360.0, 360.0 - strike % 360.0)
+    depth = np.asarray(candidates["depth"], dtype=float) - source["depth"]
+    mw = np.asarray(candidates["mw"], dtype=float) - source["mw"]
+    return np.sqrt(
+        (distance / SIMILARITY_SCALES["distance"]) ** 2
+        + (depth / SIMILARITY_SCALES["depth"]) ** 2
+        + (mw / SIMILARITY_SCALES["mw"]) ** 2
+        + (strike / SIMILARITY_SCALES["strike"]) ** 2
+    )
+
+
+def _station_results(job_id: str) -> List[Dict]:
+    with _open(job_id) as ds:
+        arrival = np.ma.filled(ds["arrival"][:], np.nan)
+        max_height = np.ma.filled(ds["max_height"][:], np.nan)
+    return [
+        {
+            "port": port,
+            "arrival_minutes": float(arrival[idx]),
+            "max_height": float(max_height[idx]),
+        }
+        for _, port, idx in SALIDA_STATIONS
+        # nan: no gauge in the grid that was run, 0: the wave never arrived
+        if arrival[idx] > 0.0
+    ]
+
+
+def find_similar(
+    source: Dict[str, float],
+    limit: int = SIMILAR_EVENTS_LIMIT,
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> List[Dict]:
+    """
+    Archived jobs whose source is within threshold of the given one, nearest
+    first, with the arrival and maximum height at each port.
+
+    Every term of the distance is bounded by the threshold, so the index is
+    only scanned over the magnitude and latitude band that can match.
+
+    Args:
+        source: lat, lon (degrees), depth (km), mw and strike (degrees).
+        limit: Maximum number of scenarios returned.
+        threshold: Largest distance at which a scenario is returned.
+    """
+    mw_band = threshold * SIMILARITY_SCALES["mw"]
+    lat_band = threshold * SIMILARITY_SCALES["distance"] / DEG_TO_KM
+    with closing(_connect()) as connection:
+        rows = connection.execute(
+            "SELECT job_id, lat, lon, depth, mw, strike FROM jobs "
+            "WHERE mw BETWEEN ? AND ? AND lat BETWEEN ? AND ?",
+            (
+                source["mw"] - mw_band,
+                source["mw"] + mw_band,
+                source["lat"] - lat_band,
+                source["lat"] + lat_band,
+            ),
+        ).fetchall()
+    if not rows:
+        return []
+
+    candidates = {key: [row[key] for row in rows] for key in rows[0].keys()}
+    distance = source_distance(source, candidates)
+    nearest = [i for i in np.argsort(distance) if distance[i] <= threshold][:limit]
+    return [
+        {
+            **dict(rows[i]),
+            "distance": round(float(distance[i]), 3),
+            "stations": _station_results(rows[i]["job_id"]),
+        }
+        for i in nearest
+    ]
@@ -24,6 +24,16 @@ logger = logging.getLogger(__name__)
 # This constant is used in rectangle corner calculations
 NM_CONVERSION = 60 * 1853
 
+# Arrays read by the calculations, shared with the calculator pool workers
+SHARED_ARRAYS = (
+    "vlat",
+    "vlon",
+    "bathymetry",
+    "maper1",
+    "mechanism_data",
+    "port_coords",
+)
+
 
 class TsunamiCalculator:
     def __init__(self):
@@ -53,13 +63,7 @@ class TsunamiCalculator:
                 self.vlat = self.vlat[::-1]
                 self.bathymetry = self.bathymetry[::-1, :]
 
-            # Create bathymetry interpolator
-            self.bathy_interpolator = RegularGridInterpolator(
-                (self.vlat, self.vlon),
-                self.bathymetry,
-                bounds_error=False,
-                fill_value=None,
-            )
+            self._build_interpolator()
 
             # Load maper1.mat (used for coastal points)
             maper1_path = self.data_path / "maper1.mat"
@@ -74,6 +78,37 @@ class TsunamiCalculator:
             logger.exception(f"Error loading data: {e}")
             raise
 
+    def _build_interpolator(self):
+        """Create the bathymetry interpolator."""
+        self.bathy_interpolator = RegularGridInterpolator(
+            (self.vlat, self.vlon),
+            self.bathymetry,
+            bounds_error=False,
+            fill_value=None,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Dict[str, np.ndarray], port_names: List[str]
+    ) -> "TsunamiCalculator":
+        """
+        Calculator over already loaded data, the arrays of shared_arrays()
+        (e.g. views of shared memory in the workers of core/calculator_pool.py).
+        """
+        calculator = cls.__new__(cls)
+        calculator.data_path = MODEL_DIR
+        calculator.g = GRAVITY
+        calculator.R = EARTH_RADIUS
+        for name in SHARED_ARRAYS:
+            setattr(calculator, name, arrays[name])
+        calculator.port_names = port_names
+        calculator._build_interpolator()
+        return calculator
+
+    def shared_arrays(self) -> Dict[str, np.ndarray]:
+        """Data read by the calculations, see from_arrays."""
+        return {name: getattr(self, name) for name in SHARED_ARRAYS}
+
     def _load_static_files(self):
         """
         Preload static files that are reused on every calculation:
@@ -95,7 +130,7 @@ class TsunamiCalculator:
             # Load ports data once
             puertos_path = self.data_path / "puertos.txt"
             with open(puertos_path, "r") as f:
-                self.ports = f.readlines()
+                self.port_names, self.port_coords = self._parse_ports(f.readlines())
 
             logger.debug("Static files loaded successfully")
         except Exception as e:
@@ -135,9 +170,6 @@ class TsunamiCalculator:
             location = determine_epicenter_location(h0, distance_to_coast)
             warning = determine_tsunami_warning(data.Mw, data.h, h0, distance_to_coast)
 
-            # Write hypo.dat file (for model execution)
-            self._write_hypo_dat(data)
-
             return CalculationResponse(
                 length=L,
                 width=W,
@@ -163,36 +195,17 @@ class TsunamiCalculator:
         Calculate tsunami travel times to various ports.
         """
         try:
-            arrival_times = {}
-            distances = {}
             time0 = float(data.hhmm[:2]) + float(data.hhmm[2:]) / 60
+            distances, travel_times = self._calculate_travel_times(
+                data.lon0, data.lat0, time0
+            )
 
-            for port in self.ports:
-                if len(port) < 15:
-                    continue
-
-                parts = port.split()
-                if len(parts) < 3:
-                    logger.warning(f"Insufficient data in port line: '{port.strip()}'")
-                    continue
-
-                try:
-                    port_name = port[:15].strip()
-                    port_lon = float(parts[0])
-                    port_lat = float(parts[1])
-
-                    distance, travel_time = self._calculate_travel_time(
-                        data.lon0, data.lat0, port_lon, port_lat, time0
-                    )
-
-                    arrival_times[port_name] = format_arrival_time(
-                        travel_time, data.dia
-                    )
-                    distances[port_name] = distance
-
-                except ValueError as e:
-                    logger.error(f"Error processing port data '{port.strip()}': {e}")
-                    continue
+            arrival_times = {
+                name: format_arrival_time(travel_time, data.dia)
+                for name, travel_time in zip(
+                    self.port_names, travel_times.tolist(), strict=True
+                )
+            }
 
             epicenter_info = {
                 "date": data.dia,
@@ -205,7 +218,7 @@ class TsunamiCalculator:
 
             return TsunamiTravelResponse(
                 arrival_times=arrival_times,
-                distances=distances,
+                distances=dict(zip(self.port_names, distances.tolist(), strict=True)),
                 epicenter_info=epicenter_info,
             )
 
@@ -213,6 +226,44 @@ class TsunamiCalculator:
             logger.exception("Error calculating tsunami travel times")
             raise
 
+    def assess(
+        self, data: EarthquakeInput
+    ) -> Tuple[CalculationResponse, TsunamiTravelResponse]:
+        """
+        Earthquake parameters and travel times of one event in a single call,
+        the results of /calculate and /tsunami-travel-times.
+        """
+        return (
+            self.calculate_earthquake_parameters(data),
+            self.calculate_tsunami_travel_times(data),
+        )
+
+    @staticmethod
+    def _parse_ports(lines: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Names and (lon, lat) of the ports in puertos.txt, skipping malformed
+        lines. The name is the first 15 characters of the line.
+        """
+        names = []
+        coords = []
+        for port in lines:
+            if len(port) < 15:
+                continue
+
+            parts = port.split()
+            if len(parts) < 3:
+                logger.warning(f"Insufficient data in port line: '{port.strip()}'")
+                continue
+
+            try:
+                coords.append((float(parts[0]), float(parts[1])))
+            except ValueError as e:
+                logger.error(f"Error processing port data '{port.strip()}': {e}")
+                continue
+            names.append(port[:15].strip())
+
+        return names, np.array(coords, dtype=float).reshape(-1, 2)
+
     def _get_focal_mechanism(self, lon0: float, lat0: float) -> Tuple[float, float]:
         """
         Get focal mechanism parameters for given coordinates.
@@ -317,23 +368,24 @@ class TsunamiCalculator:
         ]
         return rect_params, rectangle_corners
 
-    def _calculate_travel_time(
-        self, lon0: float, lat0: float, port_lon: float, port_lat: float, time0: float
-    ) -> Tuple[float, float]:
+    def _calculate_travel_times(
+        self, lon0: float, lat0: float, time0: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Calculate tsunami travel time between two points.
+        Calculate tsunami travel times from the source to every port.
 
         Args:
             lon0: Source longitude
             lat0: Source latitude
-            port_lon: Destination longitude
-            port_lat: Destination latitude
             time0: Initial time
 
         Returns:
-            Tuple of (distance, travel_time)
+            Tuple of (distances, travel_times), one value per port
         """
         try:
+            port_lon = self.port_coords[:, 0]
+            port_lat = self.port_coords[:, 1]
+
             # Convert to radians
             t1 = np.pi / 2 - np.radians(lat0)
             f1 = np.radians(lon0)
@@ -345,14 +397,20 @@ class TsunamiCalculator:
             alfa = np.arccos(cosen)
             distance = self.R * alfa
 
-            # Determine travel time based on distance and location
-            if distance >= 750:
-                travel_time = distance / 790 + 0.2
-            elif not (-19 <= lat0 <= 0) and distance < 750:
-                travel_time = distance / 700
-            else:
-                travel_time = self._calculate_detailed_travel_time(
-                    lon0, lat0, port_lon, port_lat, distance, alfa
+            # Determine travel time based on distance and location, along the
+            # bathymetry only for nearby ports of a source off central Peru
+            travel_time = np.where(
+                distance >= 750, distance / 790 + 0.2, distance / 700
+            )
+            near = distance < 750
+            if -19 <= lat0 <= 0 and near.any():
+                travel_time[near] = self._calculate_detailed_travel_times(
+                    lon0,
+                    lat0,
+                    port_lon[near],
+                    port_lat[near],
+                    distance[near],
+                    alfa[near],
                 )
 
             return distance, travel_time + time0
@@ -361,47 +419,51 @@ class TsunamiCalculator:
             logger.exception("Error calculating travel time")
             raise
 
-    def _calculate_detailed_travel_time(
+    def _calculate_detailed_travel_times(
         self,
         lon0: float,
         lat0: float,
-        port_lon: float,
-        port_lat: float,
-        distance: float,
-        alfa: float,
-    ) -> float:
+        port_lon: np.ndarray,
+        port_lat: np.ndarray,
+        distance: np.ndarray,
+        alfa: np.ndarray,
+    ) -> np.ndarray:
         """
-        Calculate detailed tsunami travel time using bathymetry data.
+        Calculate detailed tsunami travel times using bathymetry data, sampling
+        the paths to all the ports in a single interpolation.
 
         Args:
             lon0: Source longitude
             lat0: Source latitude
-            port_lon: Destination longitude
-            port_lat: Destination latitude
-            distance: Great circle distance
-            alfa: Angular distance
+            port_lon: Destination longitudes
+            port_lat: Destination latitudes
+            distance: Great circle distances
+            alfa: Angular distances
 
         Returns:
-            Calculated travel time
+            Calculated travel times
         """
         try:
-            # Compute unit velocity vector
+            # Compute unit velocity vectors, one row per port
             # (direction scaled to 110 for geographic conversion)
-            vu = np.array([port_lon - lon0, port_lat - lat0]) / distance * 110
+            vu = (
+                np.column_stack([port_lon - lon0, port_lat - lat0])
+                / distance[:, None]
+                * 110
+            )
             n = 100
             delta = (alfa * 180 / np.pi) / n  # step size in degrees
 
-            # Vectorize the computation of positions along the path
-            indices = np.arange(0, n + 1).reshape(-1, 1)  # shape (n+1, 1)
+            # Positions along each path, shape (ports, n+1, 2):
+            # P = P0 + (i * delta) * vu
+            indices = np.arange(0, n + 1)[None, :, None]
             P0 = np.array([lon0, lat0])  # starting point (lon, lat)
+            positions = P0 + indices * delta[:, None, None] * vu[:, None, :]
 
-            # Each row: P = P0 + (i * delta) * vu
-            positions = P0 + indices * delta * vu  # shape (n+1, 2)
+            # The interpolator expects (lat, lon), so swap the last axis:
+            points = positions[..., [1, 0]]
 
-            # The interpolator expects (lat, lon), so swap columns:
-            points = positions[:, [1, 0]]
-
-            # Get absolute bathymetry values along the path
+            # Get absolute bathymetry values along the paths
             h = np.abs(self.bathy_interpolator(points))
 
             # Compute tsunami velocity (converted to km/h)
@@ -413,42 +475,21 @@ class TsunamiCalculator:
 
             # Simpson integration: endpoints + weighted sums for even/odd indices
             integral = (delta_distance / 3) * (
-                y[0] + y[-1] + 4 * np.sum(y[1:-1:2]) + 2 * np.sum(y[2:-1:2])
+                y[:, 0]
+                + y[:, -1]
+                + 4 * np.sum(y[:, 1:-1:2], axis=1)
+                + 2 * np.sum(y[:, 2:-1:2], axis=1)
             )
 
             travel_time = 0.50 * integral
 
             # Empirical adjustments to travel time
-            if travel_time > 3.0:
-                travel_time = distance / 733 + 0.25
-            elif 1.4 < travel_time < 3.0:
-                travel_time = distance / 690 + 0.2
-
-            return travel_time
+            return np.select(
+                [travel_time > 3.0, (1.4 < travel_time) & (travel_time < 3.0)],
+                [distance / 733 + 0.25, distance / 690 + 0.2],
+                travel_time,
+            )
 
         except Exception:
             logger.exception("Error calculating detailed travel time")
             raise
-
-    def _write_hypo_dat(self, data: EarthquakeInput):
-        """
-        Write earthquake parameters to hypo.dat file.
-
-        Args:
-            data: EarthquakeInput object containing earthquake data
-        """
-        try:
-            hypo_path = self.data_path / "hypo.dat"
-            with open(hypo_path, "w") as f:
-                f.writelines(
-                    [
-                        f"{data.hhmm}\n",
-                        f"{data.lon0:.2f}\n",
-                        f"{data.lat0:.2f}\n",
-                        f"{data.h:.0f}\n",
-                        f"{data.Mw:.1f}\n",
-                    ]
-                )
-        except Exception:
-            logger.exception("Error writing hypo.dat")
-            raise
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from orchestrator.core.calculator import TsunamiCalculator
+from orchestrator.models.schemas import EarthquakeInput
+
+logger = logging.getLogger(__name__)
+
+# Name, shape and dtype of each shared array
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+# Calculator of a worker process over views of the shared arrays. The
+# segments stay open for the life of the worker
+_calculator: Optional[TsunamiCalculator] = None
+_segments: List[SharedMemory] = []
+
+
+def _attach(specs: Dict[str, ArraySpec], port_names: List[str]) -> None:
+    global _calculator
+    arrays = {}
+    for key, (name, shape, dtype) in specs.items():
+        segment = SharedMemory(name=name)
+        _segments.append(segment)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        arrays[key].flags.writeable = False
+    _calculator = TsunamiCalculator.from_arrays(arrays, port_names)
+
+
+def _call(method: str, data: EarthquakeInput) -> Any:
+    return getattr(_calculator, method)(data)
+
+
+class CalculatorPool:
+    """
+    Worker processes for the CPU bound calculator endpoints.
+
+    The arrays of the calculator are copied once into shared memory and every
+    worker maps them read-only, so only the request and its response cross
+    the process boundary. Workers are spawned, as in utils/render_pool.py.
+    """
+
+    def __init__(self, calculator: TsunamiCalculator, workers: int):
+        self._segments: List[SharedMemory] = []
+        specs = {}
+        try:
+            for key, array in calculator.shared_arrays().items():
+                array = np.ascontiguousarray(array, dtype=np.float64)
+                segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._segments.append(segment)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = (
+                    array
+                )
+                specs[key] = (segment.name, array.shape, array.dtype.str)
+        except OSError as e:
+            self._release()
+            raise RuntimeError(f"Could not share the calculator data: {e}") from e
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_attach,
+            initargs=(specs, calculator.port_names),
+        )
+        size = sum(segment.size for segment in self._segments)
+        logger.info(
+            f"Calculator pool: {workers} workers, {size / 2**20:.1f} MiB shared"
+        )
+
+    async def run(self, method: str, data: EarthquakeInput) -> Any:
+        """Run a TsunamiCalculator method on the event in a worker."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _call, method, data)
+
+    def _release(self) -> None:
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self._release()
@@ -1,17 +1,77 @@
+import os
 import shutil
 from pathlib import Path
+from typing import Dict, List
 
-from orchestrator.models.schemas import CompilerConfig, ProcessingStep
-from orchestrator.modules.maxola import generate_maxola_plot
-from orchestrator.modules.point_ttt import generate_ttt_map
-from orchestrator.modules.reporte import generate_reports_wrapper
+from orchestrator.models.schemas import CompilerConfig, DeformEngine, ProcessingStep
+from orchestrator.modules.deform import compute_deformation
+from orchestrator.modules.maxola import generate_maxola_plot, maxola_request
+from orchestrator.modules.point_ttt import generate_ttt_map, ttt_map_request
+from orchestrator.modules.reporte import generate_reports_wrapper, write_summary
 from orchestrator.modules.ttt_inverso import ttt_inverso_python
-from orchestrator.modules.ttt_max import process_tsunami_data
+from orchestrator.modules.ttt_max import (
+    generate_mareogram_plot,
+    mareogram_request,
+    process_tsunami_data,
+)
 
 # Constants
 GRAVITY: float = 9.81  # m/s²
 EARTH_RADIUS: float = 6370.8  # km
 MODEL_DIR: Path = Path("model")
+GAUGE_SAMPLE_INTERVAL: float = 60.0  # s, sampling of zfolder/green.dat
+CHECKPOINT_INTERVAL: float = 60.0  # simulated minutes between tsunami checkpoints
+CHECKPOINT_FILE: str = "restart.bin"  # written by tsunami1.for, removed at the end
+CHECKPOINT_STEP: str = "tsunami"  # step that resumes from CHECKPOINT_FILE
+# Failed jobs, and the workspaces kept to resume them, expire after this many
+# seconds
+RESUME_TTL: int = 86400
+
+# Inputs of the 5 arc-minute grid, staged under the names read by the model
+COARSE_GRID_FILES: Dict[str, str] = {
+    "bathy/xa5.dat": "bathy/xa.dat",
+    "bathy/ya5.dat": "bathy/ya.dat",
+    "bathy/grid_a5.grd": "bathy/grid_a.grd",
+    "tidal5.dat": "tidal.dat",
+}
+
+# 5 arc-minute parent grid plus the 100 arc-second coastal child grid, nested
+# one-way by tsunami1.for when nest.dat is present. tidal_nest5.dat has the 17
+# ports of tidal.dat on the parent grid, all of them inside the child grid
+NESTED_GRID_FILES: Dict[str, str] = {
+    "bathy/xa5.dat": "bathy/xa.dat",
+    "bathy/ya5.dat": "bathy/ya.dat",
+    "bathy/grid_a5.grd": "bathy/grid_a.grd",
+    "tidal_nest5.dat": "tidal.dat",
+    "bathy/grid_b5.grd": "bathy/grid_b.grd",
+    "nest5.dat": "nest.dat",
+}
+
+# Workspace of the coarse stage of coarse_then_fine jobs, inside the job
+# directory. Its outputs are served as the preliminary results until the fine
+# stage completes, so clients never get a mix of coarse and fine files
+COARSE_STAGE_DIR: str = "coarse"
+# Outputs of the coarse stage that do not depend on the grid, reused by the
+# fine stage
+REUSED_ARTIFACTS: List[str] = ["ttt.eps"]
+
+# Worker processes of the calculator endpoints, attached to a shared memory
+# copy of the bathymetry and catalogs (core/calculator_pool.py). With 0 the
+# calculations run in threads of the API process
+CALCULATOR_WORKERS: int = int(os.environ.get("TSDHN_CALCULATOR_WORKERS", "0"))
+
+# Cache of the model data read by TsunamiCalculator, saved as arrays that are
+# memory-mapped on load (core/model_bundle.py). Rebuilt when a file of
+# MODEL_DIR listed in MODEL_BUNDLE_SOURCES changes
+MODEL_BUNDLE_DIR: Path = Path(
+    os.environ.get("TSDHN_MODEL_BUNDLE", Path.home() / ".cache" / "tsdhn" / "model")
+)
+MODEL_BUNDLE_SOURCES: List[str] = [
+    "pacifico.mat",
+    "maper1.mat",
+    "mecfoc.dat",
+    "puertos.txt",
+]
 
 # Logging configuration
 LOGGING_CONFIG = {
@@ -20,14 +80,73 @@ LOGGING_CONFIG = {
     "format": "%(asctime)s - %(levelname)s - %(message)s",
 }
 
-# Processing Pipelines
+# Store of the numeric outputs of completed jobs, one NetCDF-4 file per job
+# plus a SQLite index (core/artifacts.py)
+ARTIFACT_DIR: Path = Path("artifacts")
+ARTIFACT_INDEX: str = "index.sqlite"
+
+# Archived scenarios returned by /calculate and /run-tsdhn while a new job
+# runs. The distance between two sources adds in quadrature the epicentral
+# distance (km), depth (km), magnitude and strike (deg) differences, each
+# divided by its scale; archived results are reused up to the threshold
+SIMILARITY_SCALES: Dict[str, float] = {
+    "distance": 100.0,
+    "depth": 20.0,
+    "mw": 0.2,
+    "strike": 45.0,
+}
+SIMILARITY_THRESHOLD: float = 1.0
+SIMILAR_EVENTS_LIMIT: int = 3
+
+# Admission control of /run-tsdhn and /run-tsdhn-batch (utils/admission.py).
+# The time to result of a new job is its own duration plus the wait behind the
+# queued and running jobs, from the mean of the last DURATION_HISTORY runs of
+# each kind (DEFAULT_JOB_MINUTES until there is history). Above
+# ADMISSION_MAX_MINUTES jobs run on the coarse grid when allowed, or are
+# refused with 429 and Retry-After
+ADMISSION_MAX_MINUTES: float = 90.0
+DEFAULT_JOB_MINUTES: Dict[str, float] = {
+    "fine": 25.0,
+    "coarse": 5.0,
+    "coarse_then_fine": 30.0,
+    "nested": 12.0,
+    "batch": 60.0,
+}
+DURATION_HISTORY: int = 20
+JOB_DURATION_KEY: str = "tsdhn:durations:{}"
+# Queued or running jobs allowed per client (X-Client-ID header or address)
+CLIENT_MAX_ACTIVE_JOBS: int = 4
+CLIENT_JOBS_KEY: str = "tsdhn:client:{}"
+CLIENT_RESERVATION_KEY: str = "tsdhn:reserved:{}"
+
+# Hypocenter of the last /calculate or /assess of each client, used by
+# /run-tsdhn requests without one. Kept in Redis to survive restarts and be
+# shared by every API worker
+LAST_INPUT_KEY: str = "tsdhn:last_input:{}"
+LAST_INPUT_TTL: int = 86400  # s
+
+# Lightweight results served by /job-result/{job_id}/summary.*, written right
+# after ttt_max.dat
+SUMMARY_FILES: Dict[str, str] = {
+    "summary.json": "application/json",
+    "summary.html": "text/html",
+}
+
+# Figures of the job directory, also served by /job-result/{job_id}/{filename}
+FIGURE_FILES: Dict[str, str] = {
+    "maxola.eps": "application/postscript",
+    "mareograma.eps": "application/postscript",
+    "ttt.eps": "application/postscript",
+}
+
+# Content hashes of the final outputs, written when a job completes. Files
+# listed there never change and are served as immutable without a Redis lookup
+RESULT_MANIFEST: str = "etags.json"
+IMMUTABLE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+
+# Processing Pipelines. pfalla.inp, meca.dat and xyo.dat are written with the
+# workspace (modules/fault_plane.py) from the rupture computed by /calculate
 PROCESSING_PIPELINE = [
-    ProcessingStep(
-        name="fault_plane",
-        command=["./fault_plane"],
-        file_checks=[("pfalla.inp", "Input file for deform not generated")],
-        compiler_config=CompilerConfig("fault_plane.f90", "fault_plane"),
-    ),
     ProcessingStep(
         name="deform",
         command=["./deform"],
@@ -41,11 +160,7 @@ PROCESSING_PIPELINE = [
             ("zfolder/green.dat", "Green data file missing"),
             ("zfolder/zmax_a.grd", "Zmax grid file missing"),
         ],
-    ),
-    ProcessingStep(
-        name="maxola",
-        python_callable=generate_maxola_plot,
-        file_checks=[("maxola.eps", "Maxola output missing")],
+        compiler_config=CompilerConfig("tsunami1.for", "tsunami", flags=["-O3"]),
     ),
     ProcessingStep(
         name="ttt_max",
@@ -53,31 +168,63 @@ PROCESSING_PIPELINE = [
         file_checks=[
             ("zfolder/green_rev.dat", "Scaled wave height data output missing"),
             ("ttt_max.dat", "TTT Max data output missing"),
-            ("mareograma.eps", "Mareogram plot missing"),
         ],
     ),
-]
-
-TTT_MUNDO_STEPS = [
     ProcessingStep(
-        name="ttt_inverso",
-        python_callable=ttt_inverso_python,
-        working_dir="ttt_mundo",
-        file_checks=[("ttt.b", "ttt_client output missing")],
+        name="summary",
+        python_callable=write_summary,
+        file_checks=[
+            ("summary.json", "Result summary missing"),
+            ("summary.html", "Result summary page missing"),
+        ],
     ),
+]
+
+TTT_INVERSO_STEP = ProcessingStep(
+    name="ttt_inverso",
+    python_callable=ttt_inverso_python,
+    working_dir="ttt_mundo",
+    file_checks=[("ttt.b", "ttt_client output missing")],
+)
+
+TTT_MAP_STEP = ProcessingStep(
+    name="point_ttt",
+    python_callable=generate_ttt_map,
+    working_dir="ttt_mundo",
+    extra_executables=["point_ttt"],
+    file_checks=[("ttt.eps", "ttt.eps not generated")],
+    parallel=True,
+    render_request=ttt_map_request,
+)
+
+COPY_TTT_STEP = ProcessingStep(
+    name="copy_ttt_eps",
+    python_callable=lambda wd: shutil.copy(wd / "ttt.eps", wd.parent / "ttt.eps"),
+    working_dir="ttt_mundo",
+    file_checks=[("../ttt.eps", "ttt.eps not copied to parent directory")],
+)
+
+TTT_MUNDO_STEPS = [TTT_INVERSO_STEP, TTT_MAP_STEP, COPY_TTT_STEP]
+
+# Figures built from the outputs of the steps above, rendered at the same time
+# by the render service (core/render_worker.py) when it runs, otherwise in a
+# process pool, each worker with its own GMT session
+RENDER_STEPS = [
     ProcessingStep(
-        name="point_ttt",
-        python_callable=generate_ttt_map,
-        working_dir="ttt_mundo",
-        extra_executables=["point_ttt"],
-        file_checks=[("ttt.eps", "ttt.eps not generated")],
+        name="maxola",
+        python_callable=generate_maxola_plot,
+        file_checks=[("maxola.eps", "Maxola output missing")],
+        parallel=True,
+        render_request=maxola_request,
     ),
     ProcessingStep(
-        name="copy_ttt_eps",
-        python_callable=lambda wd: shutil.copy(wd / "ttt.eps", wd.parent / "ttt.eps"),
-        working_dir="ttt_mundo",
-        file_checks=[("../ttt.eps", "ttt.eps not copied to parent directory")],
+        name="mareograma",
+        python_callable=generate_mareogram_plot,
+        file_checks=[("mareograma.eps", "Mareogram plot missing")],
+        parallel=True,
+        render_request=mareogram_request,
     ),
+    TTT_MAP_STEP,
 ]
 
 REPORT_STEPS = [
@@ -88,4 +235,35 @@ REPORT_STEPS = [
     ),
 ]
 
-MASTER_PIPELINE = PROCESSING_PIPELINE + TTT_MUNDO_STEPS + REPORT_STEPS
+MASTER_PIPELINE = (
+    PROCESSING_PIPELINE
+    + [TTT_INVERSO_STEP]
+    + RENDER_STEPS
+    + [COPY_TTT_STEP]
+    + REPORT_STEPS
+)
+
+# Alternatives to the def_oka.f deform step, selected per job
+DEFORM_ENGINE_STEPS: Dict[DeformEngine, ProcessingStep] = {
+    DeformEngine.NUMPY: ProcessingStep(
+        name="deform",
+        python_callable=compute_deformation,
+        file_checks=[("deform_a.grd", "Deformation grid missing")],
+    ),
+}
+
+# Multi-scenario batch: the source steps run once per scenario and their
+# outputs are moved to scenarios/NNN, then a single solver pass advances every
+# scenario over the shared bathymetry
+SCENARIOS_DIR: str = "scenarios"
+SCENARIO_INPUTS: List[str] = ["meca.dat", "pfalla.inp", "xyo.dat", "deform_a.grd"]
+SCENARIO_OUTPUTS: List[str] = ["zfolder/green.dat", "zfolder/zmax_a.grd"]
+BATCH_ARCHIVE: str = "scenarios.zip"
+
+BATCH_SOURCE_STEPS = [step for step in PROCESSING_PIPELINE if step.name == "deform"]
+
+BATCH_SOLVER_STEP = ProcessingStep(
+    name="tsunami_batch",
+    command=["./tsunami_batch"],
+    compiler_config=CompilerConfig("tsunami_batch.for", "tsunami_batch", flags=["-O3"]),
+)
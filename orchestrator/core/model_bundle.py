@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from orchestrator.core.calculator import SHARED_ARRAYS, TsunamiCalculator
+from orchestrator.core.config import MODEL_BUNDLE_DIR, MODEL_BUNDLE_SOURCES, MODEL_DIR
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_MANIFEST = "manifest.json"
+
+# Path, size and modification time of each source file of the bundle
+SourceStamp = Dict[str, List]
+
+
+def source_stamp(data_path: Path = MODEL_DIR) -> SourceStamp:
+    stamp = {}
+    for name in MODEL_BUNDLE_SOURCES:
+        path = (data_path / name).resolve()
+        stat = path.stat()
+        stamp[name] = [str(path), stat.st_size, stat.st_mtime_ns]
+    return stamp
+
+
+def write_bundle(
+    calculator: TsunamiCalculator, bundle_dir: Path, stamp: SourceStamp
+) -> None:
+    """
+    Save the arrays of the calculator as .npy files, in float64 so the
+    interpolator reads the mapped grid without a copy, and the manifest last.
+    """
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    for name, array in calculator.shared_arrays().items():
+        tmp = bundle_dir / f"{name}.{os.getpid()}.npy"
+        np.save(tmp, np.ascontiguousarray(array, dtype=np.float64))
+        tmp.replace(bundle_dir / f"{name}.npy")
+    manifest = {"sources": stamp, "port_names": calculator.port_names}
+    tmp = bundle_dir / f"{BUNDLE_MANIFEST}.{os.getpid()}"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(bundle_dir / BUNDLE_MANIFEST)
+
+
+def read_bundle(bundle_dir: Path, stamp: SourceStamp) -> Optional[TsunamiCalculator]:
+    """Calculator over the memory-mapped bundle, None if missing or stale."""
+    try:
+        manifest = json.loads((bundle_dir / BUNDLE_MANIFEST).read_text())
+        if manifest["sources"] != stamp:
+            return None
+        arrays = {
+            name: np.load(bundle_dir / f"{name}.npy", mmap_mode="r")
+            for name in SHARED_ARRAYS
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    return TsunamiCalculator.from_arrays(arrays, manifest["port_names"])
+
+
+def load_calculator(bundle_dir: Path = MODEL_BUNDLE_DIR) -> TsunamiCalculator:
+    """
+    TsunamiCalculator for in-process use (cli --local). The model data is read
+    from the bundle, which is built from MODEL_DIR on first use or when one of
+    its sources changed.
+    """
+    stamp = source_stamp()
+    calculator = read_bundle(bundle_dir, stamp)
+    if calculator is not None:
+        return calculator
+
+    logger.info(f"Building model data bundle in {bundle_dir}")
+    calculator = TsunamiCalculator()
+    try:
+        write_bundle(calculator, bundle_dir, stamp)
+    except OSError as e:
+        logger.warning(f"Could not save the model data bundle: {e}")
+    return calculator
@@ -1,22 +1,110 @@
 import logging
 import shutil
+import time
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from redis.exceptions import ConnectionError
-from rq import Queue, get_current_job
+from rq import Queue, Worker, get_current_job
 from rq.job import Job
 
-from orchestrator.core.config import MASTER_PIPELINE, MODEL_DIR
-from orchestrator.models.schemas import JobStatus
-from orchestrator.utils.file_utils import setup_workspace
-from orchestrator.utils.processing import process_step
+from orchestrator.core.artifacts import ingest_job
+from orchestrator.core.config import (
+    BATCH_ARCHIVE,
+    BATCH_SOLVER_STEP,
+    BATCH_SOURCE_STEPS,
+    CHECKPOINT_FILE,
+    CHECKPOINT_INTERVAL,
+    CHECKPOINT_STEP,
+    COARSE_GRID_FILES,
+    COARSE_STAGE_DIR,
+    DEFAULT_JOB_MINUTES,
+    DEFORM_ENGINE_STEPS,
+    DURATION_HISTORY,
+    FIGURE_FILES,
+    GAUGE_SAMPLE_INTERVAL,
+    JOB_DURATION_KEY,
+    LAST_INPUT_KEY,
+    LAST_INPUT_TTL,
+    MASTER_PIPELINE,
+    MODEL_DIR,
+    NESTED_GRID_FILES,
+    RESULT_MANIFEST,
+    RESUME_TTL,
+    REUSED_ARTIFACTS,
+    SCENARIO_INPUTS,
+    SCENARIO_OUTPUTS,
+    SCENARIOS_DIR,
+    SUMMARY_FILES,
+    TTT_MUNDO_STEPS,
+)
+from orchestrator.models.schemas import (
+    CalculationResponse,
+    DeformEngine,
+    EarthquakeInput,
+    JobStatus,
+    ProcessingStep,
+    Resolution,
+    Subfault,
+)
+from orchestrator.modules.bathymetry import GRID_BUILDERS, ensure_grid_files
+from orchestrator.modules.fault_plane import write_fault_plane
+from orchestrator.utils.file_utils import (
+    publish_artifacts,
+    setup_workspace,
+    stage_files,
+    validate_files,
+    write_finite_fault,
+    write_manifest,
+    write_run_config,
+    write_scenario_list,
+)
+from orchestrator.utils.processing import (
+    compile_once,
+    process_parallel_steps,
+    process_step,
+)
 from orchestrator.utils.system import check_dependencies
 
 logger = logging.getLogger(__name__)
 
+# Connections of the async Redis client used by the API
+ASYNC_POOL_SIZE = 32
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Steps removed from the pipeline, still accepted in skip_steps and ignored.
+# The fault plane files are written with the workspace (modules/fault_plane.py)
+RETIRED_STEPS: List[str] = ["fault_plane"]
+
+# Grid inputs staged over the default 4 arc-minute files for each resolution
+RESOLUTION_GRID_FILES: Dict[Resolution, Dict[str, str]] = {
+    Resolution.COARSE: COARSE_GRID_FILES,
+    Resolution.NESTED: NESTED_GRID_FILES,
+}
+
+
+def missing_grid_files(resolution: str, model_dir: Optional[Path] = None) -> List[str]:
+    """
+    Grid inputs of a resolution that are not provisioned in the model
+    directory and cannot be built on first use (modules/bathymetry.py).
+    """
+    resolution = Resolution(resolution)
+    grid_files = (
+        COARSE_GRID_FILES
+        if resolution == Resolution.COARSE_THEN_FINE
+        else RESOLUTION_GRID_FILES.get(resolution, {})
+    )
+    model_dir = model_dir or REPO_ROOT / MODEL_DIR
+    return [
+        src
+        for src in grid_files
+        if src not in GRID_BUILDERS and not (model_dir / src).exists()
+    ]
+
 
 def _update_job_metadata(job: Optional[Job], details: str, **kwargs) -> None:
     if job:
@@ -24,68 +112,384 @@ def _update_job_metadata(job: Optional[Job], details: str, **kwargs) -> None:
         job.save_meta()
 
 
-def _validate_skip_steps(skip_steps: List[str]) -> None:
+def _record_duration(job: Optional[Job], kind: str, started: float) -> None:
+    """Keep the duration of a finished job for the estimates of admission control"""
+    if job:
+        key = JOB_DURATION_KEY.format(kind)
+        with job.connection.pipeline() as pipeline:
+            pipeline.lpush(key, f"{(time.monotonic() - started) / 60.0:.2f}")
+            pipeline.ltrim(key, 0, DURATION_HISTORY - 1)
+            pipeline.execute()
+
+
+def _validate_skip_steps(skip_steps: List[str]) -> List[str]:
+    """Check the step names, dropping the retired ones that are still accepted."""
     all_step_names = [step.name for step in MASTER_PIPELINE]
-    invalid = set(skip_steps) - set(all_step_names)
+    invalid = set(skip_steps) - set(all_step_names) - set(RETIRED_STEPS)
     if invalid:
         raise ValueError(f"Invalid skip steps: {invalid}")
+    return [name for name in skip_steps if name not in RETIRED_STEPS]
+
+
+def _has_checkpoint(work_dir: Path) -> bool:
+    return (work_dir / CHECKPOINT_FILE).exists()
+
+
+def _checkpoint_files(job_work_dir: Path) -> List[Path]:
+    """Checkpoints of the job root and of its coarse stage directory."""
+    return [
+        *job_work_dir.glob(CHECKPOINT_FILE),
+        *job_work_dir.glob(f"*/{CHECKPOINT_FILE}"),
+    ]
+
+
+def _find_checkpoints(job_work_dir: Path) -> bool:
+    return bool(_checkpoint_files(job_work_dir))
+
+
+def prune_resume_workspaces(
+    jobs_dir: Path, keep: Optional[str] = None, max_age: float = RESUME_TTL
+) -> None:
+    """
+    Remove the workspaces kept to resume failed jobs once their newest
+    checkpoint is older than max_age seconds, like the failed job itself.
+    Running jobs refresh their checkpoint every CHECKPOINT_INTERVAL.
+    """
+    if not jobs_dir.exists():
+        return
+    now = time.time()
+    for job_dir in jobs_dir.iterdir():
+        if job_dir.name == keep or not job_dir.is_dir():
+            continue
+        checkpoints = _checkpoint_files(job_dir)
+        if checkpoints and now - max(c.stat().st_mtime for c in checkpoints) > max_age:
+            logger.info(f"Removing expired resume workspace {job_dir}")
+            shutil.rmtree(job_dir, ignore_errors=True)
 
 
-def execute_tsdhn_commands(job_id: str, skip_steps: Optional[List[str]] = None) -> Dict:
+def _resume_skip_steps(work_dir: Path) -> List[str]:
+    """Steps already done when the tsunami step left a checkpoint in work_dir."""
+    if not _has_checkpoint(work_dir):
+        return []
+    step_names = [step.name for step in MASTER_PIPELINE]
+    return step_names[: step_names.index(CHECKPOINT_STEP)]
+
+
+def _with_deform_engine(
+    steps: List[ProcessingStep], deform_engine: DeformEngine
+) -> List[ProcessingStep]:
+    """Swap the def_oka.f deform step for the one of the selected engine."""
+    engine_step = DEFORM_ENGINE_STEPS.get(deform_engine)
+    if engine_step is None:
+        return steps
+    return [engine_step if step.name == engine_step.name else step for step in steps]
+
+
+def _run_pipeline(
+    job: Optional[Job],
+    work_dir: Path,
+    skip_steps: List[str],
+    stage: str,
+    deform_engine: DeformEngine = DeformEngine.FORTRAN,
+) -> None:
+    # Parallel steps are held until the next sequential step (or the end)
+    parallel: List[Tuple[ProcessingStep, Path]] = []
+
+    def flush_parallel() -> None:
+        if parallel:
+            names = ", ".join(step.name for step, _ in parallel)
+            _update_job_metadata(job, f"Processing {names} ({stage})")
+            process_parallel_steps(parallel)
+            parallel.clear()
+
+    for step in _with_deform_engine(MASTER_PIPELINE, deform_engine):
+        if step.name in skip_steps:
+            logger.info(f"Skipping step: {step.name}")
+            continue
+
+        step_dir = work_dir / step.working_dir if step.working_dir else work_dir
+        step_dir.mkdir(parents=True, exist_ok=True)
+
+        if step.parallel:
+            parallel.append((step, step_dir))
+            continue
+
+        flush_parallel()
+        _update_job_metadata(job, f"Processing {step.name} ({stage})")
+        process_step(step, step_dir)
+    flush_parallel()
+
+
+def _prepare_workspace(
+    base_model_dir: Path,
+    work_dir: Path,
+    cfl_safety: float,
+    simulation_hours: float,
+    grid_files: Dict[str, str],
+    earthquake: Optional[Dict] = None,
+    calculation: Optional[Dict] = None,
+    finite_fault: Optional[List[Dict]] = None,
+) -> None:
+    ensure_grid_files(grid_files, base_model_dir)
+    setup_workspace(base_model_dir, work_dir)
+    if grid_files:
+        stage_files(work_dir, grid_files)
+    if earthquake and calculation:
+        write_fault_plane(
+            work_dir, EarthquakeInput(**earthquake), CalculationResponse(**calculation)
+        )
+    if finite_fault:
+        write_finite_fault(work_dir, [Subfault(**f) for f in finite_fault])
+    write_run_config(
+        work_dir,
+        cfl_safety,
+        simulation_hours,
+        GAUGE_SAMPLE_INTERVAL,
+        CHECKPOINT_INTERVAL,
+    )
+
+
+def execute_tsdhn_commands(
+    job_id: str,
+    earthquake: Dict,
+    calculation: Dict,
+    skip_steps: Optional[List[str]] = None,
+    cfl_safety: float = 0.8,
+    simulation_hours: float = 28.0,
+    resolution: str = Resolution.FINE.value,
+    deform_engine: str = DeformEngine.FORTRAN.value,
+    finite_fault: Optional[List[Dict]] = None,
+) -> Dict:
     job = get_current_job()
+    started = time.monotonic()
     job_work_dir: Optional[Path] = None
-    skip_steps = skip_steps or []
-    _validate_skip_steps(skip_steps)
+    skip_steps = _validate_skip_steps(skip_steps or [])
+    resolution = Resolution(resolution)
+    # Only the numpy engine sums the subfaults of a finite-fault source
+    deform_engine = DeformEngine.NUMPY if finite_fault else DeformEngine(deform_engine)
 
     try:
         _update_job_metadata(
             job, "Initializing environment", status=JobStatus.RUNNING.value
         )
-        logger.info(f"Starting TSDHN execution for job {job_id}")
+        logger.info(f"Starting TSDHN execution for job {job_id} ({resolution.value})")
 
         check_dependencies()
+        prune_resume_workspaces(REPO_ROOT / "jobs", keep=job_id)
 
         # Setup workspace
-        repo_root = Path(__file__).resolve().parent.parent.parent
-        base_model_dir = repo_root / MODEL_DIR
-        job_work_dir = repo_root / "jobs" / job_id
-        setup_workspace(base_model_dir, job_work_dir)
-
-        # Process all steps in single loop
-        for step in MASTER_PIPELINE:
-            if step.name in skip_steps:
-                logger.info(f"Skipping step: {step.name}")
-                continue
+        base_model_dir = REPO_ROOT / MODEL_DIR
+        job_work_dir = REPO_ROOT / "jobs" / job_id
+
+        # A failed or requeued job keeps its workspace when the tsunami step
+        # left a checkpoint, the run continues from it
+        if _find_checkpoints(job_work_dir):
+            logger.info(f"Resuming job {job_id} from checkpoint")
+            _update_job_metadata(job, "Resuming from checkpoint")
+        else:
+            _prepare_workspace(
+                base_model_dir,
+                job_work_dir,
+                cfl_safety,
+                simulation_hours,
+                RESOLUTION_GRID_FILES.get(resolution, {}),
+                earthquake,
+                calculation,
+                finite_fault,
+            )
+
+        if resolution == Resolution.COARSE_THEN_FINE:
+            # Fast pass on the 5 arc-minute grid in its own directory, served as
+            # preliminary results while the fine run continues in the job root.
+            # A checkpoint in the job root means the fine stage had already started
+            coarse_dir = job_work_dir / COARSE_STAGE_DIR
+            if not _has_checkpoint(job_work_dir):
+                if not _has_checkpoint(coarse_dir):
+                    _prepare_workspace(
+                        base_model_dir,
+                        coarse_dir,
+                        cfl_safety,
+                        simulation_hours,
+                        COARSE_GRID_FILES,
+                        earthquake,
+                        calculation,
+                        finite_fault,
+                    )
+                _run_pipeline(
+                    job,
+                    coarse_dir,
+                    skip_steps + _resume_skip_steps(coarse_dir),
+                    stage="coarse",
+                    deform_engine=deform_engine,
+                )
+                publish_artifacts(coarse_dir, job_work_dir, REUSED_ARTIFACTS)
+                _update_job_metadata(
+                    job,
+                    "Preliminary results available",
+                    preliminary=True,
+                    resolution=Resolution.COARSE.value,
+                    download_url=f"/job-result/{job_id}",
+                )
 
-            step_dir = (
-                job_work_dir / step.working_dir if step.working_dir else job_work_dir
+            # The travel time map does not depend on the grid, reuse it
+            skip_steps = skip_steps + [step.name for step in TTT_MUNDO_STEPS]
+            _run_pipeline(
+                job,
+                job_work_dir,
+                skip_steps + _resume_skip_steps(job_work_dir),
+                stage="fine",
+                deform_engine=deform_engine,
+            )
+        else:
+            _run_pipeline(
+                job,
+                job_work_dir,
+                skip_steps + _resume_skip_steps(job_work_dir),
+                stage=resolution.value,
+                deform_engine=deform_engine,
             )
-            step_dir.mkdir(parents=True, exist_ok=True)
 
-            _update_job_metadata(job, f"Processing {step.name}")
-            process_step(step, step_dir)
+        # Numeric outputs go to the artifact store, the job still succeeds
+        # if they cannot be stored
+        _update_job_metadata(job, "Storing outputs")
+        try:
+            ingest_job(job_id, job_work_dir)
+        except Exception as e:
+            logger.warning(f"Artifact store failed for {job_id}: {str(e)}")
 
+        write_manifest(
+            job_work_dir,
+            RESULT_MANIFEST,
+            ["reporte.pdf", *SUMMARY_FILES, *FIGURE_FILES],
+        )
+        _record_duration(job, resolution.value, started)
         result = {
             "status": JobStatus.COMPLETED.value,
             "job_id": job_id,
             "download_url": f"/job-result/{job_id}",
         }
-        _update_job_metadata(job, "Completed successfully", **result)
+        _update_job_metadata(
+            job,
+            "Completed successfully",
+            preliminary=False,
+            resumable=False,
+            resolution=(
+                Resolution.FINE.value
+                if resolution == Resolution.COARSE_THEN_FINE
+                else resolution.value
+            ),
+            **result,
+        )
         return result
 
     except Exception as e:
         logger.exception(f"Job {job_id} failed: {str(e)}")
+        # Coarse results already published stay available
+        resumable = bool(job_work_dir) and _find_checkpoints(job_work_dir)
         _update_job_metadata(
             job,
             f"Failed: {str(e)}",
             status=JobStatus.FAILED.value,
+            resumable=resumable,
             error=f"{type(e).__name__}: {str(e)}",
         )
-        if job_work_dir and job_work_dir.exists():
+        if resumable:
+            logger.info(f"Keeping {job_work_dir} to resume from checkpoint")
+        elif job_work_dir and job_work_dir.exists():
             shutil.rmtree(job_work_dir, ignore_errors=True)
         raise RuntimeError(f"Job failed: {str(e)}") from e
 
 
+def execute_tsdhn_batch(
+    job_id: str,
+    scenarios: List[Dict],
+    cfl_safety: float = 0.8,
+    simulation_hours: float = 28.0,
+    resolution: str = Resolution.FINE.value,
+    deform_engine: str = DeformEngine.FORTRAN.value,
+) -> Dict:
+    job = get_current_job()
+    started = time.monotonic()
+    job_work_dir: Optional[Path] = None
+    resolution = Resolution(resolution)
+    source_steps = _with_deform_engine(BATCH_SOURCE_STEPS, DeformEngine(deform_engine))
+
+    try:
+        _update_job_metadata(
+            job, "Initializing environment", status=JobStatus.RUNNING.value
+        )
+        logger.info(f"Starting TSDHN batch {job_id} with {len(scenarios)} scenarios")
+
+        check_dependencies()
+
+        job_work_dir = REPO_ROOT / "jobs" / job_id
+        _prepare_workspace(
+            REPO_ROOT / MODEL_DIR,
+            job_work_dir,
+            cfl_safety,
+            simulation_hours,
+            RESOLUTION_GRID_FILES.get(resolution, {}),
+        )
+
+        # Sources are cheap, compute them one by one in the job root from the
+        # hypocenter and rupture of each scenario, and keep the inputs of the
+        # solver in each scenario directory. def_oka.f is compiled only once
+        source_steps = compile_once(source_steps, job_work_dir)
+        scenario_dirs = []
+        for index, scenario in enumerate(scenarios, start=1):
+            _update_job_metadata(job, f"Preparing scenario {index}/{len(scenarios)}")
+            scenario_dir = job_work_dir / SCENARIOS_DIR / f"{index:03d}"
+            (scenario_dir / "zfolder").mkdir(parents=True, exist_ok=True)
+            write_fault_plane(
+                job_work_dir,
+                EarthquakeInput(**scenario["earthquake"]),
+                CalculationResponse(**scenario["calculation"]),
+            )
+            for step in source_steps:
+                process_step(step, job_work_dir)
+            for name in SCENARIO_INPUTS:
+                shutil.move(job_work_dir / name, scenario_dir / name)
+            scenario_dirs.append(scenario_dir)
+
+        write_scenario_list(job_work_dir, scenario_dirs)
+        _update_job_metadata(job, f"Processing {BATCH_SOLVER_STEP.name}")
+        process_step(BATCH_SOLVER_STEP, job_work_dir)
+        for scenario_dir in scenario_dirs:
+            validate_files(
+                scenario_dir,
+                [(name, "Scenario output missing") for name in SCENARIO_OUTPUTS],
+            )
+
+        shutil.make_archive(
+            str(job_work_dir / Path(BATCH_ARCHIVE).stem),
+            "zip",
+            root_dir=job_work_dir,
+            base_dir=SCENARIOS_DIR,
+        )
+        write_manifest(job_work_dir, RESULT_MANIFEST, [BATCH_ARCHIVE])
+        _record_duration(job, "batch", started)
+
+        result = {
+            "status": JobStatus.COMPLETED.value,
+            "job_id": job_id,
+            "download_url": f"/job-result/{job_id}",
+        }
+        _update_job_metadata(job, "Completed successfully", **result)
+        return result
+
+    except Exception as e:
+        logger.exception(f"Batch {job_id} failed: {str(e)}")
+        _update_job_metadata(
+            job,
+            f"Failed: {str(e)}",
+            status=JobStatus.FAILED.value,
+            error=f"{type(e).__name__}: {str(e)}",
+        )
+        if job_work_dir and job_work_dir.exists():
+            shutil.rmtree(job_work_dir, ignore_errors=True)
+        raise RuntimeError(f"Batch failed: {str(e)}") from e
+
+
 class TSDHNJob:
     def __init__(
         self, redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
@@ -98,22 +502,53 @@ class TSDHNJob:
             socket_keepalive=True,
         )
         self.queue = Queue("tsdhn_queue", connection=self.redis)
+        # Status reads of the API, pooled and without blocking the event loop
+        self.async_redis = AsyncRedis(
+            host=redis_host,
+            port=redis_port,
+            db=redis_db,
+            socket_connect_timeout=5,
+            socket_keepalive=True,
+            max_connections=ASYNC_POOL_SIZE,
+        )
 
-    def enqueue_job(self, skip_steps: Optional[List[str]] = None) -> str:
-        skip_steps = skip_steps or []
-        _validate_skip_steps(skip_steps)
+    def enqueue_job(
+        self,
+        earthquake: Dict,
+        calculation: Dict,
+        skip_steps: Optional[List[str]] = None,
+        cfl_safety: float = 0.8,
+        simulation_hours: float = 28.0,
+        resolution: str = Resolution.FINE.value,
+        deform_engine: str = DeformEngine.FORTRAN.value,
+        finite_fault: Optional[List[Dict]] = None,
+        job_id: Optional[str] = None,
+    ) -> str:
+        skip_steps = _validate_skip_steps(skip_steps or [])
         try:
-            job_id = str(uuid.uuid4())
+            job_id = job_id or str(uuid.uuid4())
             self.queue.enqueue(
                 execute_tsdhn_commands,
                 job_id,
+                earthquake=earthquake,
+                calculation=calculation,
                 skip_steps=skip_steps,
+                cfl_safety=cfl_safety,
+                simulation_hours=simulation_hours,
+                resolution=resolution,
+                deform_engine=deform_engine,
+                finite_fault=finite_fault,
                 job_id=job_id,
                 job_timeout="2h",
                 result_ttl=86400,
+                failure_ttl=RESUME_TTL,
                 meta={
                     "status": JobStatus.QUEUED.value,
                     "details": "Waiting in queue",
+                    "deform_engine": (
+                        DeformEngine.NUMPY.value if finite_fault else deform_engine
+                    ),
+                    "subfaults": len(finite_fault) if finite_fault else None,
                 },
             )
             return job_id
@@ -124,28 +559,173 @@ class TSDHNJob:
             logger.exception("Job enqueue failed")
             raise RuntimeError(f"Enqueue failed: {str(e)}") from e
 
+    def enqueue_batch_job(
+        self,
+        scenarios: List[Dict],
+        cfl_safety: float = 0.8,
+        simulation_hours: float = 28.0,
+        resolution: str = Resolution.FINE.value,
+        deform_engine: str = DeformEngine.FORTRAN.value,
+        job_id: Optional[str] = None,
+    ) -> str:
+        try:
+            job_id = job_id or str(uuid.uuid4())
+            self.queue.enqueue(
+                execute_tsdhn_batch,
+                job_id,
+                scenarios=scenarios,
+                cfl_safety=cfl_safety,
+                simulation_hours=simulation_hours,
+                resolution=resolution,
+                deform_engine=deform_engine,
+                job_id=job_id,
+                job_timeout="6h",
+                result_ttl=86400,
+                meta={
+                    "status": JobStatus.QUEUED.value,
+                    "details": "Waiting in queue",
+                    "job_type": "batch",
+                    "scenarios": len(scenarios),
+                    "deform_engine": deform_engine,
+                },
+            )
+            return job_id
+        except ConnectionError as e:
+            logger.error("Redis connection failed: %s", e)
+            raise RuntimeError("Could not connect to job queue") from e
+        except Exception as e:
+            logger.exception("Batch enqueue failed")
+            raise RuntimeError(f"Enqueue failed: {str(e)}") from e
+
+    def resume_job(self, job_id: str) -> None:
+        """
+        Requeue a failed job that left a tsunami checkpoint behind. The
+        checkpoint is looked up on disk, a worker killed mid-run never gets to
+        record it in the job metadata.
+        """
+        try:
+            job = Job.fetch(job_id, connection=self.redis)
+        except Exception as e:
+            raise ValueError(f"Invalid job ID: {str(e)}") from e
+
+        if job.get_status() != "failed":
+            raise ValueError(f"Job {job_id} has not failed")
+        if not _find_checkpoints(REPO_ROOT / "jobs" / job_id):
+            raise ValueError(f"Job {job_id} has no checkpoint to resume from")
+
+        try:
+            job.meta.update(
+                {
+                    "status": JobStatus.QUEUED.value,
+                    "details": "Waiting in queue (resume)",
+                    "error": None,
+                }
+            )
+            job.save_meta()
+            job.requeue()
+        except ConnectionError as e:
+            logger.error("Redis connection failed: %s", e)
+            raise RuntimeError("Could not connect to job queue") from e
+
+    def queue_load(self) -> Dict:
+        """
+        Queued and running jobs, listening workers and the mean of the recent
+        durations (minutes) of each kind of job, DEFAULT_JOB_MINUTES without
+        history. Jobs already in the queue count with the mean of all kinds.
+        """
+        kinds = list(DEFAULT_JOB_MINUTES)
+        with self.redis.pipeline() as pipeline:
+            for kind in kinds:
+                pipeline.lrange(JOB_DURATION_KEY.format(kind), 0, -1)
+            history = [[float(v) for v in values] for values in pipeline.execute()]
+
+        minutes = {
+            kind: sum(values) / len(values) if values else DEFAULT_JOB_MINUTES[kind]
+            for kind, values in zip(kinds, history, strict=True)
+        }
+        pooled = [v for values in history for v in values]
+        return {
+            "queued": self.queue.count,
+            "running": self.queue.started_job_registry.count,
+            "workers": Worker.count(queue=self.queue),
+            "minutes": minutes,
+            "queued_minutes": (
+                sum(pooled) / len(pooled) if pooled else DEFAULT_JOB_MINUTES["fine"]
+            ),
+        }
+
+    @staticmethod
+    def _job_status(job: Job) -> Dict:
+        status_map = {
+            "queued": JobStatus.QUEUED.value,
+            "started": JobStatus.RUNNING.value,
+            "finished": JobStatus.COMPLETED.value,
+            "failed": JobStatus.FAILED.value,
+        }
+
+        return {
+            "status": status_map.get(
+                job.get_status(refresh=False), JobStatus.QUEUED.value
+            ),
+            "details": job.meta.get("details"),
+            "error": job.meta.get("error"),
+            "download_url": job.meta.get("download_url"),
+            "preliminary": job.meta.get("preliminary", False),
+            "resolution": job.meta.get("resolution"),
+            "resumable": job.meta.get("resumable", False),
+            "job_type": job.meta.get("job_type", "single"),
+            "scenarios": job.meta.get("scenarios", 1),
+            "deform_engine": job.meta.get("deform_engine", DeformEngine.FORTRAN.value),
+            "subfaults": job.meta.get("subfaults"),
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "ended_at": job.ended_at.isoformat() if job.ended_at else None,
+        }
+
     def get_job_status(self, job_id: str) -> Dict:
         try:
             job = Job.fetch(job_id, connection=self.redis)
-            status_map = {
-                "queued": JobStatus.QUEUED.value,
-                "started": JobStatus.RUNNING.value,
-                "finished": JobStatus.COMPLETED.value,
-                "failed": JobStatus.FAILED.value,
-            }
-
-            return {
-                "status": status_map.get(job.get_status(), JobStatus.QUEUED.value),
-                "details": job.meta.get("details"),
-                "error": job.meta.get("error"),
-                "download_url": job.meta.get("download_url"),
-                "created_at": job.created_at.isoformat() if job.created_at else None,
-                "started_at": job.started_at.isoformat() if job.started_at else None,
-                "ended_at": job.ended_at.isoformat() if job.ended_at else None,
-            }
+            return self._job_status(job)
         except Exception as e:
             logger.exception(f"Status check failed for {job_id}")
             raise ValueError(f"Invalid job ID: {str(e)}") from e
 
+    async def fetch_job_statuses(self, job_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Status of several jobs from a single pipelined round trip on the async
+        client. Unknown ids map to None.
+        """
+        async with self.async_redis.pipeline(transaction=False) as pipeline:
+            for job_id in job_ids:
+                pipeline.hgetall(Job.key_for(job_id))
+            hashes = await pipeline.execute()
+
+        statuses = {}
+        for job_id, raw in zip(job_ids, hashes, strict=True):
+            if not raw:
+                statuses[job_id] = None
+                continue
+            job = Job(job_id, connection=self.redis)
+            job.restore(raw)
+            statuses[job_id] = self._job_status(job)
+        return statuses
+
+    async def save_last_input(self, client: str, data: EarthquakeInput) -> None:
+        """Hypocenter of the last calculation of a client, see load_last_input."""
+        await self.async_redis.set(
+            LAST_INPUT_KEY.format(client), data.model_dump_json(), ex=LAST_INPUT_TTL
+        )
+
+    async def load_last_input(self, client: str) -> Optional[EarthquakeInput]:
+        """Hypocenter used by /run-tsdhn when the request of a client has none."""
+        raw = await self.async_redis.get(LAST_INPUT_KEY.format(client))
+        return EarthquakeInput.model_validate_json(raw) if raw else None
+
+    async def fetch_job_status(self, job_id: str) -> Dict:
+        status = (await self.fetch_job_statuses([job_id]))[job_id]
+        if status is None:
+            raise ValueError(f"Invalid job ID: {job_id}")
+        return status
+
 
 tsdhn_queue = TSDHNJob()
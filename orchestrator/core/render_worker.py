@@ -0,0 +1,47 @@
+"""
+Render service: an rq worker that keeps GMT loaded between figures.
+
+Start one worker per figure of a job next to the TSDHN worker (poe render):
+
+    rq worker-pool -n 3 -w orchestrator.core.render_worker.RenderWorker render_queue
+
+Unlike the default worker it does not fork a work horse per job, so pygmt,
+the GMT library and the cached palettes and coastline layers stay in memory.
+"""
+
+import logging
+
+from rq import SimpleWorker
+
+from orchestrator.utils.render_pool import isolate_gmt_session
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """Load GMT and build the render assets shared by every job."""
+    # Imported here, after the GMT session name is set: pygmt begins a modern
+    # mode session on import
+    import pygmt
+
+    from orchestrator.modules.maxola import HGT_CPT
+    from orchestrator.modules.point_ttt import TOPO_CPT, TTT_COAST
+    from orchestrator.modules.render_assets import get_coast_layer, get_cpt
+
+    get_cpt(HGT_CPT)
+    get_cpt(TOPO_CPT)
+    get_coast_layer(TTT_COAST)
+
+    # First figure loads the PostScript and font machinery of GMT
+    fig = pygmt.Figure()
+    fig.basemap(region=[0, 1, 0, 1], projection="X1c", frame=True)
+    logger.info("Render service ready")
+
+
+class RenderWorker(SimpleWorker):
+    """Runs figure jobs in its own process, with a warm GMT session."""
+
+    def __init__(self, *args, **kwargs):
+        isolate_gmt_session()
+        super().__init__(*args, **kwargs)
+        warm_up()
@@ -1,29 +1,90 @@
 import logging
+import sqlite3
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
 
 import anyio
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
+from redis.exceptions import RedisError
 
+from orchestrator.core import artifacts
 from orchestrator.core.calculator import TsunamiCalculator
-from orchestrator.core.config import LOGGING_CONFIG
-from orchestrator.core.queue import JobStatus, tsdhn_queue
+from orchestrator.core.calculator_pool import CalculatorPool
+from orchestrator.core.config import (
+    BATCH_ARCHIVE,
+    CALCULATOR_WORKERS,
+    COARSE_STAGE_DIR,
+    FIGURE_FILES,
+    IMMUTABLE_CACHE_CONTROL,
+    LOGGING_CONFIG,
+    RESULT_MANIFEST,
+    SUMMARY_FILES,
+)
+from orchestrator.core.queue import JobStatus, missing_grid_files, tsdhn_queue
 from orchestrator.models.schemas import (
+    AssessRequest,
+    AssessResponse,
     CalculationResponse,
     EarthquakeInput,
+    JobStatusBatchRequest,
+    RunTSDHNBatchRequest,
     RunTSDHNRequest,
+    SimilarEvent,
     TsunamiTravelResponse,
 )
-from orchestrator.utils.job_validators import secure_path_construction, validate_job_id
+from orchestrator.utils.admission import admit, client_id, release_slot
+from orchestrator.utils.file_utils import read_manifest
+from orchestrator.utils.job_validators import (
+    secure_path_construction,
+    validate_job_id,
+    validate_job_id_format,
+)
 
 # Configure logging
 logging.basicConfig(**LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="TSDHN API", version="0.1.0", docs_url="/api-docs", redoc_url=None)
+# Initialize services. The calculator loads the model data at startup and not
+# on import: the spawned workers of the calculator pool import this module
+# again and only attach to the shared copy of the data
+calculator: Optional[TsunamiCalculator] = None
+calculator_pool: Optional[CalculatorPool] = None
+
+
+def get_calculator() -> TsunamiCalculator:
+    global calculator
+    if calculator is None:
+        calculator = TsunamiCalculator()
+    return calculator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global calculator_pool
+    get_calculator()
+    if CALCULATOR_WORKERS > 0:
+        calculator_pool = CalculatorPool(calculator, CALCULATOR_WORKERS)
+    try:
+        yield
+    finally:
+        if calculator_pool is not None:
+            calculator_pool.close()
+            calculator_pool = None
+
+
+app = FastAPI(
+    title="TSDHN API",
+    version="0.1.0",
+    docs_url="/api-docs",
+    redoc_url=None,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,12 +94,49 @@ app.add_middleware(
     allow_headers=["Content-Type"],
 )
 
-# Initialize services
-calculator = TsunamiCalculator()
+
+async def run_calculator(method: str, data: EarthquakeInput):
+    """
+    Run a TsunamiCalculator method on the calculator pool when one is
+    configured (CALCULATOR_WORKERS), otherwise in a worker thread.
+    """
+    if calculator_pool is not None:
+        return await calculator_pool.run(method, data)
+    return await anyio.to_thread.run_sync(getattr(get_calculator(), method), data)
+
+
+async def find_similar_events(
+    data: EarthquakeInput, calculation: CalculationResponse
+) -> List[SimilarEvent]:
+    """
+    Closest archived scenarios to the event. The archive is only a shortcut
+    while the new job runs, so a failure to query it is not an error.
+    """
+    source = {
+        "lat": data.lat0,
+        "lon": data.lon0,
+        "depth": data.h,
+        "mw": data.Mw,
+        "strike": calculation.azimuth,
+    }
+    try:
+        events = await anyio.to_thread.run_sync(artifacts.find_similar, source)
+    except (sqlite3.Error, OSError, KeyError) as e:
+        logger.warning(f"Similar event search failed: {str(e)}")
+        return []
+    return [SimilarEvent(**event) for event in events]
+
+
+async def remember_input(client: str, data: EarthquakeInput) -> None:
+    """Keep the hypocenter for a later /run-tsdhn, best effort."""
+    try:
+        await tsdhn_queue.save_last_input(client, data)
+    except RedisError as e:
+        logger.warning(f"Could not store the last input of {client}: {str(e)}")
 
 
 @app.post("/calculate", response_model=CalculationResponse)
-async def calculate_endpoint(data: EarthquakeInput):
+async def calculate_endpoint(data: EarthquakeInput, request: Request):
     """
     Calculate earthquake parameters and assess tsunami risk.
 
@@ -57,15 +155,17 @@ async def calculate_endpoint(data: EarthquakeInput):
             - Tsunami warning
             - Location classification
             - Rectangle parameters and corners
+            - Closest archived scenarios with their arrivals and maxima
     """
     try:
         logger.info(
             "Processing calculation request for earthquake",
             extra={"lat": data.lat0, "lon": data.lon0},
         )
-        return await anyio.to_thread.run_sync(
-            calculator.calculate_earthquake_parameters, data
-        )
+        result = await run_calculator("calculate_earthquake_parameters", data)
+        await remember_input(client_id(request), data)
+        result.similar_events = await find_similar_events(data, result)
+        return result
     except Exception as e:
         logger.exception("Error in calculate_endpoint")
         raise HTTPException(
@@ -89,9 +189,7 @@ async def tsunami_travel_times_endpoint(data: EarthquakeInput):
             "Calculating tsunami travel times",
             extra={"lat": data.lat0, "lon": data.lon0},
         )
-        return await anyio.to_thread.run_sync(
-            calculator.calculate_tsunami_travel_times, data
-        )
+        return await run_calculator("calculate_tsunami_travel_times", data)
     except Exception as e:
         logger.exception("Error in tsunami_travel_times_endpoint")
         raise HTTPException(
@@ -99,8 +197,77 @@ async def tsunami_travel_times_endpoint(data: EarthquakeInput):
         ) from e
 
 
+def require_grid_files(resolution: str) -> None:
+    """Respond 503 when the grid files of a resolution are not provisioned."""
+    missing = missing_grid_files(resolution)
+    if missing:
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                f"Resolution {resolution} is not available on this server, "
+                f"missing {', '.join(missing)}"
+            ),
+        )
+
+
+async def enqueue_tsdhn(
+    payload: RunTSDHNRequest,
+    data: EarthquakeInput,
+    calculation: CalculationResponse,
+    client: str,
+) -> Dict:
+    """Admit and enqueue the TSDHN job of an event, see /run-tsdhn."""
+    require_grid_files(payload.resolution.value)
+    admission = await admit(
+        client, payload.resolution.value, allow_downgrade=payload.allow_downgrade
+    )
+
+    try:
+        logger.info("Enqueueing new TSDHN job")
+        # rq enqueues with the blocking client, keep it off the event loop
+        job_id = await anyio.to_thread.run_sync(
+            partial(
+                tsdhn_queue.enqueue_job,
+                earthquake=data.model_dump(),
+                calculation=calculation.model_dump(exclude={"similar_events"}),
+                skip_steps=payload.skip_steps,
+                cfl_safety=payload.cfl_safety,
+                simulation_hours=payload.simulation_hours,
+                resolution=admission.kind,
+                deform_engine=payload.deform_engine.value,
+                finite_fault=(
+                    payload.finite_fault.model_dump()["subfaults"]
+                    if payload.finite_fault
+                    else None
+                ),
+                job_id=admission.job_id,
+            )
+        )
+    except ValueError as e:
+        await release_slot(client, admission.job_id)
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        await release_slot(client, admission.job_id)
+        logger.exception("Job queuing failed")
+        raise HTTPException(
+            status_code=500, detail="Error starting processing job"
+        ) from e
+
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "message": (
+            "Job queued on the coarse grid due to queue load"
+            if admission.downgraded
+            else "Job queued successfully"
+        ),
+        "resolution": admission.kind,
+        "estimated_wait_minutes": round(admission.wait_minutes),
+    }
+
+
 @app.post("/run-tsdhn")
-async def run_tsdhn_endpoint(payload: RunTSDHNRequest):
+async def run_tsdhn_endpoint(payload: RunTSDHNRequest, request: Request):
     """
     Enqueue a TSDHN model execution job.
 
@@ -113,17 +280,127 @@ async def run_tsdhn_endpoint(payload: RunTSDHNRequest):
             - status: "queued"
             - job_id: Unique identifier for the job
             - message: Status message
+            - resolution: Grid of the run, coarse when downgraded under load
+            - estimated_wait_minutes: Estimated wait before the job starts
+            - similar_events: Closest archived scenarios, available right away
+
+    Responds 429 with Retry-After when the client has too many active jobs or
+    the queue is too long, see utils/admission.py.
     """
+    data = payload.earthquake
+    if data is None:
+        try:
+            data = await tsdhn_queue.load_last_input(client_id(request))
+        except RedisError as e:
+            logger.warning(f"Could not read the last input: {str(e)}")
+    if data is None:
+        raise HTTPException(
+            status_code=400, detail="No earthquake data, call /calculate first"
+        )
+
     try:
-        logger.info("Enqueueing new TSDHN job")
-        job_id = tsdhn_queue.enqueue_job(skip_steps=payload.skip_steps)
+        calculation = await run_calculator("calculate_earthquake_parameters", data)
+    except Exception as e:
+        logger.exception("Job queuing failed")
+        raise HTTPException(
+            status_code=500, detail="Error starting processing job"
+        ) from e
+
+    job = await enqueue_tsdhn(payload, data, calculation, client_id(request))
+    return {**job, "similar_events": await find_similar_events(data, calculation)}
+
+
+@app.post("/assess", response_model=AssessResponse)
+async def assess_endpoint(payload: AssessRequest, request: Request):
+    """
+    Assess an earthquake in a single request: the results of /calculate and
+    /tsunami-travel-times from one pass of the calculator and, with
+    run_tsdhn, the TSDHN job enqueued as by /run-tsdhn.
+
+    Args:
+        payload (AssessRequest): Hypocenter with the fields of /calculate
+            (top level or in earthquake), the options of /run-tsdhn and
+            run_tsdhn
+
+    Returns:
+        AssessResponse: calculation, travel_times and, when enqueued, job
+    """
+    data = payload.earthquake
+    try:
+        logger.info(
+            "Processing assessment request for earthquake",
+            extra={"lat": data.lat0, "lon": data.lon0},
+        )
+        calculation, travel_times = await run_calculator("assess", data)
+        await remember_input(client_id(request), data)
+    except Exception as e:
+        logger.exception("Error in assess_endpoint")
+        raise HTTPException(
+            status_code=500, detail="Error processing calculation"
+        ) from e
+
+    calculation.similar_events = await find_similar_events(data, calculation)
+    job = None
+    if payload.run_tsdhn:
+        job = await enqueue_tsdhn(payload, data, calculation, client_id(request))
+    return AssessResponse(calculation=calculation, travel_times=travel_times, job=job)
+
+
+@app.post("/run-tsdhn-batch")
+async def run_tsdhn_batch_endpoint(payload: RunTSDHNBatchRequest, request: Request):
+    """
+    Enqueue a multi-scenario TSDHN job for drills and ensemble studies.
+
+    All scenarios are advanced in a single pass of the solver over the shared
+    bathymetry. The result is a zip archive with meca.dat, green.dat and
+    zmax_a.grd for every scenario.
+
+    Returns:
+        Dict containing:
+            - status: "queued"
+            - job_id: Unique identifier for the job
+            - message: Status message
+            - estimated_wait_minutes: Estimated wait before the job starts
+
+    Responds 429 with Retry-After under the same admission control as
+    /run-tsdhn, batches are never downgraded.
+    """
+    require_grid_files(payload.resolution.value)
+    client = client_id(request)
+    admission = await admit(client, "batch")
+    try:
+        logger.info(f"Enqueueing TSDHN batch with {len(payload.scenarios)} scenarios")
+        scenarios = []
+        for scenario in payload.scenarios:
+            calculation = await run_calculator(
+                "calculate_earthquake_parameters", scenario
+            )
+            scenarios.append(
+                {
+                    "earthquake": scenario.model_dump(),
+                    "calculation": calculation.model_dump(),
+                }
+            )
+        job_id = await anyio.to_thread.run_sync(
+            partial(
+                tsdhn_queue.enqueue_batch_job,
+                scenarios=scenarios,
+                cfl_safety=payload.cfl_safety,
+                simulation_hours=payload.simulation_hours,
+                resolution=payload.resolution.value,
+                deform_engine=payload.deform_engine.value,
+                job_id=admission.job_id,
+            )
+        )
         return {
             "status": "queued",
             "job_id": job_id,
-            "message": "Job queued successfully",
+            "message": "Batch queued successfully",
+            "estimated_wait_minutes": round(admission.wait_minutes),
         }
     except Exception as e:
-        logger.exception("Job queuing failed")
+        await release_slot(client, admission.job_id)
+        logger.exception("Batch queuing failed")
         raise HTTPException(
             status_code=500, detail="Error starting processing job"
         ) from e
@@ -144,7 +421,7 @@ async def get_job_status_endpoint(job_id: str) -> Dict:
     """
     try:
         logger.debug("Retrieving job status", extra={"job_id": job_id})
-        return tsdhn_queue.get_job_status(job_id)
+        return await tsdhn_queue.fetch_job_status(job_id)
     except Exception as e:
         logger.exception(f"Error checking status for job {job_id}")
         raise HTTPException(
@@ -152,32 +429,180 @@ async def get_job_status_endpoint(job_id: str) -> Dict:
         ) from e
 
 
+@app.post("/job-status:batch")
+async def get_job_status_batch_endpoint(payload: JobStatusBatchRequest) -> Dict:
+    """
+    Status of many jobs with a single Redis round trip, for dashboards.
+
+    Args:
+        payload (JobStatusBatchRequest): Up to 500 job identifiers
+
+    Returns:
+        Dict containing:
+            - jobs: Status of each job, in the format of /job-status/{job_id}
+            - missing: Identifiers without a job
+    """
+    job_ids = list(dict.fromkeys(payload.job_ids))
+    for job_id in job_ids:
+        validate_job_id_format(job_id)
+
+    try:
+        statuses = await tsdhn_queue.fetch_job_statuses(job_ids)
+    except Exception as e:
+        logger.exception(f"Error checking status for {len(job_ids)} jobs")
+        raise HTTPException(
+            status_code=500, detail="Error retrieving job status"
+        ) from e
+    return {
+        "jobs": {job_id: s for job_id, s in statuses.items() if s is not None},
+        "missing": [job_id for job_id, s in statuses.items() if s is None],
+    }
+
+
+@app.post("/job-resume/{job_id}")
+async def resume_job_endpoint(job_id: str):
+    """
+    Requeue a failed job from the latest checkpoint of its tsunami step.
+
+    Args:
+        job_id (str): The job identifier returned by /run-tsdhn
+
+    Returns:
+        Dict containing:
+            - status: "queued"
+            - job_id: The resumed job identifier
+            - message: Status message
+    """
+    await validate_job_id(job_id)
+
+    try:
+        await anyio.to_thread.run_sync(tsdhn_queue.resume_job, job_id)
+        return {
+            "status": "queued",
+            "job_id": job_id,
+            "message": "Job resumed from checkpoint",
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except Exception as e:
+        logger.exception(f"Error resuming job {job_id}")
+        raise HTTPException(status_code=500, detail="Error resuming job") from e
+
+
+def _matches_etag(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+def _result_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    etag: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> Response:
+    """
+    Serve a job output. Final outputs (etag from the result manifest) are
+    immutable and answered with 304 when the client already holds them;
+    preliminary ones must be revalidated. Range requests are handled by
+    FileResponse.
+    """
+    if etag is None:
+        return FileResponse(
+            path=path,
+            filename=filename,
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _matches_etag(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path=path, filename=filename, media_type=media_type, headers=headers
+    )
+
+
+def _results_dir(job_dir: Path, status: Dict) -> Path:
+    """
+    Directory of the outputs served for a job: the coarse stage while its
+    results are the preliminary ones, the fine stage writes the job root.
+    """
+    return job_dir / COARSE_STAGE_DIR if status["preliminary"] else job_dir
+
+
+async def _job_status(job_id: str) -> Dict:
+    try:
+        return await tsdhn_queue.fetch_job_status(job_id)
+    except ValueError as e:
+        logger.warning(f"Job not found: {job_id}")
+        raise HTTPException(status_code=404, detail="Job not found") from e
+
+
 @app.get("/job-result/{job_id}")
-async def get_job_result_endpoint(job_id: str):
+async def get_job_result_endpoint(job_id: str, request: Request):
     """
     Args:
         job_id (str): The job identifier returned by /run-tsdhn
 
     Returns:
-        FileResponse: The generated PDF report
+        FileResponse: The generated PDF report. While a coarse_then_fine job is
+        still running this is the preliminary report of the coarse stage.
+        Batch jobs return the zip archive of their scenario outputs.
+        Completed results carry a content ETag, are cacheable as immutable and
+        support If-None-Match and Range requests.
     """
-    validate_job_id(job_id)
+    validate_job_id_format(job_id)
+    job_dir = secure_path_construction(job_id)
 
     try:
-        status = tsdhn_queue.get_job_status(job_id)
-        if status["status"] != JobStatus.COMPLETED.value:
+        # Completed jobs are answered from their manifest, without Redis
+        etags = await anyio.to_thread.run_sync(read_manifest, job_dir, RESULT_MANIFEST)
+        if BATCH_ARCHIVE in etags:
+            return _result_response(
+                request,
+                job_dir / BATCH_ARCHIVE,
+                "application/zip",
+                etags[BATCH_ARCHIVE],
+                f"tsdhn_scenarios_{job_id}.zip",
+            )
+        if "reporte.pdf" in etags:
+            return _result_response(
+                request,
+                job_dir / "reporte.pdf",
+                "application/pdf",
+                etags["reporte.pdf"],
+                f"tsdhn_report_{job_id}.pdf",
+            )
+
+        status = await _job_status(job_id)
+        if status["status"] != JobStatus.COMPLETED.value and not (
+            status["status"] == JobStatus.RUNNING.value and status["preliminary"]
+        ):
             raise HTTPException(status_code=400, detail="Job processing not complete")
 
-        job_dir = secure_path_construction(job_id)
-        report_path = job_dir / "reporte.pdf"
+        if status["job_type"] == "batch":
+            archive_path = job_dir / BATCH_ARCHIVE
+            if not await anyio.to_thread.run_sync(archive_path.exists):
+                raise HTTPException(status_code=404, detail="Archive not available")
+            return _result_response(
+                request,
+                archive_path,
+                "application/zip",
+                filename=f"tsdhn_scenarios_{job_id}.zip",
+            )
+
+        report_path = _results_dir(job_dir, status) / "reporte.pdf"
 
         if not await anyio.to_thread.run_sync(report_path.exists):
             raise HTTPException(status_code=404, detail="Report not available")
 
-        return FileResponse(
-            path=report_path,
+        return _result_response(
+            request,
+            report_path,
+            "application/pdf",
             filename=f"tsdhn_report_{job_id}.pdf",
-            media_type="application/pdf",
         )
 
     except HTTPException:
@@ -189,13 +614,117 @@ async def get_job_result_endpoint(job_id: str):
         ) from e
 
 
+@app.get("/job-result/{job_id}/{filename}")
+async def get_job_summary(job_id: str, filename: str, request: Request):
+    """
+    Retrieve the structured results or a figure of a simulation without
+    waiting for the PDF report.
+
+    Args:
+        job_id (str): The job identifier returned by /run-tsdhn
+        filename (str): summary.json, summary.html or one of the EPS figures
+
+    Returns:
+        FileResponse: Epicenter and arrival time and maximum height at each port,
+        or the figure. Summaries are available as soon as the wave heights are
+        processed; while a coarse_then_fine job is still running these are the
+        preliminary results of the coarse stage.
+    """
+    media_type = SUMMARY_FILES.get(filename) or FIGURE_FILES.get(filename)
+    if media_type is None:
+        raise HTTPException(status_code=404, detail="Unknown result file")
+    validate_job_id_format(job_id)
+
+    job_dir = secure_path_construction(job_id)
+    etags = await anyio.to_thread.run_sync(read_manifest, job_dir, RESULT_MANIFEST)
+    if filename in etags:
+        return _result_response(
+            request, job_dir / filename, media_type, etags[filename]
+        )
+
+    status = await _job_status(job_id)
+    result_path = _results_dir(job_dir, status) / filename
+    if not await anyio.to_thread.run_sync(result_path.exists):
+        raise HTTPException(status_code=404, detail="Result not available yet")
+
+    return _result_response(request, result_path, media_type)
+
+
+@app.get("/artifacts/{job_id}")
+async def get_artifact_entry(job_id: str):
+    """
+    Index entry of the stored outputs of a completed job: epicenter, gauges,
+    number of samples and extent of the zmax grid.
+    """
+    validate_job_id_format(job_id)
+    entry = await anyio.to_thread.run_sync(artifacts.get_entry, job_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No stored outputs for this job")
+    return entry
+
+
+@app.get("/artifacts/{job_id}/gauges")
+async def get_artifact_gauges(
+    job_id: str,
+    gauge: Optional[str] = None,
+    start: Optional[float] = Query(None, description="Minutes after the origin"),
+    end: Optional[float] = Query(None, description="Minutes after the origin"),
+):
+    """
+    Raw (green.dat) and Green's law scaled series of one gauge, or of every
+    gauge, over an optional time window.
+    """
+    validate_job_id_format(job_id)
+    try:
+        return await anyio.to_thread.run_sync(
+            artifacts.read_gauge_series, job_id, gauge, start, end
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@app.get("/artifacts/{job_id}/zmax")
+async def get_artifact_zmax(
+    job_id: str,
+    lat_min: float,
+    lat_max: float,
+    lon_min: float,
+    lon_max: float,
+    stride: int = Query(1, ge=1),
+):
+    """
+    Maximum wave height over a lat/lon window of the model grid (longitudes
+    in 0-360), optionally decimated by stride. Only the chunks covering the
+    window are read.
+    """
+    validate_job_id_format(job_id)
+    try:
+        return await anyio.to_thread.run_sync(
+            artifacts.read_zmax_window,
+            job_id,
+            lat_min,
+            lat_max,
+            lon_min,
+            lon_max,
+            stride,
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 @app.get("/health")
 async def health_check():
+    try:
+        connected = await tsdhn_queue.async_redis.ping()
+    except RedisError:
+        connected = False
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "calculator": "initialized",
-        "queue_status": "connected" if tsdhn_queue.redis.ping() else "disconnected",
+        "calculator": "initialized" if calculator is not None else "not loaded",
+        "queue_status": "connected" if connected else "disconnected",
     }
 
 
@@ -1,9 +1,11 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from orchestrator.utils.finite_fault import parse_usgs_param
 
 
 class JobStatus(Enum):
@@ -13,6 +15,18 @@ class JobStatus(Enum):
     FAILED = "failed"
 
 
+class Resolution(Enum):
+    FINE = "fine"
+    COARSE = "coarse"
+    COARSE_THEN_FINE = "coarse_then_fine"
+    NESTED = "nested"
+
+
+class DeformEngine(Enum):
+    FORTRAN = "fortran"
+    NUMPY = "numpy"
+
+
 class EarthquakeInput(BaseModel):
     Mw: float
     h: float
@@ -34,6 +48,48 @@ class EarthquakeInput(BaseModel):
         return v
 
 
+class Subfault(BaseModel):
+    lon: float
+    lat: float
+    depth: float = Field(ge=0.0)  # km, center of the subfault
+    length: float = Field(gt=0.0)  # km, along strike
+    width: float = Field(gt=0.0)  # km, down dip
+    strike: float
+    dip: float = Field(gt=0.0, le=90.0)
+    rake: float
+    slip: float  # m
+
+
+class FiniteFault(BaseModel):
+    # A list of subfaults, or the text of a USGS .param file in "param"
+    subfaults: List[Subfault] = Field(min_length=1, max_length=2000)
+
+    @model_validator(mode="before")
+    def parse_param(cls, v):
+        if isinstance(v, dict) and "param" in v:
+            return {"subfaults": parse_usgs_param(v["param"])}
+        return v
+
+
+class SimilarStation(BaseModel):
+    port: str
+    arrival_minutes: float
+    max_height: float
+
+
+class SimilarEvent(BaseModel):
+    """Archived scenario close to the requested source, see core/artifacts.py"""
+
+    job_id: str
+    distance: float
+    lat: float
+    lon: float
+    depth: float
+    mw: float
+    strike: float
+    stations: List[SimilarStation]
+
+
 class CalculationResponse(BaseModel):
     length: float
     width: float
@@ -46,6 +102,7 @@ class CalculationResponse(BaseModel):
     epicenter_location: str
     rectangle_parameters: Dict[str, float]
     rectangle_corners: List[Dict[str, float]]
+    similar_events: List[SimilarEvent] = Field(default_factory=list)
 
 
 class TsunamiTravelResponse(BaseModel):
@@ -55,7 +112,69 @@ class TsunamiTravelResponse(BaseModel):
 
 
 class RunTSDHNRequest(BaseModel):
+    # Hypocenter of the event, the last /calculate is used when missing
+    earthquake: Optional[EarthquakeInput] = None
     skip_steps: Optional[List[str]] = None
+    cfl_safety: float = Field(default=0.8, gt=0.0, le=1.0)
+    simulation_hours: float = Field(default=28.0, gt=0.0, le=48.0)
+    resolution: Resolution = Resolution.FINE
+    deform_engine: DeformEngine = DeformEngine.FORTRAN
+    # Replaces the uniform rectangle of the fault plane, deformed with numpy
+    finite_fault: Optional[FiniteFault] = None
+    # Run on the coarse grid instead of refusing the job when the queue is too
+    # long for the requested resolution (utils/admission.py)
+    allow_downgrade: bool = True
+
+    @model_validator(mode="before")
+    def collect_earthquake(cls, v):
+        # Also accept the fields of /calculate at the top level
+        if isinstance(v, dict) and "earthquake" not in v and "Mw" in v:
+            fields = EarthquakeInput.model_fields
+            earthquake = {k: val for k, val in v.items() if k in fields}
+            return {
+                **{k: val for k, val in v.items() if k not in fields},
+                "earthquake": earthquake,
+            }
+        return v
+
+
+class AssessRequest(RunTSDHNRequest):
+    # Also enqueue the TSDHN job, with the options of /run-tsdhn
+    run_tsdhn: bool = False
+
+    @model_validator(mode="after")
+    def require_earthquake(self):
+        if self.earthquake is None:
+            raise ValueError("The earthquake is required")
+        return self
+
+
+class AssessResponse(BaseModel):
+    calculation: CalculationResponse
+    travel_times: TsunamiTravelResponse
+    # Response of /run-tsdhn when the job was enqueued
+    job: Optional[Dict[str, Any]] = None
+
+
+class RunTSDHNBatchRequest(BaseModel):
+    # Every scenario keeps its own state layers in memory, about 140 MB each
+    # on the 4 arc-minute grid
+    scenarios: List[EarthquakeInput] = Field(min_length=1, max_length=16)
+    cfl_safety: float = Field(default=0.8, gt=0.0, le=1.0)
+    simulation_hours: float = Field(default=28.0, gt=0.0, le=48.0)
+    resolution: Resolution = Resolution.FINE
+    deform_engine: DeformEngine = DeformEngine.FORTRAN
+
+    @field_validator("resolution")
+    def validate_resolution(cls, v):
+        if v not in (Resolution.FINE, Resolution.COARSE):
+            raise ValueError("Batch runs use a single grid: fine or coarse")
+        return v
+
+
+class JobStatusBatchRequest(BaseModel):
+    # All hashes are read in one Redis pipeline
+    job_ids: List[str] = Field(min_length=1, max_length=500)
 
 
 @dataclass(frozen=True)
@@ -76,6 +195,10 @@ class ProcessingStep:
     pre_execute_checks: List[Tuple[str, str]] = field(default_factory=list)
     extra_executables: List[str] = field(default_factory=list)
     working_dir: Optional[str] = None
+    # Adjacent parallel steps run together in the render process pool
+    parallel: bool = False
+    # Builds the RenderRequest of a figure step for the render service
+    render_request: Optional[Callable[[Path], Any]] = None
 
     def __post_init__(self):
         if not (self.command is None) ^ (self.python_callable is None):
@@ -0,0 +1,108 @@
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Tuple
+
+import numpy as np
+import pygmt
+
+logger = logging.getLogger(__name__)
+
+# The 5 arc-minute grids are not part of the repository: they are sampled from
+# the GMT remote relief datasets the first time a job needs them and kept in
+# the model directory. The parent nodes are the pixel centers of earth_relief
+# at 5 arc-minutes; the child grid is 3 times finer (100 s), so it is
+# interpolated from the 30 arc-second relief
+PARENT_RELIEF: str = "05m"
+CHILD_RELIEF: str = "30s"
+NEST_RATIO: int = 3
+
+
+def parent_axes(model_dir: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitudes and latitudes of the 5 arc-minute grid (bathy/xa5.dat, ya5.dat)"""
+    return (
+        np.loadtxt(model_dir / "bathy" / "xa5.dat"),
+        np.loadtxt(model_dir / "bathy" / "ya5.dat"),
+    )
+
+
+def child_axes(model_dir: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Longitudes and latitudes of the child grid of nest5.dat, as laid out by
+    tsunami1.for: the parent cell (IS, JS) is split in 3x3 child cells centered
+    on (3*(IS-ISL)+3, 3*(JS-JSL)+3), with one extra boundary row and column.
+    """
+    xa, ya = parent_axes(model_dir)
+    isl, jsl, iel, jel = np.loadtxt(model_dir / "nest5.dat", dtype=int)
+    # Cell size rounded to the arc-second, as DELTA in tsunami1.for
+    step = round((ya[1] - ya[0]) * 3600.0) / 3600.0 / NEST_RATIO
+    ib = NEST_RATIO * (iel - isl + 1) + 1
+    jb = NEST_RATIO * (jel - jsl + 1) + 1
+    return (
+        xa[isl - 1] + (np.arange(ib) - 2) * step,
+        ya[jsl - 1] + (np.arange(jb) - 2) * step,
+    )
+
+
+def sample_depth(lon: np.ndarray, lat: np.ndarray, resolution: str) -> np.ndarray:
+    """
+    Depth in meters (positive in the ocean) at the lon x lat nodes, bilinear in
+    the earth_relief grid of the given resolution.
+    """
+    margin = 2 * abs(lat[1] - lat[0])
+    relief = pygmt.datasets.load_earth_relief(
+        resolution=resolution,
+        region=[
+            lon[0] - margin,
+            lon[-1] + margin,
+            lat[0] - margin,
+            lat[-1] + margin,
+        ],
+        registration="pixel",
+    )
+    depth = -relief.interp(lon=lon, lat=lat, method="linear").transpose("lon", "lat")
+    if np.isnan(depth.values).any():
+        raise ValueError(
+            f"earth_relief_{resolution} does not cover lon {lon[0]:.3f}-{lon[-1]:.3f}"
+            f" lat {lat[0]:.3f}-{lat[-1]:.3f}"
+        )
+    return depth.values
+
+
+def write_grd(path: Path, depth: np.ndarray) -> None:
+    """
+    Write the depths in the layout INPUTA reads (one line per longitude with
+    every latitude), through a temporary file so concurrent jobs never read a
+    partial grid.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}")
+    np.savetxt(tmp, depth, fmt="%.1f")
+    tmp.replace(path)
+
+
+def parent_depth(model_dir: Path) -> np.ndarray:
+    return sample_depth(*parent_axes(model_dir), PARENT_RELIEF)
+
+
+def child_depth(model_dir: Path) -> np.ndarray:
+    return sample_depth(*child_axes(model_dir), CHILD_RELIEF)
+
+
+# Grid inputs built on first use, relative to the model directory
+GRID_BUILDERS: Dict[str, Callable[[Path], np.ndarray]] = {
+    "bathy/grid_a5.grd": parent_depth,
+    "bathy/grid_b5.grd": child_depth,
+}
+
+
+def ensure_grid_files(sources: Iterable[str], model_dir: Path) -> None:
+    """Build the missing grid inputs of sources that can be generated"""
+    for src in sources:
+        path = model_dir / src
+        if src not in GRID_BUILDERS or path.exists():
+            continue
+        logger.info(f"Building {src} from the GMT relief datasets")
+        try:
+            write_grd(path, GRID_BUILDERS[src](model_dir))
+        except Exception as e:
+            raise RuntimeError(f"Could not build {src}: {e}") from e
@@ -0,0 +1,313 @@
+import logging
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Elastic medium and numerical parameters of def_oka.f
+VP: float = 4.82e3  # P-wave velocity (m/s)
+VS: float = 2.78e3  # S-wave velocity (m/s)
+RMU: float = VS * VS / (VP * VP - VS * VS)
+EPS: float = 1.0e-8  # threshold of the singular point checks
+MAX_UPLIFT: float = 20.0  # m, larger displacements are set to zero
+METERS_PER_DEGREE: float = 111194.926644
+FINITE_FAULT_MARGIN: float = 150.0  # km around the subfaults kept in xyo.dat
+BATCH_CELLS: int = 2_000_000  # subfaults x cells evaluated per array operation
+
+
+def _read_fault(working_dir: Path) -> Tuple:
+    """Read the deformation window, the grid size and the fault of pfalla.inp."""
+    try:
+        with open(working_dir / "xyo.dat", "r") as f:
+            ids, ide, jds, jde = (int(v) for v in f.read().split()[:4])
+        with open(working_dir / "bathy" / "ya.dat", "r") as f:
+            ya1, ya2 = (float(f.readline()) for _ in range(2))
+        with open(working_dir / "pfalla.inp", "r") as f:
+            values = f.read().split()
+    except OSError as e:
+        raise FileNotFoundError(f"Missing input for deformation: {e}") from e
+
+    if len(values) < 9:
+        raise ValueError(f"Invalid pfalla.inp format in {working_dir}")
+    i0, j0 = int(values[0]), int(values[1])
+    d0, l0, w0, strike, dip, rake, hh = (float(v) for v in values[2:9])
+    if strike in (0.0, 360.0):
+        strike += 0.001
+
+    # Grid size from the spacing of the bathymetry latitudes, in whole seconds
+    dx = round((ya2 - ya1) * 3600.0) / 3600.0 * METERS_PER_DEGREE
+    window = (ide - ids + 1, jde - jds + 1)
+    origin = (i0 - ids + 1, j0 - jds + 1)
+    return window, origin, dx, (d0, l0, w0, strike, dip, rake, hh)
+
+
+def _chinnery_terms(
+    xi: np.ndarray,
+    et: np.ndarray,
+    q: np.ndarray,
+    cs: np.ndarray,
+    sn: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vertical terms of USTRIKE (FZ) and UDIP (GZ) at one corner of the fault.
+
+    The singular point branches follow def_oka.f, including the R+DH=0 case
+    that only USTRIKE checks.
+    """
+    dh = et * sn - q * cs
+    r = np.sqrt(xi * xi + et * et + q * q)
+    ret = r + et
+    rdh = r + dh
+    xx = np.sqrt(xi * xi + q * q)
+
+    regular = np.abs(ret) >= EPS
+    singular_rdh = ~regular & (np.abs(rdh) < EPS)
+    # log(R+ET) in the regular points, -log(R-ET) where R+ET vanishes
+    log_ret = np.where(regular, np.log(ret), -np.log(r - et))
+    xi_nonzero = np.abs(xi) >= EPS
+
+    # Inclined faults, and the Cos(DIP)=0 branch for vertical ones
+    vertical = np.abs(cs) < EPS
+    cs_safe = np.where(vertical, 1.0, cs)
+    xi4 = np.where(
+        vertical,
+        -RMU * q / rdh,
+        RMU * (np.log(rdh) - sn * log_ret) / cs_safe,
+    )
+    xi4_strike = np.where(
+        singular_rdh,
+        np.where(vertical, 0.0, RMU * (-np.log(r - dh) - sn * log_ret) / cs_safe),
+        xi4,
+    )
+    xi5in = (et * (xx + q * cs) + xx * (r + xx) * sn) / (xi * (r + xx) * cs_safe)
+    xi5 = np.where(
+        xi_nonzero,
+        np.where(
+            vertical,
+            -RMU * xi * sn / rdh,
+            RMU * 2.0 * np.arctan(xi5in) / cs_safe,
+        ),
+        0.0,
+    )
+
+    fz = np.where(regular, dh * q / (r * ret) + q * sn / ret, 0.0) + xi4_strike * sn
+
+    uz1 = np.where(np.abs(r + xi) >= EPS, dh * q / (r * (r + xi)), 0.0)
+    uz2 = np.where(np.abs(q) >= EPS, sn * np.arctan(xi * et / (q * r)), 0.0)
+    gz = uz1 + uz2 - xi5 * sn * cs
+    return fz, gz
+
+
+def okada_vertical_displacement(
+    x: np.ndarray,
+    y: np.ndarray,
+    d0: np.ndarray,
+    l0: np.ndarray,
+    w0: np.ndarray,
+    strike: np.ndarray,
+    dip: np.ndarray,
+    rake: np.ndarray,
+    hh: np.ndarray,
+) -> np.ndarray:
+    """
+    Vertical surface displacement of a rectangular fault, Okada (1985).
+
+    The fault parameters broadcast against x and y, so several faults can be
+    evaluated in one call along a leading axis.
+
+    Args:
+        x, y: Distances (m) to the fault origin along the grid axes. The origin
+            is the surface projection of the first corner of the upper edge.
+        d0: Dislocation (m).
+        l0, w0: Length along strike and width along dip of the fault (m).
+        strike, dip, rake: Fault angles (deg).
+        hh: Depth of the upper edge of the fault (m).
+
+    Returns:
+        Displacement (m) with the shape of x and y.
+    """
+    st = np.radians(90.0 - strike)
+    cs = np.cos(np.radians(dip))
+    sn = np.sin(np.radians(dip))
+    de = hh + w0 * sn
+    dst = d0 * np.cos(np.radians(rake))
+    ddp = d0 * np.sin(np.radians(rake))
+
+    # Coordinates in the fault system
+    xf = x * np.cos(st) + y * np.sin(st)
+    yf = y * np.cos(st) - x * np.sin(st) + w0 * cs
+    p = yf * cs + de * sn
+    q = yf * sn - de * cs
+
+    # Chinnery's notation: f(x, p) - f(x, p-W) - f(x-L, p) + f(x-L, p-W)
+    uz_strike = 0.0
+    uz_dip = 0.0
+    for xi, et, sign in (
+        (xf, p, 1.0),
+        (xf, p - w0, -1.0),
+        (xf - l0, p, -1.0),
+        (xf - l0, p - w0, 1.0),
+    ):
+        fz, gz = _chinnery_terms(xi, et, q, cs, sn)
+        uz_strike = uz_strike + sign * fz
+        uz_dip = uz_dip + sign * gz
+
+    return -(uz_strike * dst + uz_dip * ddp) / (2.0 * np.pi)
+
+
+def _subfault_origins(subfaults: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Okada origin of each subfault of finite_fault.dat (without the id column),
+    given by its center.
+
+    Returns the longitude and latitude of the surface projection of the first
+    corner of the upper edge, and the depth (m) of the upper edge.
+    """
+    lon, lat, depth, length, width, strike, dip = subfaults[:, :7].T
+    st = np.radians(strike)
+    half_length = 0.5 * length * 1000.0
+    half_width = 0.5 * width * 1000.0
+    # Back half the length along strike, then up dip half the projected width
+    east = -half_length * np.sin(st) - half_width * np.cos(np.radians(dip)) * np.cos(st)
+    north = -half_length * np.cos(st) + half_width * np.cos(np.radians(dip)) * np.sin(
+        st
+    )
+    hh = depth * 1000.0 - half_width * np.sin(np.radians(dip))
+    if np.any(hh < 0.0):
+        clipped = ", ".join(str(n) for n in np.flatnonzero(hh < 0.0) + 1)
+        logger.warning(f"Clipping subfaults {clipped} to the surface")
+    return (
+        lon % 360.0 + east / METERS_PER_DEGREE,
+        lat + north / METERS_PER_DEGREE,
+        np.maximum(hh, 0.0),
+    )
+
+
+def compute_finite_fault_deformation(working_dir: Path) -> None:
+    """
+    Sum the deformation of every subfault in finite_fault.dat, write
+    deform_a.grd and the xyo.dat window that covers the whole source.
+
+    Each line of finite_fault.dat is "id lon lat depth length width strike dip
+    rake slip", with the ids numbered 1, 2, ... in file order.
+
+    The subfaults are evaluated in batches along a leading array axis, so the
+    cost is array arithmetic only, without a call per subfault.
+
+    Args:
+        working_dir: Working directory for the job.
+    """
+    try:
+        subfaults = np.loadtxt(working_dir / "finite_fault.dat", ndmin=2)
+        xa = np.loadtxt(working_dir / "bathy" / "xa.dat")
+        ya = np.loadtxt(working_dir / "bathy" / "ya.dat")
+    except OSError as e:
+        raise FileNotFoundError(f"Missing input for deformation: {e}") from e
+    if subfaults.shape[1] < 10:
+        raise ValueError(f"Invalid finite_fault.dat format in {working_dir}")
+    # Ids count from 1 in file order, so the messages match the input
+    numbers = subfaults[:, 0]
+    wrong = np.flatnonzero(numbers != np.arange(1, len(numbers) + 1))
+    if wrong.size:
+        n = int(wrong[0]) + 1
+        raise ValueError(
+            f"Invalid finite_fault.dat in {working_dir}: line {n} has subfault id "
+            f"{numbers[n - 1]:g}, expected {n} (ids count from 1)"
+        )
+    subfaults = subfaults[:, 1:]
+
+    ref_lon, ref_lat, hh = _subfault_origins(subfaults)
+    lon = subfaults[:, 0] % 360.0
+    lat = subfaults[:, 1]
+    # Half diagonal of each subfault around its center, plus the margin
+    reach = 0.5 * np.hypot(subfaults[:, 3], subfaults[:, 4]) + FINITE_FAULT_MARGIN
+    reach = reach * 1000.0 / METERS_PER_DEGREE
+    ids = max(1, int(np.searchsorted(xa, np.min(lon - reach))))
+    ide = min(xa.size, int(np.searchsorted(xa, np.max(lon + reach))))
+    jds = max(1, int(np.searchsorted(ya, np.min(lat - reach))))
+    jde = min(ya.size, int(np.searchsorted(ya, np.max(lat + reach))))
+    if ids >= ide or jds >= jde:
+        raise ValueError("The finite-fault source is outside the computational grid")
+    ia, ja = ide - ids + 1, jde - jds + 1
+    logger.info(
+        f"Computing Okada deformation of {len(subfaults)} subfaults "
+        f"on a {ia}x{ja} window"
+    )
+
+    # Distances (m) of every cell to every subfault origin: (subfault, i, j)
+    x_cells = xa[ids - 1 : ide] * METERS_PER_DEGREE
+    y_cells = ya[jds - 1 : jde] * METERS_PER_DEGREE
+    params = (
+        subfaults[:, 8],
+        subfaults[:, 3] * 1000.0,
+        subfaults[:, 4] * 1000.0,
+        subfaults[:, 5],
+        subfaults[:, 6],
+        subfaults[:, 7],
+        hh,
+    )
+    batch = max(1, BATCH_CELLS // (ia * ja))
+    z = np.zeros((ia, ja))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, len(subfaults), batch):
+            part = slice(start, start + batch)
+            x = x_cells[np.newaxis, :, np.newaxis] - (
+                ref_lon[part, np.newaxis, np.newaxis] * METERS_PER_DEGREE
+            )
+            y = y_cells[np.newaxis, np.newaxis, :] - (
+                ref_lat[part, np.newaxis, np.newaxis] * METERS_PER_DEGREE
+            )
+            fault = (p[part, np.newaxis, np.newaxis] for p in params)
+            z += okada_vertical_displacement(x, y, *fault).sum(axis=0)
+
+    _write_deformation(working_dir, z)
+    try:
+        (working_dir / "xyo.dat").write_text(
+            f"{ids} {ide} {jds} {jde} {xa.size} {ya.size}\n"
+        )
+    except OSError as e:
+        raise IOError(f"Failed to write xyo.dat: {e}") from e
+
+
+def _write_deformation(working_dir: Path, z: np.ndarray) -> None:
+    spikes = np.abs(z) >= MAX_UPLIFT
+    if spikes.any():
+        logger.warning(f"Zeroing {int(spikes.sum())} cells with |Z| >= {MAX_UPLIFT}")
+    z = np.where(spikes, 0.0, z)
+
+    logger.info(f"Maximum uplift (m): {z.max():.2f}, subsidence (m): {z.min():.2f}")
+    try:
+        np.savetxt(working_dir / "deform_a.grd", z, fmt="%9.3f", delimiter="")
+    except OSError as e:
+        raise IOError(f"Failed to write deform_a.grd: {e}") from e
+
+
+def compute_deformation(working_dir: Path) -> None:
+    """
+    Compute the initial sea surface of the fault in pfalla.inp and write
+    deform_a.grd for the tsunami step. Jobs with a finite-fault source
+    (finite_fault.dat) sum their subfaults instead.
+    Replaces: def_oka.f
+
+    Args:
+        working_dir: Working directory for the job.
+    """
+    if (working_dir / "finite_fault.dat").exists():
+        compute_finite_fault_deformation(working_dir)
+        return
+
+    (ia, ja), (i0, j0), dx, fault = _read_fault(working_dir)
+    logger.info(f"Computing Okada deformation on a {ia}x{ja} window (DX={dx:.4f} m)")
+
+    # Rows of deform_a.grd follow the first grid index, as written by def_oka.f
+    i = np.arange(ia, dtype=np.float64)[:, np.newaxis]
+    j = np.arange(ja, dtype=np.float64)[np.newaxis, :]
+    x = np.broadcast_to((i - i0) * dx, (ia, ja))
+    y = np.broadcast_to((j - j0) * dx, (ia, ja))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = okada_vertical_displacement(x, y, *fault)
+
+    _write_deformation(working_dir, z)
@@ -0,0 +1,96 @@
+import logging
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from orchestrator.models.schemas import CalculationResponse, EarthquakeInput
+
+logger = logging.getLogger(__name__)
+
+RAKE: float = 90.0  # deg, pure thrust as in fault_plane.f90
+DEFAULT_TOP_DEPTH: float = 5000.0  # m, when the fault would reach the surface
+KM_PER_DEGREE: float = 111.0
+
+
+def _read_axes(working_dir: Path) -> Tuple[np.ndarray, np.ndarray]:
+    try:
+        xa = np.loadtxt(working_dir / "bathy" / "xa.dat")
+        ya = np.loadtxt(working_dir / "bathy" / "ya.dat")
+    except OSError as e:
+        raise FileNotFoundError(f"Missing grid axes for the fault plane: {e}") from e
+    return xa, ya
+
+
+def _nearest(axis: np.ndarray, value: float) -> int:
+    """1-based index of the axis point closest to value."""
+    return int(np.argmin(np.abs(axis - value))) + 1
+
+
+def write_fault_plane(
+    working_dir: Path, data: EarthquakeInput, calculation: CalculationResponse
+) -> None:
+    """
+    Write pfalla.inp, meca.dat and xyo.dat for the deform and tsunami steps
+    from the rupture already computed by /calculate.
+    Replaces: fault_plane.f90
+
+    Args:
+        working_dir: Working directory for the job, with the grid in bathy/.
+        data: Hypocenter of the event.
+        calculation: Rupture geometry and focal mechanism of the event.
+    """
+    xa, ya = _read_axes(working_dir)
+    # The model grid uses longitudes in [0, 360)
+    xep = data.lon0 + 360.0 if data.lon0 < 0.0 else data.lon0
+    yep = data.lat0
+    if xep < xa[0]:
+        raise ValueError("The epicenter is outside the computational grid")
+
+    rect = calculation.rectangle_parameters
+    xo = rect["xo"] + 360.0 if rect["xo"] < 0.0 else rect["xo"]
+    i0 = _nearest(xa, xo)
+    j0 = _nearest(ya, rect["yo"])
+
+    # Depth of the upper edge of the fault, from the hypocenter at the center
+    azimuth = np.radians(calculation.azimuth)
+    dip = np.radians(calculation.dip)
+    delta_x, delta_y = -rect["b1"], rect["a1"]
+    offset = delta_x * np.cos(-azimuth) + delta_y * np.sin(-azimuth)
+    top_depth = (data.h - offset * np.tan(dip)) * 1000.0
+    if top_depth < 0.0:
+        top_depth = DEFAULT_TOP_DEPTH
+
+    # Deformation window around the epicenter
+    half_size = (1.4 if data.Mw > 8.0 else 2.8) * calculation.length / KM_PER_DEGREE
+    ids, ide = _nearest(xa, xep - half_size), _nearest(xa, xep + half_size)
+    jds, jde = _nearest(ya, yep - half_size), _nearest(ya, yep + half_size)
+
+    logger.info(f"Fault origin ({i0}, {j0}), window {ids}-{ide} x {jds}-{jde}")
+    try:
+        (working_dir / "pfalla.inp").write_text(
+            f"{i0} {j0} {calculation.dislocation:.6f} "
+            f"{calculation.length * 1000.0:.1f} {calculation.width * 1000.0:.1f} "
+            f"{calculation.azimuth:.4f} {calculation.dip:.4f} {RAKE:.4f} "
+            f"{top_depth:.3f}\n"
+        )
+        (working_dir / "meca.dat").write_text(
+            "".join(
+                f"{v:7.2f}"
+                for v in (
+                    xep,
+                    yep,
+                    data.h,
+                    calculation.azimuth,
+                    calculation.dip,
+                    RAKE,
+                    data.Mw,
+                )
+            )
+            + f" 0 0 {data.hhmm}\n"
+        )
+        (working_dir / "xyo.dat").write_text(
+            f"{ids} {ide} {jds} {jde} {xa.size} {ya.size}\n"
+        )
+    except OSError as e:
+        raise IOError(f"Failed to write the fault plane: {e}") from e
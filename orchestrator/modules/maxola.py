@@ -1,20 +1,26 @@
 import logging
-import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pygmt
-import yaml
-from pygmt.helpers import GMTTempFile
+import xarray as xr
+from pygmt.enums import GridRegistration
 
 from orchestrator.modules.point_ttt import read_meca_spec
+from orchestrator.modules.render_assets import (
+    CoastSpec,
+    CptSpec,
+    add_coast_layer,
+    get_cpt,
+)
+from orchestrator.utils.geo import DEG_TO_KM
+from orchestrator.utils.render_service import RenderRequest
+from orchestrator.utils.stations import TidalStation, load_stations
 
 logger = logging.getLogger(__name__)
 
-CONFIG_DIR = Path("data")
-
 
 # Grid configuration
 @dataclass(frozen=True)
@@ -30,6 +36,20 @@ class GridConfig:
         object.__setattr__(self, "cellsize", self.dx / 1000.0 / 111.1994)
 
 
+def load_grid_config(work_dir: Path) -> GridConfig:
+    """Describe the computational grid from the bathymetry axes in the workspace"""
+    xa = np.loadtxt(work_dir / "bathy" / "xa.dat")
+    ya = np.loadtxt(work_dir / "bathy" / "ya.dat")
+    spacing = round((ya[1] - ya[0]) * 3600) / 3600  # degrees
+    return GridConfig(
+        ncols=xa.size,
+        nrows=ya.size,
+        dx=spacing * DEG_TO_KM * 1000.0,
+        xllcorner=float(xa[0]),
+        yllcorner=float(ya[0]),
+    )
+
+
 # Style configuration
 @dataclass(frozen=True)
 class StyleConfig:
@@ -42,71 +62,16 @@ class StyleConfig:
     coastline_pen: str = "0.5p,black"
 
 
-@dataclass(frozen=True)
-class TidalStation:
-    lon: float
-    lat: float
-    code: str
-    name: str
-    active: bool = True
-    annotation_offset: str = "0.1c"
-
-
-def load_stations(config_dir: Path) -> List[TidalStation]:
-    stations_path = config_dir / "stations.yml"
-    logger.info(f"Loading stations configuration: {stations_path}")
-
-    if not stations_path.exists():
-        logger.error(f"Stations configuration file not found: {stations_path}")
-        raise FileNotFoundError(f"Stations file not found: {stations_path}")
-
-    try:
-        with open(stations_path, "r") as f:
-            data = yaml.safe_load(f)
-
-        if not data or "stations" not in data:
-            raise ValueError("Invalid stations configuration: 'stations' key missing")
-
-        return [TidalStation(**station) for station in data["stations"]]
-
-    except (yaml.YAMLError, TypeError, KeyError) as e:
-        logger.error(f"Failed to parse stations configuration: {str(e)}")
-        raise ValueError(f"Invalid stations configuration: {str(e)}") from e
+# Wave height palette, built once per host by the render asset cache
+HGT_CPT = CptSpec(
+    cmap="polar",
+    series="-0.5/0.5/0.01",
+    continuous=True,
+    extra="B 0 0 255\nF 255 0 0\nN 255 255 255\n",
+)
 
 
-def create_cpt_files(work_dir: Path) -> Tuple[Path, Path]:
-    """Create custom color palette tables (CPT) for visualization"""
-    depth_cpt = work_dir / "depth.cpt"
-    hgt_cpt = work_dir / "hgt.cpt"
-
-    try:
-        # Create depth color palette
-        with GMTTempFile() as temp_cpt:
-            pygmt.makecpt(cmap="globe", output=temp_cpt.name)
-            Path(temp_cpt.name).rename(depth_cpt)
-
-        # Create height color palette
-        with GMTTempFile() as temp_cpt:
-            pygmt.makecpt(
-                cmap="polar",
-                series="-0.5/0.5/0.01",
-                continuous=True,
-                output=temp_cpt.name,
-            )
-            Path(temp_cpt.name).rename(hgt_cpt)
-
-            # Append B, F, N entries to height CPT
-            with open(hgt_cpt, "a") as f:
-                f.write("B 0 0 255\nF 255 0 0\nN 255 255 255\n")
-
-    except pygmt.exceptions.GMTError as e:
-        logger.error(f"CPT creation failed: {str(e)}")
-        raise RuntimeError("CPT generation error") from e
-
-    return depth_cpt, hgt_cpt
-
-
-def process_grid(work_dir: Path, grid_config: GridConfig) -> Path:
+def process_grid(work_dir: Path, grid_config: GridConfig) -> np.ndarray:
     """Process and normalize grid data for visualization"""
     grid_path = work_dir / "zfolder" / "zmax_a.grd"
 
@@ -125,9 +90,8 @@ def process_grid(work_dir: Path, grid_config: GridConfig) -> Path:
                 f"Data size mismatch: Expected {expected_size}, got {data.size}"
             )
 
-        # Reshape and process grid data
-        arr = data.reshape((grid_config.ncols, grid_config.nrows), order="F")
-        processed = np.flipud(arr.T)
+        # Reshape to (lat, lon) rows, south to north
+        processed = data.reshape((grid_config.ncols, grid_config.nrows), order="F").T
 
         # Normalize values
         max_val = np.nanmax(processed)
@@ -138,61 +102,52 @@ def process_grid(work_dir: Path, grid_config: GridConfig) -> Path:
             where=(max_val != 0),
         )
 
-        # Write processed grid to file
-        output_grid = work_dir / "maximo.grd"
-        write_grid_file(output_grid, normalized, grid_config)
-        return output_grid
+        return normalized
 
     except (ValueError, IOError) as e:
         logger.error(f"Grid processing failed: {str(e)}")
         raise RuntimeError("Grid processing error") from e
 
 
-def write_grid_file(
-    output_path: Path, data: np.ndarray, grid_config: GridConfig
-) -> None:
-    header = (
-        f"ncols {grid_config.ncols}\n"
-        f"nrows {grid_config.nrows}\n"
-        f"xllcorner {grid_config.xllcorner:.8f}\n"
-        f"yllcorner {grid_config.yllcorner:.8f}\n"
-        f"cellsize {grid_config.cellsize:.8f}\n"
-        "nodata_value -9999\n"
+def build_grid(data: np.ndarray, grid_config: GridConfig) -> xr.DataArray:
+    """
+    Wrap the normalized values as a pixel registered grid with the extent of
+    the former ESRI ASCII grid (lower left corner and cell size). Values keep
+    the two decimals of that text grid.
+    """
+    cellsize = grid_config.cellsize
+    lon = grid_config.xllcorner + cellsize * (np.arange(grid_config.ncols) + 0.5)
+    lat = grid_config.yllcorner + cellsize * (np.arange(grid_config.nrows) + 0.5)
+    grid = xr.DataArray(
+        np.round(data.astype(np.float64), 2).astype(np.float32),
+        coords={"lat": lat, "lon": lon},
+        dims=("lat", "lon"),
+        name="z",
     )
+    grid.gmt.registration = GridRegistration.PIXEL
+    return grid
 
-    try:
-        with open(output_path, "w") as f:
-            f.write(header)
-            np.savetxt(f, data, fmt="%8.2f", delimiter="", newline="\n")
-    except IOError as e:
-        logger.error(f"Grid write failed: {str(e)}")
-        raise RuntimeError("Grid file I/O error") from e
 
+def grid_region(grid_config: GridConfig) -> Tuple[float, float, float, float]:
+    return (
+        grid_config.xllcorner,
+        grid_config.xllcorner + grid_config.ncols * grid_config.cellsize,
+        grid_config.yllcorner,
+        grid_config.yllcorner + grid_config.nrows * grid_config.cellsize,
+    )
 
-def convert_grid_format(input_grid: Path, output_grid: Path) -> None:
-    try:
-        subprocess.run(
-            ["gmt", "grdconvert", str(input_grid), "-G" + str(output_grid)],
-            check=True,
-            capture_output=True,
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error(f"GMT command failed: {e.stderr.decode().strip()}")
-        raise RuntimeError("GMT grid conversion failed") from e
-    except FileNotFoundError:
-        logger.error("GMT command not found. Ensure GMT is installed and in PATH.")
-        raise RuntimeError("GMT executable not found") from None
-
-
-def add_coastline(fig: pygmt.Figure, style_config: StyleConfig) -> None:
-    fig.coast(
-        shorelines=style_config.coastline_pen,
-        area_thresh=1000,
-        borders=["1/0.5p,black"],
-        resolution="i",
+
+def add_coastline(
+    fig: pygmt.Figure, style_config: StyleConfig, grid_config: GridConfig
+) -> None:
+    add_coast_layer(
+        fig,
+        CoastSpec(region=grid_region(grid_config), resolution="i", area_thresh=1000),
+        shoreline_pen=style_config.coastline_pen,
+        border_pen="0.5p,black",
         land="gray",
-        frame=["WSen", "xa20f10", "ya20f10"],
     )
+    fig.basemap(frame=["WSen", "xa20f10", "ya20f10"])
 
 
 def add_tidal_stations(
@@ -231,14 +186,13 @@ def add_tidal_stations(
         logger.warning(f"Tidal station plotting failed: {str(e)}")
 
 
-def add_meca_data(fig: pygmt.Figure, work_dir: Path, style_config: StyleConfig) -> None:
-    meca_file = work_dir / "meca.dat"
-
-    if meca_file.exists():
+def add_meca_data(
+    fig: pygmt.Figure, meca_spec: Optional[Dict], style_config: StyleConfig
+) -> None:
+    if meca_spec:
         try:
-            spec = read_meca_spec(meca_file)
             fig.meca(
-                spec=spec,
+                spec=meca_spec,
                 scale=style_config.meca_scale,
                 compressionfill="blue",
                 convention="mt",
@@ -264,62 +218,64 @@ def add_legend(fig: pygmt.Figure, style_config: StyleConfig) -> None:
     )
 
 
-def cleanup_files(file_paths: List[Path]) -> None:
-    for path in file_paths:
-        try:
-            path.unlink(missing_ok=True)
-        except (PermissionError, OSError) as e:
-            logger.debug(f"Cleanup failed for {path}: {str(e)}")
+def maxola_request(work_dir: Path) -> RenderRequest:
+    """Wave heights, stations and mechanism of the maxola map, in memory."""
+    grid_config = load_grid_config(work_dir)
+    meca_file = work_dir / "meca.dat"
+    return RenderRequest(
+        render_maxola,
+        {
+            "heights": process_grid(work_dir, grid_config),
+            "grid_config": grid_config,
+            "stations": load_stations(),
+            "meca_spec": read_meca_spec(meca_file) if meca_file.exists() else None,
+            "output": work_dir / "maxola",
+        },
+    )
 
 
-def generate_maxola_plot(work_dir: Path) -> None:
-    grid_config = GridConfig()
+def render_maxola(
+    heights: np.ndarray,
+    grid_config: GridConfig,
+    stations: List[TidalStation],
+    meca_spec: Optional[Dict],
+    output: Path,
+) -> None:
     style_config = StyleConfig()
 
-    stations = load_stations(CONFIG_DIR)
-
-    files_to_cleanup: List[Path] = []
-
-    pygmt.config(
-        MAP_FRAME_TYPE="plain",
-        FONT_ANNOT_PRIMARY=style_config.font_secondary,
-        FONT_LABEL=style_config.font_secondary,
-        FONT_TITLE=style_config.font_secondary,
-        PS_MEDIA="A4",
-    )
-
     try:
-        # Create color palettes
-        depth_cpt, hgt_cpt = create_cpt_files(work_dir)
-        files_to_cleanup.extend([depth_cpt, hgt_cpt])
-
-        # Process grid data
-        maximo_grid = process_grid(work_dir, grid_config)
-        maxola_grid = work_dir / "maxola.grd"
-        files_to_cleanup.extend([maximo_grid, maxola_grid])
-
-        # Convert grid format
-        convert_grid_format(maximo_grid, maxola_grid)
-
-        # Create the figure
-        fig = pygmt.Figure()
-        fig.shift_origin(xshift="4.2c", yshift="10.0c")
-
-        # Add map of tsunami wave heights
-        fig.grdimage(grid=str(maxola_grid), cmap=hgt_cpt, projection="A210/-10/5.0i")
+        with pygmt.config(
+            MAP_FRAME_TYPE="plain",
+            FONT_ANNOT_PRIMARY=style_config.font_secondary,
+            FONT_LABEL=style_config.font_secondary,
+            FONT_TITLE=style_config.font_secondary,
+            PS_MEDIA="A4",
+        ):
+            # Create the figure
+            fig = pygmt.Figure()
+            fig.shift_origin(xshift="4.2c", yshift="10.0c")
+
+            # Add map of tsunami wave heights, rendered from memory
+            fig.grdimage(
+                grid=build_grid(heights, grid_config),
+                cmap=get_cpt(HGT_CPT),
+                projection="A210/-10/5.0i",
+            )
 
-        # Add map elements
-        add_coastline(fig, style_config)
-        add_tidal_stations(fig, stations, style_config)
-        add_meca_data(fig, work_dir, style_config)
-        add_legend(fig, style_config)
+            # Add map elements
+            add_coastline(fig, style_config, grid_config)
+            add_tidal_stations(fig, stations, style_config)
+            add_meca_data(fig, meca_spec, style_config)
+            add_legend(fig, style_config)
 
-        # Save the figure
-        fig.psconvert(prefix=str(work_dir / "maxola"), fmt="E")
-        logger.info(f"Tsunami visualization created: {work_dir / 'maxola'}")
+            # Save the figure
+            fig.psconvert(prefix=str(output), fmt="E")
+        logger.info(f"Tsunami visualization created: {output}")
 
     except Exception as e:
         logger.error(f"Plot generation failed: {str(e)}")
         raise
-    finally:
-        cleanup_files(files_to_cleanup)
+
+
+def generate_maxola_plot(work_dir: Path) -> None:
+    maxola_request(work_dir)()
@@ -4,8 +4,27 @@ from typing import Dict
 
 import pygmt
 
+from orchestrator.modules.render_assets import (
+    CoastSpec,
+    CptSpec,
+    add_coast_layer,
+    get_cpt,
+)
+from orchestrator.utils.render_service import RenderRequest
+
 logger = logging.getLogger(__name__)
 
+TOPO_CPT = CptSpec(cmap="globe", continuous=True)
+
+TTT_REGION = [120.0, 300.0, -65.0, 61.0]
+TTT_PROJECTION = "M16c"
+TTT_FRAME = ["WsNe", "xa20f10", "ya20f10"]
+TTT_COAST = CoastSpec(region=tuple(TTT_REGION), resolution="l")
+
+# GMT grid formats: 2-byte integer topography and 4-byte float travel times
+GRD_PARAMS = "=bs"
+TTTB_PARAMS = "=bf"
+
 
 def read_meca_spec(meca_file: Path) -> Dict[str, float]:
     with meca_file.open("r") as f:
@@ -29,97 +48,93 @@ def read_meca_spec(meca_file: Path) -> Dict[str, float]:
     return spec
 
 
-def generate_ttt_map(working_dir: Path) -> None:
+def ttt_map_request(working_dir: Path) -> RenderRequest:
     """
-    Generate a TTT map using GMT via pygmt.
-    Validates input files, configures GMT settings, creates the plot,
-    and saves it as an EPS file.
+    Inputs of the TTT map. The topography and travel time grids are GMT
+    native binary files and are passed by path; the render service runs on
+    the same host.
 
     Expected files:
         - "cortado.i2" (grid file)
         - "ttt.b" (contour file)
         - "meca.dat" (meca file, located in the parent directory of working_dir)
     """
-    region = [120.0, 300.0, -65.0, 61.0]
-    projection = "M16c"
-    frame_parameters = ["WsNe", "xa20f10", "ya20f10"]
-
-    # GMT parameters
-    grd_filename = "cortado.i2"
-    grd_params = "=bs"
-    tttb_filename = "ttt.b"
-    tttb_params = "=bf"
-
-    # Path definitions
-    grd_file = working_dir / grd_filename
-    tttb_file = working_dir / tttb_filename
+    grd_file = working_dir / "cortado.i2"
+    tttb_file = working_dir / "ttt.b"
     meca_file = working_dir.parent / "meca.dat"
-    output_file = working_dir / "ttt.eps"
 
-    try:
-        # Validate input files
-        for file in (grd_file, tttb_file, meca_file):
-            if not file.exists():
-                raise FileNotFoundError(f"Required file {file} not found.")
+    # Validate input files
+    for file in (grd_file, tttb_file, meca_file):
+        if not file.exists():
+            raise FileNotFoundError(f"Required file {file} not found.")
+
+    spec = read_meca_spec(meca_file)
+    logger.info("Parsed meca spec: %s", spec)
+
+    return RenderRequest(
+        render_ttt_map,
+        {
+            "grd_file": grd_file,
+            "tttb_file": tttb_file,
+            "meca_spec": spec,
+            "output_file": working_dir / "ttt.eps",
+        },
+    )
 
-        # Configure GMT settings
-        pygmt.config(
+
+def render_ttt_map(
+    grd_file: Path, tttb_file: Path, meca_spec: Dict, output_file: Path
+) -> None:
+    """
+    Generate a TTT map using GMT via pygmt, configuring GMT settings, creating
+    the plot and saving it as an EPS file.
+    """
+    try:
+        with pygmt.config(
             MAP_FRAME_TYPE="plain",
             FONT_ANNOT_PRIMARY="9p",
             FONT_LABEL="9p",
             FONT_TITLE="9p",
             PS_MEDIA="A4",
-        )
-
-        fig = pygmt.Figure()
-
-        # Create color palette
-        color_cpt = working_dir / "color.cpt"
-        pygmt.makecpt(cmap="globe", output=str(color_cpt), continuous=True)
-
-        # Plot grid image
-        fig.grdimage(
-            grid=f"{grd_file}{grd_params}",
-            region=region,
-            projection=projection,
-            cmap=str(color_cpt),
-        )
-
-        # Add coastlines
-        fig.coast(
-            region=region,
-            projection=projection,
-            frame=frame_parameters,
-            resolution="l",
-            borders=["1/0.5p,30"],
-            shorelines="0.5,30",
-        )
-
-        # Add contour lines
-        fig.grdcontour(
-            grid=f"{tttb_file}{tttb_params}",
-            region=region,
-            projection=projection,
-            levels=1,
-            annotation="1.f1+uh",
-            pen=["c1.,30,-", "a1.,30,-"],
-        )
-
-        spec = read_meca_spec(meca_file)
-        logger.info("Parsed meca spec: %s", spec)
-
-        # Add focal mechanisms
-        fig.meca(
-            spec=spec,
-            region=region,
-            projection=projection,
-            scale="0.29c",
-            compressionfill="black",
-            convention="mt",
-        )
-
-        # Save output as EPS
-        fig.savefig(str(output_file))
+        ):
+            fig = pygmt.Figure()
+
+            # Plot grid image
+            fig.grdimage(
+                grid=f"{grd_file}{GRD_PARAMS}",
+                region=TTT_REGION,
+                projection=TTT_PROJECTION,
+                cmap=str(get_cpt(TOPO_CPT)),
+            )
+
+            # Add coastlines from the cached layer
+            add_coast_layer(
+                fig, TTT_COAST, shoreline_pen="0.5,30", border_pen="0.5p,30"
+            )
+            fig.basemap(region=TTT_REGION, projection=TTT_PROJECTION, frame=TTT_FRAME)
+
+            # Add contour lines
+            fig.grdcontour(
+                grid=f"{tttb_file}{TTTB_PARAMS}",
+                region=TTT_REGION,
+                projection=TTT_PROJECTION,
+                levels=1,
+                annotation="1.f1+uh",
+                pen=["c1.,30,-", "a1.,30,-"],
+            )
+
+            # Add focal mechanisms
+            fig.meca(
+                spec=meca_spec,
+                region=TTT_REGION,
+                projection=TTT_PROJECTION,
+                scale="0.29c",
+                compressionfill="black",
+                convention="mt",
+            )
+
+            # Save output as EPS
+            fig.savefig(str(output_file))
 
         # Verify output creation
         if not output_file.exists():
@@ -133,3 +148,8 @@ def generate_ttt_map(working_dir: Path) -> None:
             output_file.unlink()
         logger.exception("TTT map generation failed: %s", e)
         raise RuntimeError(f"TTT map generation failed: {e}") from e
+
+
+def generate_ttt_map(working_dir: Path) -> None:
+    """Generate the TTT map of the job from the files in working_dir."""
+    ttt_map_request(working_dir)()
@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import math
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import pygmt
+from pygmt.clib import Session
+
+logger = logging.getLogger(__name__)
+
+# Shared by every job of the host: rq forks a work horse per job, so the assets
+# live on disk and each process only keeps their paths
+CACHE_DIR = Path(tempfile.gettempdir()) / "tsdhn_render_cache"
+
+
+@dataclass(frozen=True)
+class CptSpec:
+    cmap: str
+    series: Optional[str] = None
+    continuous: bool = False
+    # Lines appended to the table, e.g. the B, F and N colors
+    extra: str = ""
+
+
+@dataclass(frozen=True)
+class CoastSpec:
+    region: Tuple[float, float, float, float]
+    resolution: str
+    area_thresh: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class CoastLayer:
+    shorelines: Path  # every shoreline level, clipped to the region
+    borders: Path  # national borders, clipped to the region
+    land: Path  # land mask grid of the region, NaN over water
+
+
+# Cell of the land mask, in arc-minutes. Coarser than the GSHHG polygons, but
+# a raster needs no closing around the poles to fill Antarctica, and the
+# shorelines are drawn on top of its edges
+LAND_MASK_MINUTES: int = 5
+
+
+def _cached(
+    kind: str, spec: object, suffix: str, build: Callable[[Path], None]
+) -> Path:
+    """Return the asset of spec, building it first if no process did yet."""
+    digest = hashlib.sha1(repr(spec).encode()).hexdigest()[:16]
+    path = CACHE_DIR / f"{kind}_{digest}{suffix}"
+    if path.exists():
+        return path
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Built under a private name and renamed, concurrent jobs never read a
+    # partial file
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp{suffix}")
+    try:
+        build(tmp_path)
+        tmp_path.replace(path)
+    except pygmt.exceptions.GMTError as e:
+        logger.error(f"Render asset {kind} failed: {str(e)}")
+        raise RuntimeError(f"Render asset generation error: {kind}") from e
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    logger.info(f"Cached render asset {path}")
+    return path
+
+
+@lru_cache(maxsize=None)
+def get_cpt(spec: CptSpec) -> Path:
+    """Color palette table for spec, created once with makecpt."""
+
+    def build(path: Path) -> None:
+        kwargs = {"series": spec.series} if spec.series else {}
+        pygmt.makecpt(
+            cmap=spec.cmap,
+            continuous=spec.continuous,
+            output=str(path),
+            **kwargs,
+        )
+        if spec.extra:
+            with open(path, "a") as f:
+                f.write(spec.extra)
+
+    return _cached("cpt", spec, ".cpt", build)
+
+
+def _extract_coast(path: Path, args: str) -> None:
+    """GSHHG lines selected by args, dumped as a multisegment table"""
+    with Session() as lib:
+        lib.call_module("coast", f"{args} -M ->{path}")
+
+
+def _build_land_mask(path: Path, spec: CoastSpec) -> None:
+    # Region widened to whole cells of the mask
+    cells = 60 / LAND_MASK_MINUTES
+    west, east, south, north = spec.region
+    pygmt.grdlandmask(
+        region=[
+            math.floor(west * cells) / cells,
+            math.ceil(east * cells) / cells,
+            math.floor(south * cells) / cells,
+            math.ceil(north * cells) / cells,
+        ],
+        spacing=f"{LAND_MASK_MINUTES}m",
+        resolution=spec.resolution,
+        area_thresh=spec.area_thresh,
+        maskvalues=["NaN", 1],
+        registration="pixel",
+        outgrid=str(path),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_coast_layer(spec: CoastSpec) -> CoastLayer:
+    """
+    Static coastline layer of a map, extracted once from GSHHG and drawn by
+    every render without reading the GSHHG bins again.
+    """
+    options = "-R{}/{}/{}/{} -D{}".format(*spec.region, spec.resolution)
+    if spec.area_thresh is not None:
+        options += f" -A{spec.area_thresh}"
+    return CoastLayer(
+        shorelines=_cached(
+            "shorelines", spec, ".txt", lambda p: _extract_coast(p, f"{options} -W")
+        ),
+        borders=_cached(
+            "borders", spec, ".txt", lambda p: _extract_coast(p, f"{options} -N1")
+        ),
+        land=_cached("land", spec, ".nc", lambda p: _build_land_mask(p, spec)),
+    )
+
+
+def add_coast_layer(
+    fig: pygmt.Figure,
+    spec: CoastSpec,
+    shoreline_pen: str,
+    border_pen: str,
+    land: Optional[str] = None,
+) -> None:
+    """
+    Draw the cached coastlines and borders, over a land fill of the given
+    color, in the region and projection of the current map.
+    """
+    layer = get_coast_layer(spec)
+    if land:
+        fig.grdimage(
+            grid=str(layer.land),
+            cmap=str(get_cpt(CptSpec(cmap=f"{land},{land}", series="0/2/1"))),
+            nan_transparent=True,
+        )
+    fig.plot(data=str(layer.shorelines), pen=shoreline_pen)
+    fig.plot(data=str(layer.borders), pen=border_pen)
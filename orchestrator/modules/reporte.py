@@ -1,9 +1,33 @@
 import datetime
+import hashlib
+import html
+import json
+import logging
+import math
+import os
+import re
 import shutil
 import subprocess
+import tempfile
+import time
 from pathlib import Path
 from string import Template
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Precompiled preambles and the cross-references of the last report, shared by
+# the jobs of the host
+LATEX_CACHE_DIR = Path(tempfile.gettempdir()) / "tsdhn_latex_cache"
+
+# Everything above this line of the template is dumped into the format
+DUMP_MARKER = "%endofdump"
+
+# Commands that need the .aux of a previous pass
+CROSS_REFERENCE = re.compile(
+    r"\\(?:ref|pageref|eqref|autoref|cite\w*|tableofcontents|listof\w+)\b"
+)
+RERUN_WARNING = re.compile(r"Rerun to get|Label\(s\) may have changed")
 
 MONTH_MAP = {
     1: "Ene",
@@ -21,24 +45,256 @@ MONTH_MAP = {
 }
 
 
+# Ports reported in salida.txt and the summary: department, port and index in
+# ttt_max.dat
+SALIDA_STATIONS: List[Tuple[str, str, int]] = [
+    ("Tumbes", "La Cruz", 0),
+    ("Piura", "Talara", 1),
+    ("Piura", "Paita", 2),
+    ("Lambayeque", "Pimentel", 3),
+    ("La_Libertad", "Salaverry", 4),
+    ("Ancash", "Chimbote", 5),
+    ("Ancash", "Huarmey", 6),
+    ("Lima", "Huacho", 7),
+    ("Lima", "Callao", 8),
+    ("Lima", "Cerro Azul", 9),
+    ("Ica", "Pisco", 10),
+    ("Ica", "San Juan", 11),
+    ("Arequipa", "Atico", 12),
+    ("Arequipa", "Camana", 13),
+    ("Arequipa", "Matarani", 14),
+    ("Moquegua", "Ilo", 15),
+    ("Chile", "Arica", 16),
+]
+
+
 class LatexTemplate(Template):
     delimiter = "@"
 
 
 def generate_reports_wrapper(working_dir: Path) -> None:
     generate_reports(working_dir)
+    compile_report(working_dir)
 
-    for _ in range(2):  # Compile twice to resolve references
+    for f in ["reporte.aux", "reporte.out", "reporte.log", "reporte.tex"]:
+        (working_dir / f).unlink(missing_ok=True)
+
+
+def compile_report(working_dir: Path) -> None:
+    """
+    Compile reporte.tex with pdflatex. The static preamble is loaded from a
+    precompiled format and the second pass only runs when the template has
+    cross-references that the first pass could not resolve. The .aux of the
+    last report seeds the first pass, so it usually resolves them. If the
+    compile with the format fails, the format is evicted and the report is
+    compiled once more without it.
+    """
+    source = (working_dir / "reporte.tex").read_text(encoding="utf-8")
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    fmt = precompiled_format(source)
+    timings["format"] = time.perf_counter() - start
+
+    references = CROSS_REFERENCE.search(source) is not None
+    template_key = hashlib.sha1(
+        (Path(__file__).parent / "templates" / "reporte_template.tex").read_bytes()
+    ).hexdigest()[:16]
+    cached_aux = LATEX_CACHE_DIR / f"reporte_{template_key}.aux"
+    if references and cached_aux.exists():
+        shutil.copy(cached_aux, working_dir / "reporte.aux")
+
+    try:
+        log = run_pdflatex(working_dir, fmt, timings, "pass1")
+    except subprocess.CalledProcessError as e:
+        if fmt is None:
+            raise
+        # A format dumped by another TeX installation is rejected with a
+        # fatal error, drop it so the next report dumps a fresh one
+        logger.warning(f"Compile with LaTeX format {fmt} failed, evicting it: {e}")
+        (LATEX_CACHE_DIR / f"{fmt}.fmt").unlink(missing_ok=True)
+        fmt = None
+        log = run_pdflatex(working_dir, fmt, timings, "pass1")
+    if references and RERUN_WARNING.search(log):
+        run_pdflatex(working_dir, fmt, timings, "pass2")
+    if references:
+        _store_atomic(working_dir / "reporte.aux", cached_aux)
+
+    logger.info(
+        "LaTeX timings: "
+        + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    )
+
+
+def run_pdflatex(
+    working_dir: Path, fmt: Optional[str], timings: Dict[str, float], name: str
+) -> str:
+    """Run one pdflatex pass on reporte.tex and return its log."""
+    command = ["pdflatex", "-interaction=nonstopmode"]
+    env = None
+    if fmt:
+        command.append(f"-fmt={fmt}")
+        env = {**os.environ, "TEXFORMATS": f"{LATEX_CACHE_DIR}:"}
+
+    start = time.perf_counter()
+    subprocess.run(
+        [*command, "reporte.tex"],
+        cwd=working_dir,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    timings[name] = time.perf_counter() - start
+    return (working_dir / "reporte.log").read_text(encoding="utf-8", errors="replace")
+
+
+def precompiled_format(source: str) -> Optional[str]:
+    """
+    Name of the format with the preamble of source (up to DUMP_MARKER), dumped
+    once with mylatexformat. None when the source has no marker or the format
+    cannot be built, the report is then compiled without it.
+    """
+    if DUMP_MARKER not in source:
+        return None
+    preamble = source[: source.index(DUMP_MARKER) + len(DUMP_MARKER)] + "\n"
+    name = f"reporte_{hashlib.sha1(preamble.encode()).hexdigest()[:16]}"
+    if (LATEX_CACHE_DIR / f"{name}.fmt").exists():
+        return name
+
+    LATEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    jobname = f"{name}_{os.getpid()}"
+    (LATEX_CACHE_DIR / f"{jobname}.tex").write_text(preamble, encoding="utf-8")
+    try:
         subprocess.run(
-            ["pdflatex", "-interaction=nonstopmode", "reporte.tex"],
-            cwd=working_dir,
+            [
+                "pdflatex",
+                "-ini",
+                "-interaction=nonstopmode",
+                f"-jobname={jobname}",
+                "&pdflatex",
+                "mylatexformat.ltx",
+                f"{jobname}.tex",
+            ],
+            cwd=LATEX_CACHE_DIR,
             check=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
+        (LATEX_CACHE_DIR / f"{jobname}.fmt").replace(LATEX_CACHE_DIR / f"{name}.fmt")
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.warning(f"Precompiled LaTeX format unavailable: {e}")
+        return None
+    finally:
+        for suffix in (".tex", ".log", ".fmt"):
+            (LATEX_CACHE_DIR / f"{jobname}{suffix}").unlink(missing_ok=True)
+    logger.info(f"Dumped LaTeX format {name}")
+    return name
+
+
+def _store_atomic(src: Path, dst: Path) -> None:
+    if not src.exists():
+        return
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}")
+    shutil.copy(src, tmp)
+    tmp.replace(dst)
+
+
+def write_summary(working_dir: Path) -> None:
+    """
+    Write summary.json and summary.html with the event and the arrivals at
+    each port, as soon as ttt_max.dat exists and before any figure or LaTeX.
+    """
+    summary = build_summary(
+        read_meca_dat(working_dir),
+        read_ttt_max_dat(working_dir),
+        read_grid_minutes(working_dir),
+        read_nest_coverage(working_dir),
+    )
+    (working_dir / "summary.json").write_text(
+        json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    (working_dir / "summary.html").write_text(
+        render_summary_html(summary), encoding="utf-8"
+    )
+
+
+def build_summary(
+    coords: Tuple[float, ...],
+    ttt_data: Tuple[List[float], ...],
+    grid_minutes: int,
+    nest_coverage: Optional[List[bool]] = None,
+) -> Dict:
+    xep, yep, zep, az, dip, rake, mw, _, _, t0 = coords
+    ttt, max_vals, hours, minutes = ttt_data
+
+    reported = [idx for _, _, idx in SALIDA_STATIONS if hours[idx] is not None]
+    stations = [
+        {
+            "department": dept,
+            "port": port,
+            "arrival_minutes": ttt[idx],
+            "arrival": f"{hours[idx]}:{minutes[idx]:02d}",
+            "max_height": max_vals[idx],
+        }
+        for dept, port, idx in SALIDA_STATIONS
+        if hours[idx] is not None
+    ]
+    return {
+        "epicenter": {
+            "lat": yep,
+            "lon": xep,
+            "depth": zep,
+            "magnitude": mw,
+            "strike": az,
+            "dip": dip,
+            "rake": rake,
+            "origin_time": t0,
+        },
+        "grid_minutes": grid_minutes,
+        "nested": nest_coverage is not None,
+        "preliminary": is_preliminary(grid_minutes, nest_coverage, reported),
+        "max_height": max((s["max_height"] for s in stations), default=None),
+        "stations": stations,
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
 
-    for f in ["reporte.aux", "reporte.out", "reporte.log", "reporte.tex"]:
-        (working_dir / f).unlink(missing_ok=True)
+
+def render_summary_html(summary: Dict) -> str:
+    epicenter = summary["epicenter"]
+    rows = "\n".join(
+        f"<tr><td>{html.escape(s['department'])}</td>"
+        f"<td>{html.escape(s['port'])}</td>"
+        f"<td>{s['arrival']}</td><td>{s['max_height']:.2f}</td></tr>"
+        for s in summary["stations"]
+    )
+    title = "Estimación de parámetros de tsunami de origen lejano"
+    if summary["preliminary"]:
+        title = f"{title} (preliminar)"
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Latitud {epicenter["lat"]:.2f}°, longitud {epicenter["lon"]:.2f}°,
+profundidad {epicenter["depth"]:.1f} km, magnitud {epicenter["magnitude"]:.1f} Mw,
+hora {html.escape(str(epicenter["origin_time"]))}.</p>
+<table>
+<thead>
+<tr><th>Departamento</th><th>Puerto</th>
+<th>Tiempo de arribo (hh:mm)</th><th>Hmax (m)</th></tr>
+</thead>
+<tbody>
+{rows}
+</tbody>
+</table>
+<p>La altura estimada no considera la fase lunar ni oleaje anómalo.</p>
+</body>
+</html>
+"""
 
 
 def generate_reports(working_dir: Path) -> None:
@@ -46,8 +302,10 @@ def generate_reports(working_dir: Path) -> None:
     coords = read_meca_dat(working_dir)
     ttt_data = read_ttt_max_dat(working_dir)
     datetime_info = get_current_datetime_info()
+    grid_minutes = read_grid_minutes(working_dir)
+    nest_coverage = read_nest_coverage(working_dir)
 
-    context = build_template_context(coords, ttt_data)
+    context = build_template_context(coords, ttt_data, grid_minutes, nest_coverage)
     copy_template(working_dir)
     write_reporte_tex(context, working_dir)
     write_salida_txt(coords, ttt_data, datetime_info, working_dir)
@@ -88,13 +346,51 @@ def read_ttt_max_dat(working_dir: Path) -> Tuple[List[float], ...]:
     if len(data) != 17:
         raise ValueError(f"Expected 17 entries in ttt_max.dat, got {len(data)}")
 
+    # Stations without a gauge in the grid that was run are stored as nan
     ttt, max_vals = zip(*data, strict=False)
-    hours = [int(t // 60) for t in ttt]
-    minutes = [int(round(t % 60)) for t in ttt]
+    hours = [None if math.isnan(t) else int(t // 60) for t in ttt]
+    minutes = [None if math.isnan(t) else int(round(t % 60)) for t in ttt]
 
     return (list(ttt), list(max_vals), hours, minutes)
 
 
+def read_grid_minutes(working_dir: Path) -> int:
+    """Grid resolution in arc-minutes, from the first two latitudes of ya.dat"""
+    lines = (working_dir / "bathy" / "ya.dat").read_text(encoding="utf-8").split()
+    return round((float(lines[1]) - float(lines[0])) * 60)
+
+
+def read_nest_coverage(working_dir: Path) -> Optional[List[bool]]:
+    """
+    For nested runs, whether each gauge of tidal.dat lies in the parent cells
+    covered by the child grid (nest.dat). The solver samples those gauges on
+    the child grid and the others on the parent grid. None without nest.dat.
+    """
+    nest_file = working_dir / "nest.dat"
+    if not nest_file.exists():
+        return None
+    isl, jsl, iel, jel = map(int, nest_file.read_text(encoding="utf-8").split()[:4])
+    coverage = []
+    for line in (working_dir / "tidal.dat").read_text(encoding="utf-8").splitlines():
+        parts = line.split()
+        if len(parts) >= 3:
+            i, j = int(parts[1]), int(parts[2])
+            coverage.append(isl <= i <= iel and jsl <= j <= jel)
+    return coverage
+
+
+def is_preliminary(
+    grid_minutes: int, nest_coverage: Optional[List[bool]], stations: List[int]
+) -> bool:
+    """
+    Results of the 5 arc-minute grid are preliminary, unless the run is nested
+    and every reported station is sampled on the child grid.
+    """
+    if nest_coverage is None:
+        return grid_minutes > 4
+    return not all(idx < len(nest_coverage) and nest_coverage[idx] for idx in stations)
+
+
 def get_current_datetime_info() -> Tuple[str, str, Tuple[int, int, int], str]:
     now = datetime.datetime.now()
     date_str = now.strftime("%Y-%m-%d")
@@ -104,11 +400,28 @@ def get_current_datetime_info() -> Tuple[str, str, Tuple[int, int, int], str]:
 
 
 def build_template_context(
-    coords: Tuple[float, ...], ttt_data: Tuple[List[float], ...]
+    coords: Tuple[float, ...],
+    ttt_data: Tuple[List[float], ...],
+    grid_minutes: int,
+    nest_coverage: Optional[List[bool]] = None,
 ) -> Dict[str, str]:
     _, max_vals, hours, minutes = ttt_data
+    title = "REPORTE: ESTIMACIÓN DE PARÁMETROS DE TSUNAMI DE ORIGEN LEJANO"
+    # Talara, Callao and Matarani
+    if is_preliminary(grid_minutes, nest_coverage, [1, 8, 14]):
+        title = f"{title} (PRELIMINAR)"
+    # The coastal child grid is 3 times finer than the ocean grid
+    nest_text = (
+        f" Frente a la costa se anida una grilla de {grid_minutes * 20} s, "
+        "en la que se calculan los mareogramas."
+        if nest_coverage is not None
+        else ""
+    )
     return {
-        "title": "REPORTE: ESTIMACIÓN DE PARÁMETROS DE TSUNAMI DE ORIGEN LEJANO",
+        "title": title,
+        "grid_minutes": str(grid_minutes),
+        "grid_seconds": str(grid_minutes * 60),
+        "nest_text": nest_text,
         "author": "Cesar Jimenez",
         "lat": f"{coords[1]:.2f}",
         "lon": f"{coords[0]:.2f}",
@@ -155,26 +468,6 @@ def write_salida_txt(
     date_str, time_str, (year, month, day), mes = datetime_info
     _, max_list, hours, minutes = ttt_data
 
-    stations = [
-        ("Tumbes", "La Cruz", 0),
-        ("Piura", "Talara", 1),
-        ("Piura", "Paita", 2),
-        ("Lambayeque", "Pimentel", 3),
-        ("La_Libertad", "Salaverry", 4),
-        ("Ancash", "Chimbote", 5),
-        ("Ancash", "Huarmey", 6),
-        ("Lima", "Huacho", 7),
-        ("Lima", "Callao", 8),
-        ("Lima", "Cerro Azul", 9),
-        ("Ica", "Pisco", 10),
-        ("Ica", "San Juan", 11),
-        ("Arequipa", "Atico", 12),
-        ("Arequipa", "Camana", 13),
-        ("Arequipa", "Matarani", 14),
-        ("Moquegua", "Ilo", 15),
-        ("Chile", "Arica", 16),
-    ]
-
     lines = [
         f"{'ESTIMACION DEL TIEMPO DE ARRIBO DE TSUNAMIS':^43}",
         f"{'Coordenadas del epicentro: ':26}",
@@ -188,7 +481,9 @@ def write_salida_txt(
         f"{'Departamento Puertos    Hora_llegada  Hmax(m)  T_arribo':55}",
     ]
 
-    for dept, port, idx in stations:
+    for dept, port, idx in SALIDA_STATIONS:
+        if hours[idx] is None:
+            continue
         h = hours[idx]
         m = minutes[idx]
         val = max_list[idx]
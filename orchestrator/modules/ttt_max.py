@@ -1,15 +1,32 @@
 import contextlib
 import logging
 import os
-import subprocess
-import tempfile
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 import numpy as np
+import pygmt
+
+from orchestrator.utils.render_service import RenderRequest
+from orchestrator.utils.stations import (
+    Gauge,
+    TidalStation,
+    gauge_layout,
+    load_gauges,
+    load_stations,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# Y-axis half ranges of the mareograms (m), the smallest one above the maximum
+# wave height is used
+MAREOGRAM_SCALES = [0.1, 0.2, 0.6, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+# Y-axis grid spacing by half range
+MAREOGRAM_GRID = [(0.2, 0.05), (2.0, 0.2), (float("inf"), 1.0)]
+
+
 @contextlib.contextmanager
 def change_dir(destination: Path):
     """
@@ -32,279 +49,214 @@ def process_tsunami_data(working_dir: Path) -> None:
     """
     logger.info("Processing tsunami wave height and timing data...")
 
-    # Define constants
-    m = 1681  # Number of time steps
-
-    # Station names
-    station_names = [
-        "cruz",
-        "tala",
-        "pait",
-        "pime",
-        "sala",
-        "chim",
-        "huar",
-        "huac",
-        "cala",
-        "cerr",
-        "pisc",
-        "juan",
-        "atic",
-        "cama",
-        "mata",
-        "iloo",
-        "aric",
-    ]
-
-    # Initialize arrays for each station
-    station_data = {name: np.zeros(m) for name in station_names}
+    gauges = load_gauges()
+    stations = load_stations()
 
     with change_dir(working_dir):
-        # Read the input file
-        logger.info("Reading green.dat...")
-        try:
-            data = np.loadtxt("./zfolder/green.dat")
-        except Exception as e:
-            logger.error(f"Error reading green.dat: {e}")
-            raise FileNotFoundError(f"Failed to read green.dat: {e}") from e
-
-        # Extract data columns
-        tiem = data[:, 0]
-        for i, name in enumerate(station_names):
-            station_data[name] = data[:, i + 1]
-
-        # Apply scaling factors ("Relacion de Green")
-        scaling_factors = {
-            "cruz": (12.9 / 14.0) ** (0.25),
-            "tala": (183.1 / 20.0) ** (0.25),
-            "pait": (50.0 / 210.0) ** (0.25),
-            "pime": (26.2 / 54.0) ** (0.25),
-            "sala": (247.1 / 24.0) ** (0.25),
-            "chim": (51.7 / 28.0) ** (0.25),
-            "huar": (69.7 / 14.0) ** (0.25),
-            "huac": (148.9 / 12.0) ** (0.25),
-            "cala": (76.0 / 16.0) ** (0.25),
-            "cerr": (125.4 / 12.0) ** (0.25),
-            "pisc": (25.0 / 36.0) ** (0.25),
-            "juan": (222.2 / 8.0) ** (0.25),
-            "atic": (163.5 / 84.0) ** (0.25),
-            "cama": (46.1 / 350.0) ** (0.25),
-            "mata": (313.4 / 112.0) ** (0.25),
-            "iloo": (455.9 / 26.0) ** (0.25),
-            "aric": (48.0 / 10.0) ** (0.25),
-        }
-
-        for name, factor in scaling_factors.items():
-            station_data[name] = factor * station_data[name]
+        tiem, layout, heights = read_scaled_heights(gauges)
+
+        # Mareogram series of the active stations sampled by this grid
+        series = mareogram_series(stations, gauges, layout, heights)
 
         # Write to green_rev.dat using scientific notation format
         logger.info("Writing green_rev.dat...")
         try:
-            with open("./zfolder/green_rev.dat", "w") as f:
-                for k in range(m):
-                    time_val = tiem[k] / 60.0
-                    tala_val = station_data["tala"][k]
-                    cala_val = station_data["cala"][k]
-                    mata_val = station_data["mata"][k]
-                    f.write(
-                        f"{time_val:12.6f} {fortran_float_format(tala_val)} {fortran_float_format(cala_val)} {fortran_float_format(mata_val)}\n"  # noqa: E501
-                    )
+            write_scaled_series(
+                "./zfolder/green_rev.dat",
+                tiem / 60.0,
+                np.column_stack(list(series.values())),
+            )
         except Exception as e:
             logger.error(f"Error writing green_rev.dat: {e}")
             raise IOError(f"Failed to write green_rev.dat: {e}") from e
 
-        # Find first non-zero readings and maximum values
-        first_nonzero = {}
-        max_values = {}
-        for name in station_names:
-            nonzero_indices = np.where(station_data[name] > 0.0)[0]
-            first_nonzero[name] = (
-                nonzero_indices[0] + 1 if nonzero_indices.size > 0 else 0
-            )
-            max_values[name] = np.max(station_data[name])
+        # First positive reading (1-based, 0 when the wave never arrives) and
+        # maximum of every gauge, gauges not sampled by this grid stay nan
+        arrived = heights > 0.0
+        first_nonzero = np.full(len(gauges), np.nan)
+        max_values = np.full(len(gauges), np.nan)
+        first_nonzero[layout] = np.where(
+            arrived.any(axis=0), arrived.argmax(axis=0) + 1, 0
+        )
+        max_values[layout] = heights.max(axis=0)
 
         # Write to ttt_max.dat
         logger.info("Writing ttt_max.dat...")
         try:
-            with open("ttt_max.dat", "w") as f:
-                for name in station_names:
-                    index_val = float(first_nonzero[name])
-                    max_val = max_values[name]
-                    f.write(f"{index_val:6.1f}{max_val:6.2f}\n")
+            np.savetxt(
+                "ttt_max.dat",
+                np.column_stack([first_nonzero, max_values]),
+                fmt=["%6.1f", "%6.2f"],
+                delimiter="",
+            )
         except Exception as e:
             logger.error(f"Error writing ttt_max.dat: {e}")
             raise IOError(f"Failed to write ttt_max.dat: {e}") from e
 
-        # Find the overall maximum value
-        maxmax = max(max_values.values())
-        logger.info(f"Maximum wave height: {maxmax}")
-
-        # Run appropriate plotting function based on maximum value
-        if maxmax <= 0.1:
-            plot_mareograma(scale=0.1, tick_type="small")
-        elif maxmax <= 0.2:
-            plot_mareograma(scale=0.2, tick_type="small")
-        elif maxmax <= 0.6:
-            plot_mareograma(scale=0.6, tick_type="medium")
-        elif maxmax <= 1.0:
-            plot_mareograma(scale=1.0, tick_type="medium")
-        elif maxmax <= 2.0:
-            plot_mareograma(scale=2.0, tick_type="medium")
-        elif maxmax <= 3.0:
-            plot_mareograma(scale=3.0, tick_type="large")
-        elif maxmax <= 4.0:
-            plot_mareograma(scale=4.0, tick_type="large")
-        else:
-            plot_mareograma(scale=5.0, tick_type="large")
-
         logger.info("Successfully created ttt_max.dat")
 
 
-def fortran_float_format(value: float) -> str:
+def read_scaled_heights(
+    gauges: List[Gauge],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Format a floating point number to match Fortran's scientific notation style.
-    For small values near zero, returns a formatted zero.
-
-    Args:
-        value: The floating point number to format.
+    Read zfolder/green.dat and move its wave heights to the coast.
 
     Returns:
-        A string with Fortran-style formatted value.
+        Sample times (min), index in gauges of each column and the scaled
+        heights with one column per gauge.
     """
-    if abs(value) < 1e-12:
-        return "  0.0000000E+00"
-    formatted = f"{value:17.7E}"
-    return formatted.replace("e", "E")
+    logger.info("Reading green.dat...")
+    try:
+        data = np.loadtxt("./zfolder/green.dat")
+    except Exception as e:
+        logger.error(f"Error reading green.dat: {e}")
+        raise FileNotFoundError(f"Failed to read green.dat: {e}") from e
+
+    # One column per gauge of the grid, the number of samples depends on the
+    # simulated duration chosen for the job (see run.dat)
+    layout = gauge_layout(gauges, data.shape[1] - 1)
+
+    # Apply scaling factors ("Relacion de Green")
+    factors = np.array([gauges[i].green_factor for i in layout])
+    return data[:, 0], layout, data[:, 1:] * factors
+
+
+def mareogram_series(
+    stations: List[TidalStation],
+    gauges: List[Gauge],
+    layout: np.ndarray,
+    heights: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Heights of the active stations with a gauge in the layout, by name."""
+    columns = {gauges[i].name: k for k, i in enumerate(layout)}
+    return {
+        s.name: heights[:, columns[s.gauge]]
+        for s in stations
+        if s.active and s.gauge in columns
+    }
+
+
+def mareogram_request(working_dir: Path) -> RenderRequest:
+    """Series and axes of the mareograms of the active stations, in memory."""
+    gauges = load_gauges()
+    stations = load_stations()
+
+    with change_dir(working_dir):
+        tiem, layout, heights = read_scaled_heights(gauges)
+
+    # Overall maximum wave height picks the y-axis range
+    maxmax = np.max(heights)
+    logger.info(f"Maximum wave height: {maxmax}")
+    scale = next((s for s in MAREOGRAM_SCALES if maxmax <= s), 5.0)
 
+    # Time axis covers the whole simulated window (in hours)
+    tdur = max(1, int(np.ceil(tiem[-1] / 60.0)))
 
-def plot_mareograma(scale: float, tick_type: str) -> None:
+    return RenderRequest(
+        plot_mareograma,
+        {
+            "time": tiem / 60.0,
+            "series": mareogram_series(stations, gauges, layout, heights),
+            "scale": scale,
+            "tdur": tdur,
+            "output": working_dir / "mareograma.eps",
+        },
+    )
+
+
+def generate_mareogram_plot(working_dir: Path) -> None:
     """
-    Generate a mareograma plot using GMT commands.
-    Replaces: mareograma.csh, mareograma2.csh, mareograma3.csh
+    Plot the mareograms of the active stations.
 
     Args:
-        scale: Y-axis scale value.
-        tick_type: Tick interval style ("small", "medium", or "large").
+        working_dir: Working directory for the job.
     """
-    logger.info(f"Plotting mareograma with scale={scale}, tick_type={tick_type}")
-    datafile = "./zfolder/green_rev.dat"
-    size = "15.0c/3.0c"
-    psfile = "mareograma.ps"
-    dy = "4.2c"
-    tdur = 28  # Time duration in hours
-
-    # Determine tick interval
-    if tick_type == "small":
-        y_tick = f"a{scale}g.05"  # mareograma1.csh (0.05 intervals)
-    elif tick_type == "medium":
-        y_tick = f"a{scale}g.2"  # mareograma.csh (0.2 intervals)
-    else:  # large
-        y_tick = f"a{scale}g1."  # mareograma2.csh (1.0 intervals)
-
-    # Initialize GMT settings
-    gmt_init_commands = [
-        "gmt set MAP_FRAME_TYPE=plain",
-        "gmt set FONT_ANNOT_PRIMARY 9",
-        "gmt set FONT_LABEL 9",
-        "gmt set FONT_TITLE 9",
-        "gmt set PS_MEDIA A4",
-    ]
-    for cmd in gmt_init_commands:
-        try:
-            subprocess.run(cmd, shell=True, check=True)
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"GMT initialization command failed: {e}")
+    mareogram_request(working_dir)()
 
-    temp_files = []
-    try:
-        # Plot Talara
-        station = "Talara"
-        region = f"0/{tdur}/-{scale}/{scale}"
-        axis = f'a2g1:"":/a{y_tick}:"":SW'
-        cmd = (
-            f"gmt psbasemap -JX{size} -R{region} -B{axis} "
-            f"-P -K -X3.0c -Y24.0c > {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
 
-        cmd = (
-            f"awk '{{ print $1,$2 }}' {datafile} | "
-            f"gmt psxy -W.5,blue -JX{size} -R{region} "
-            f"-K -O -P >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
-
-        # Add Talara label
-        with tempfile.NamedTemporaryFile(delete=False, mode="w") as talara_text:
-            talara_text.write(f"0.2 4.0 11 0 0 LT {station}\n")
-            talara_filename = talara_text.name
-        temp_files.append(talara_filename)
-        cmd = f"gmt pstext -JX{size} -R0/10/0/4 -K -O < {talara_filename} >> {psfile}"
-        subprocess.run(cmd, shell=True, check=True)
-
-        # Plot Callao
-        station = "Callao"
-        region = f"0/{tdur}/-{scale}/{scale}"
-        axis = f'a2g1:"":/a{y_tick}:"H\\40(m)":SW'
-        cmd = (
-            f"gmt psbasemap -JX{size} -R{region} -B{axis} "
-            f"-P -K -X0 -Y-{dy} -O >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
+def fortran_float_format(values: np.ndarray) -> np.ndarray:
+    """
+    Format floating point numbers to match Fortran's scientific notation style.
+    Values near zero are returned as a formatted zero.
 
-        cmd = (
-            f"awk '{{ print $1,$3 }}' {datafile} | "
-            f"gmt psxy -W.5,blue -JX{size} -R{region} "
-            f"-K -O -P >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
-
-        with tempfile.NamedTemporaryFile(delete=False, mode="w") as callao_text:
-            callao_text.write(f"0.2 4.0 11 0 0 LT {station}\n")
-            callao_filename = callao_text.name
-        temp_files.append(callao_filename)
-        cmd = (
-            f"gmt pstext -JX{size} -R0/10/0/4 -K -O -V < {callao_filename} >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
-
-        # Plot Matarani
-        station = "Matarani"
-        region = f"0/{tdur}/-{scale}/{scale}"
-        axis = f'a2g1:"Time\\40(h)":/a{y_tick}:"":SW'
-        cmd = (
-            f"gmt psbasemap -JX{size} -R{region} -B{axis} "
-            f"-P -K -X0 -Y-{dy} -O >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
+    Args:
+        values: Array of floating point numbers.
+
+    Returns:
+        Array of strings with Fortran-style formatted values.
+    """
+    formatted = np.char.mod("%17.7E", values)
+    return np.where(np.abs(values) < 1e-12, "  0.0000000E+00", formatted)
 
-        cmd = (
-            f"awk '{{ print $1,$4 }}' {datafile} | "
-            f"gmt psxy -W.5,blue -JX{size} -R{region} "
-            f"-K -O -P >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
-
-        with tempfile.NamedTemporaryFile(delete=False, mode="w") as matarani_text:
-            matarani_text.write(f"0.2 4.0 11 0 0 LT {station}\n")
-            matarani_filename = matarani_text.name
-        temp_files.append(matarani_filename)
-        cmd = (
-            f"gmt pstext -JX{size} -R0/10/0/4 -K -O -V < "
-            f"{matarani_filename} >> {psfile}"
-        )
-        subprocess.run(cmd, shell=True, check=True)
 
-        # Convert PS to EPS and cleanup
-        subprocess.run(f"ps2eps {psfile} -f", shell=True, check=True)
-        subprocess.run(f"rm {psfile}", shell=True, check=True)
-    except subprocess.CalledProcessError as e:
+def write_scaled_series(path: str, time: np.ndarray, series: np.ndarray) -> None:
+    """Write the time (h) and one column per station of scaled wave heights."""
+    table = np.column_stack([np.char.mod("%12.6f", time), fortran_float_format(series)])
+    np.savetxt(path, table, fmt="%s", delimiter=" ")
+
+
+def plot_mareograma(
+    time: np.ndarray,
+    series: Dict[str, np.ndarray],
+    scale: float,
+    tdur: int = 28,
+    output: Path = Path("mareograma.eps"),
+) -> None:
+    """
+    Plot the mareogram of each station in a single figure, one panel per
+    station, straight from the arrays in memory.
+    Replaces: mareograma.csh, mareograma2.csh, mareograma3.csh
+
+    Args:
+        time: Sample times in hours.
+        series: Scaled wave heights keyed by station name, in panel order.
+        scale: Y-axis half range in meters.
+        tdur: Time axis length in hours.
+        output: Path of the EPS file.
+    """
+    if not series:
+        raise ValueError("No active station has a gauge in this grid")
+    logger.info(f"Plotting mareograma for {len(series)} stations, scale={scale}")
+
+    y_grid = next(g for limit, g in MAREOGRAM_GRID if scale <= limit)
+    fig = pygmt.Figure()
+    try:
+        with pygmt.config(
+            MAP_FRAME_TYPE="plain",
+            FONT_ANNOT_PRIMARY="9p",
+            FONT_LABEL="9p",
+            FONT_TITLE="9p",
+            PS_MEDIA="A4",
+        ):
+            with fig.subplot(
+                nrows=len(series),
+                ncols=1,
+                subsize=("15c", "3c"),
+                margins=["0c", "1.2c"],
+            ):
+                for i, (name, heights) in enumerate(series.items()):
+                    frame = ["SW", "xa2g1", f"ya{scale}g{y_grid}"]
+                    if i == len(series) // 2:
+                        frame.append("y+lH (m)")
+                    if i == len(series) - 1:
+                        frame.append("x+lTime (h)")
+                    fig.basemap(
+                        region=[0, tdur, -scale, scale],
+                        projection="X?",
+                        frame=frame,
+                        panel=i,
+                    )
+                    fig.plot(x=time, y=heights, pen="0.5p,blue")
+                    fig.text(
+                        position="TL",
+                        text=name,
+                        font="11p",
+                        justify="LT",
+                        offset="0.3c/0c",
+                        no_clip=True,
+                    )
+        fig.savefig(str(output))
+    except pygmt.exceptions.GMTError as e:
         logger.error(f"Error during mareograma plotting: {e}")
         raise RuntimeError(f"Failed to plot mareograma: {e}") from e
-    finally:
-        # Clean up temporary files
-        for file in temp_files:
-            try:
-                os.unlink(file)
-            except Exception as e:
-                logger.warning(f"Failed to remove temporary file {file}: {e}")
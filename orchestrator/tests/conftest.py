@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="session")
+def synthetic_calculator():
+    """TsunamiCalculator over a small random grid, without the model files."""
+    from orchestrator.core.calculator import TsunamiCalculator
+
+    rng = np.random.default_rng(0)
+    ports = np.array([[-77.1, -12.0], [-71.3, -17.6], [-80.4, -3.5]])
+    arrays = {
+        "vlat": np.linspace(-30.0, 10.0, 161),
+        "vlon": np.linspace(-95.0, -65.0, 121),
+        "bathymetry": -rng.uniform(100.0, 6000.0, (161, 121)),
+        "maper1": np.column_stack([ports, np.zeros(len(ports))]),
+        "mechanism_data": np.array([[-78.0, -12.0, 330.0], [-72.0, -18.0, 310.0]]),
+        "port_coords": ports,
+    }
+    return TsunamiCalculator.from_arrays(arrays, ["CALLAO", "ILO", "TALARA"])
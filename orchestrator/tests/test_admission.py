@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from orchestrator.core.config import CLIENT_JOBS_KEY, CLIENT_RESERVATION_KEY
+from orchestrator.utils import admission
+
+QUOTA = admission.CLIENT_MAX_ACTIVE_JOBS
+
+
+def make_load(queued, running=0, workers=1):
+    return {
+        "queued": queued,
+        "running": running,
+        "workers": workers,
+        "minutes": {"fine": 25.0, "coarse": 5.0, "batch": 60.0},
+        "queued_minutes": 20.0,
+    }
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    class FakeQueue:
+        load = make_load(0)
+        active = 0
+
+        def queue_load(self):
+            return self.load
+
+    fake = FakeQueue()
+    monkeypatch.setattr(admission, "tsdhn_queue", fake)
+
+    async def reserve_slot(client, job_id):
+        if fake.active >= QUOTA:
+            return False
+        fake.active += 1
+        return True
+
+    monkeypatch.setattr(admission, "_reserve_slot", reserve_slot)
+    monkeypatch.setattr(admission, "missing_grid_files", lambda resolution: [])
+    return fake
+
+
+def test_estimate_wait():
+    assert admission.estimate_wait(make_load(3, running=2, workers=2)) == 40.0
+    # No worker listening counts as one
+    assert admission.estimate_wait(make_load(1, workers=0)) == 20.0
+
+
+def test_admit_accepts_short_queue(queue):
+    result = asyncio.run(admission.admit("client", "fine"))
+    assert result.kind == "fine" and not result.downgraded
+    assert result.wait_minutes == 0.0 and result.result_minutes == 25.0
+    # The job id holds a slot of the client quota
+    assert queue.active == 1
+
+
+def test_admit_downgrades_or_refuses(queue):
+    # 4 jobs ahead on one worker: 80 min wait, fine would end after 105 min
+    queue.load = make_load(4)
+    result = asyncio.run(admission.admit("client", "fine", allow_downgrade=True))
+    assert result.kind == "coarse" and result.downgraded
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(admission.admit("client", "fine"))
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == str(15 * 60)
+    # Refused jobs do not reserve a slot
+    assert queue.active == 1
+
+
+def test_admit_refuses_without_coarse_grid(queue, monkeypatch):
+    queue.load = make_load(4)
+    monkeypatch.setattr(
+        admission, "missing_grid_files", lambda resolution: ["bathy/grid_a5.grd"]
+    )
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(admission.admit("client", "fine", allow_downgrade=True))
+    assert error.value.status_code == 429
+
+
+def test_admit_enforces_client_quota(queue):
+    queue.active = QUOTA
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(admission.admit("client", "coarse"))
+    assert error.value.status_code == 429
+
+
+def run_on_redis(monkeypatch, scenario):
+    """Run scenario(redis) with admission on an in-memory Redis with Lua."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    async def main():
+        redis = fakeredis.FakeAsyncRedis()
+        monkeypatch.setattr(
+            admission, "tsdhn_queue", SimpleNamespace(async_redis=redis)
+        )
+        return await scenario(redis)
+
+    return asyncio.run(main())
+
+
+def reserve(client, job_id):
+    return admission._reserve_slot(client, job_id)
+
+
+def test_reserve_script_stops_at_the_quota(monkeypatch):
+    async def scenario(redis):
+        granted = [await reserve("a", f"job{i}") for i in range(QUOTA + 1)]
+        assert granted == [True] * QUOTA + [False]
+        # Quotas are per client
+        assert await reserve("b", "other")
+        # A released slot can be reserved again
+        await admission.release_slot("a", "job0")
+        assert await reserve("a", "job5")
+        assert not await reserve("a", "job6")
+        return await redis.smembers(CLIENT_JOBS_KEY.format("a"))
+
+    members = run_on_redis(monkeypatch, scenario)
+    assert members == {f"job{i}".encode() for i in range(1, 6)} - {b"job4"}
+
+
+def test_reserve_script_counts_only_active_jobs(monkeypatch):
+    async def scenario(redis):
+        for i in range(QUOTA):
+            assert await reserve("a", f"job{i}")
+        # job0 started, job1 finished, job2 stopped, job3 was never enqueued
+        # and its reservation expired
+        await redis.hset("rq:job:job0", "status", "started")
+        await redis.hset("rq:job:job1", "status", "finished")
+        await redis.hset("rq:job:job2", "status", "stopped")
+        await redis.delete(CLIENT_RESERVATION_KEY.format("job3"))
+        # Enqueued jobs count without their reservation
+        await redis.delete(CLIENT_RESERVATION_KEY.format("job0"))
+
+        granted = [await reserve("a", f"new{i}") for i in range(QUOTA)]
+        assert granted == [True] * (QUOTA - 1) + [False]
+        assert await redis.ttl(CLIENT_RESERVATION_KEY.format("new0")) > 0
+        return await redis.smembers(CLIENT_JOBS_KEY.format("a"))
+
+    members = run_on_redis(monkeypatch, scenario)
+    assert members == {b"job0"} | {f"new{i}".encode() for i in range(QUOTA - 1)}
+
+
+def test_reserve_script_is_atomic_under_concurrent_requests(monkeypatch):
+    async def scenario(redis):
+        await redis.hset("rq:job:running", "status", "started")
+        await redis.sadd(CLIENT_JOBS_KEY.format("a"), "running")
+        return await asyncio.gather(*(reserve("a", f"job{i}") for i in range(10)))
+
+    granted = run_on_redis(monkeypatch, scenario)
+    assert sum(granted) == QUOTA - 1
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from orchestrator.core import artifacts
+
+JOB_ID = "dee661ec-1c39-47e5-bb50-3926fa70bb8e"
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "STORE_DIR", tmp_path / "store")
+    work_dir = tmp_path / "job"
+    (work_dir / "zfolder").mkdir(parents=True)
+    (work_dir / "bathy").mkdir()
+
+    xa = np.linspace(200.0, 210.0, 11)
+    ya = np.linspace(-20.0, -12.0, 9)
+    np.savetxt(work_dir / "bathy" / "xa.dat", xa)
+    np.savetxt(work_dir / "bathy" / "ya.dat", ya)
+    # Fortran order: longitude varies fastest in each latitude column
+    zmax = np.add.outer(ya, xa).astype(np.float32)
+    np.savetxt(work_dir / "zfolder" / "zmax_a.grd", zmax.T.reshape(-1, order="F"))
+
+    time = np.arange(0.0, 120.0)
+    heights = np.outer(np.sin(time / 10.0), [1.0, 2.0, 3.0])
+    np.savetxt(work_dir / "zfolder" / "green.dat", np.column_stack([time, heights]))
+    ttt_max = np.column_stack([30.0 + 10.0 * np.arange(17), np.full(17, 0.5)])
+    ttt_max[0] = np.nan
+    ttt_max[2] = 0.0
+    np.savetxt(work_dir / "ttt_max.dat", ttt_max, fmt="%6.2f")
+    (work_dir / "meca.dat").write_text(
+        " 287.50 -18.00  30.00 310.00  18.00  90.00   8.80 0 0 1200\n"
+    )
+    return work_dir
+
+
+def test_ingest_registers_job(job_dir):
+    artifacts.ingest_job(JOB_ID, job_dir)
+    entry = artifacts.get_entry(JOB_ID)
+    assert entry["gauges"] == "tala,cala,mata"
+    assert entry["lon"] == pytest.approx(-72.5)
+    assert entry["mw"] == pytest.approx(8.8)
+    assert entry["n_times"] == 120
+
+
+def test_gauge_series_window(job_dir):
+    artifacts.ingest_job(JOB_ID, job_dir)
+    result = artifacts.read_gauge_series(JOB_ID, "cala", start=10.0, end=19.0)
+    assert result["time"] == list(np.arange(10.0, 20.0))
+    raw = np.array(result["gauges"]["cala"]["raw"])
+    np.testing.assert_allclose(raw, 2.0 * np.sin(np.arange(10.0, 20.0) / 10.0), 1e-6)
+    with pytest.raises(KeyError):
+        artifacts.read_gauge_series(JOB_ID, "cruz")
+
+
+def test_zmax_window(job_dir):
+    artifacts.ingest_job(JOB_ID, job_dir)
+    result = artifacts.read_zmax_window(JOB_ID, -18.0, -16.0, 202.0, 205.0)
+    assert result["lat"] == [-18.0, -17.0, -16.0]
+    assert result["lon"] == [202.0, 203.0, 204.0, 205.0]
+    np.testing.assert_allclose(
+        result["zmax"], np.add.outer(result["lat"], result["lon"]), rtol=1e-6
+    )
+    with pytest.raises(ValueError):
+        artifacts.read_zmax_window(JOB_ID, -20, -12, 200, 210, max_cells=10)
+
+
+def test_source_distance_wraps_strike():
+    source = {"lat": -18.0, "lon": -72.5, "depth": 30.0, "mw": 8.8, "strike": 350.0}
+    other = {**source, "strike": 10.0}
+    assert artifacts.source_distance(source, other) == pytest.approx(20.0 / 45.0)
+
+
+def test_find_similar(job_dir):
+    artifacts.ingest_job(JOB_ID, job_dir)
+    source = {"lat": -18.2, "lon": -72.4, "depth": 25.0, "mw": 8.7, "strike": 305.0}
+    (event,) = artifacts.find_similar(source)
+    assert event["job_id"] == JOB_ID
+    assert 0.0 < event["distance"] < 1.0
+    # La Cruz has no arrival in the archived run
+    assert event["stations"][0] == {
+        "port": "Talara",
+        "arrival_minutes": 40.0,
+        "max_height": 0.5,
+    }
+    # Nor Paita, which the wave never reached
+    assert "Paita" not in [station["port"] for station in event["stations"]]
+    assert artifacts.find_similar({**source, "mw": 7.5}) == []
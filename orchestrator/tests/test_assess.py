@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from cli.core import SimulationManager
+from orchestrator import main
+
+EVENT = {"Mw": 8.8, "h": 30.0, "lat0": -12.0, "lon0": -78.0, "hhmm": "1200"}
+
+
+@pytest.fixture
+def client(synthetic_calculator, monkeypatch):
+    async def no_similar_events(data, calculation):
+        return []
+
+    async def forget_input(client, data):
+        pass
+
+    monkeypatch.setattr(main, "calculator", synthetic_calculator)
+    monkeypatch.setattr(main, "calculator_pool", None)
+    monkeypatch.setattr(main, "find_similar_events", no_similar_events)
+    monkeypatch.setattr(main, "remember_input", forget_input)
+    return TestClient(main.app)
+
+
+def test_assess_combines_calculation_and_travel_times(client):
+    response = client.post("/assess", json=EVENT)
+    assert response.status_code == 200
+    result = response.json()
+
+    assert result["calculation"] == client.post("/calculate", json=EVENT).json()
+    assert (
+        result["travel_times"]
+        == client.post("/tsunami-travel-times", json=EVENT).json()
+    )
+    assert set(result["travel_times"]["arrival_times"]) == {"CALLAO", "ILO", "TALARA"}
+    assert result["job"] is None
+
+
+def test_assess_enqueues_the_tsdhn_job(client, monkeypatch):
+    enqueued = []
+
+    async def enqueue_tsdhn(payload, data, calculation, client_id):
+        enqueued.append((payload, data, calculation))
+        return {"status": "queued", "job_id": "job-1"}
+
+    monkeypatch.setattr(main, "enqueue_tsdhn", enqueue_tsdhn)
+    response = client.post(
+        "/assess",
+        json={"earthquake": EVENT, "run_tsdhn": True, "skip_steps": ["reports"]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["job"] == {"status": "queued", "job_id": "job-1"}
+    payload, data, calculation = enqueued[0]
+    assert payload.skip_steps == ["reports"]
+    assert data.Mw == 8.8
+    assert calculation.length == response.json()["calculation"]["length"]
+
+
+class FakeAPIClient:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    async def call_endpoint(self, endpoint, data, **kwargs):
+        self.calls.append((endpoint, data))
+        return self.response
+
+
+def test_cli_runs_the_assessment_in_one_request():
+    manager = SimulationManager(
+        {"simulation_params": dict(EVENT), "skip_steps": ["reports"]}
+    )
+    client = FakeAPIClient(
+        {"calculation": {}, "travel_times": {}, "job": {"job_id": "job-1"}}
+    )
+
+    assert asyncio.run(manager._execute_calculation_steps(client)) == "job-1"
+    assert client.calls == [
+        ("assess", {**EVENT, "skip_steps": ["reports"], "run_tsdhn": True})
+    ]
+
+    client.response = {"calculation": {}, "travel_times": {}, "job": None}
+    assert asyncio.run(manager._execute_calculation_steps(client)) is None
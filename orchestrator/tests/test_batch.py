@@ -0,0 +1,162 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from cli import batch
+from cli.batch import BatchRunner, load_scenarios
+
+
+def test_load_scenarios_from_csv(tmp_path):
+    path = tmp_path / "escenarios.csv"
+    path.write_text(
+        "name,Mw,h,lat0,lon0,hhmm,resolution\n"
+        "callao,8.8,30,-12.0,-77.5,0030,coarse\n"
+        ",9.0,25,-18.0,-71.5,,\n"
+    )
+    first, second = load_scenarios(path)
+
+    assert first == {
+        "name": "callao",
+        "Mw": 8.8,
+        "h": 30.0,
+        "lat0": -12.0,
+        "lon0": -77.5,
+        "hhmm": "0030",
+        "resolution": "coarse",
+    }
+    # Empty cells are left to the API defaults
+    assert second == {
+        "name": "escenario_002",
+        "Mw": 9.0,
+        "h": 25.0,
+        "lat0": -18.0,
+        "lon0": -71.5,
+    }
+
+
+def test_load_scenarios_from_yaml(tmp_path):
+    path = tmp_path / "escenarios.yaml"
+    path.write_text(
+        "scenarios:\n"
+        "  - {name: arica, Mw: 9.1, h: 20, lat0: -18.5, lon0: -71.0, hhmm: 0030}\n"
+        "  - {Mw: 8.5, h: 15, lat0: -3.5, lon0: -81.0}\n"
+    )
+    first, second = load_scenarios(path)
+    assert first["name"] == "arica" and first["Mw"] == 9.1
+    # Read as text, not as the octal number 24
+    assert first["hhmm"] == "0030"
+    assert second["name"] == "escenario_002"
+
+    path.write_text("- {Mw: 8.5, h: 15, lat0: -3.5, lon0: -81.0}\n")
+    assert [s["lon0"] for s in load_scenarios(path)] == [-81.0]
+
+
+@pytest.mark.parametrize(
+    "name, content, message",
+    [
+        ("faltan.csv", "Mw,h,lat0\n8.8,30,-12\n", "falta el campo 'lon0'"),
+        ("texto.csv", "Mw,h,lat0,lon0\nocho,30,-12,-77\n", "Escenario 1"),
+        ("lista.yaml", "- 8.8\n", "se esperaba un objeto"),
+        ("datos.json", "[]", "Formato no soportado"),
+    ],
+)
+def test_load_scenarios_rejects_invalid_files(tmp_path, name, content, message):
+    path = tmp_path / name
+    path.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        load_scenarios(path)
+
+
+class StubAPI:
+    """
+    /assess of a server under admission control: the scenario at lat0 -1 is
+    throttled twice with 429, the one at lat0 -9 fails with 500 and the others
+    take 0.2 s. Every job is completed at the first status poll.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.normal_in_flight = 0
+        self.max_normal_in_flight = 0
+        self.throttled = 0
+        self.accepted = []
+
+    async def assess(self, request):
+        payload = await request.json()
+        assert payload["run_tsdhn"]
+        lat = payload["lat0"]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if lat == -1.0 and self.throttled < 2:
+                self.throttled += 1
+                return web.json_response({"detail": "busy"}, status=429)
+            if lat == -9.0:
+                return web.json_response({"detail": "error"}, status=500)
+            if lat != -1.0:
+                self.normal_in_flight += 1
+                self.max_normal_in_flight = max(
+                    self.max_normal_in_flight, self.normal_in_flight
+                )
+                await asyncio.sleep(0.2)
+                self.normal_in_flight -= 1
+            self.accepted.append(lat)
+            return web.json_response(
+                {"job": {"job_id": f"job{-lat:.0f}", "resolution": "fine"}}
+            )
+        finally:
+            self.in_flight -= 1
+
+    async def health(self, request):
+        return web.json_response({"status": "ok"})
+
+    async def statuses(self, request):
+        job_ids = (await request.json())["job_ids"]
+        return web.json_response(
+            {
+                "jobs": {job_id: {"status": "completed"} for job_id in job_ids},
+                "missing": [],
+            }
+        )
+
+    async def report(self, request):
+        return web.Response(body=b"%PDF", content_type="application/pdf")
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        app.router.add_post("/assess", self.assess)
+        app.router.add_post("/job-status:batch", self.statuses)
+        app.router.add_get("/job-result/{job_id}", self.report)
+        return app
+
+
+def test_batch_runner_retries_throttled_scenarios_without_a_slot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(batch, "DEFAULT_RETRY_AFTER", 0.3)
+    api = StubAPI()
+    scenarios = [
+        {"name": f"s{-lat:.0f}", "Mw": 8.8, "h": 30.0, "lat0": lat, "lon0": -77.0}
+        for lat in (-1.0, -2.0, -3.0, -4.0, -9.0)
+    ]
+
+    async def scenario():
+        async with TestServer(api.app()) as server:
+            config = {"base_url": str(server.make_url("")), "check_interval": 0}
+            return await BatchRunner(config, scenarios, concurrency=2).run()
+
+    rows = asyncio.run(scenario())
+
+    assert [row["status"] for row in rows] == ["completed"] * 4 + ["error"]
+    assert rows[-1]["error"] == "HTTP 500"
+    assert api.throttled == 2
+    # While the throttled scenario waits, the other ones use both slots and
+    # are all accepted before it
+    assert api.max_in_flight == 2
+    assert api.max_normal_in_flight == 2
+    assert api.accepted[-1] == -1.0
+    assert Path(rows[0]["report"]).read_bytes() == b"%PDF"
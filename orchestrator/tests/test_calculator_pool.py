@@ -0,0 +1,53 @@
+import asyncio
+import importlib
+import sys
+
+import pytest
+
+from orchestrator.core import calculator_pool
+from orchestrator.core.calculator import TsunamiCalculator
+from orchestrator.core.calculator_pool import CalculatorPool
+from orchestrator.models.schemas import EarthquakeInput
+
+
+def worker_calculator_state():
+    calculator = calculator_pool._calculator
+    # xa is only set when the calculator reads pacifico.mat
+    return hasattr(calculator, "xa"), calculator.bathymetry.flags.writeable
+
+
+def test_pool_matches_in_process_results(synthetic_calculator):
+    events = [
+        EarthquakeInput(Mw=8.5, h=20, lat0=-8.0 - i, lon0=-80.0) for i in range(3)
+    ]
+    pool = CalculatorPool(synthetic_calculator, workers=2)
+
+    async def run_all():
+        return await asyncio.gather(*(pool.run("assess", event) for event in events))
+
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        pool.close()
+    assert results == [synthetic_calculator.assess(event) for event in events]
+
+
+def test_workers_attach_to_the_shared_arrays(synthetic_calculator):
+    pool = CalculatorPool(synthetic_calculator, workers=1)
+    try:
+        loaded, writeable = pool._executor.submit(worker_calculator_state).result()
+    finally:
+        pool.close()
+    assert not loaded
+    assert not writeable
+
+
+def test_importing_main_does_not_load_the_model(monkeypatch):
+    # Spawned workers import the module of the console script again
+    def fail(self):
+        pytest.fail("TsunamiCalculator() called on import")
+
+    monkeypatch.setattr(TsunamiCalculator, "__init__", fail)
+    monkeypatch.delitem(sys.modules, "orchestrator.main", raising=False)
+    main = importlib.import_module("orchestrator.main")
+    assert main.calculator is None
@@ -0,0 +1,141 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from orchestrator.models.schemas import FiniteFault, Subfault
+from orchestrator.modules import deform
+from orchestrator.modules.deform import (
+    METERS_PER_DEGREE,
+    _subfault_origins,
+    compute_deformation,
+    okada_vertical_displacement,
+)
+from orchestrator.utils.file_utils import write_finite_fault
+from orchestrator.utils.finite_fault import parse_usgs_param
+
+MODEL_DIR = Path(__file__).resolve().parents[2] / "model"
+
+
+@pytest.fixture(scope="module")
+def deformation(tmp_path_factory):
+    # Inputs of the deformation committed in model/, written by def_oka.f
+    work_dir = tmp_path_factory.mktemp("deform")
+    (work_dir / "bathy").mkdir()
+    shutil.copy(MODEL_DIR / "pfalla.inp", work_dir)
+    shutil.copy(MODEL_DIR / "xyo.dat", work_dir)
+    shutil.copy(MODEL_DIR / "bathy" / "ya.dat", work_dir / "bathy")
+    compute_deformation(work_dir)
+    return work_dir / "deform_a.grd"
+
+
+def test_deformation_matches_fortran(deformation):
+    expected = np.loadtxt(MODEL_DIR / "deform_a.grd")
+    deformation = np.loadtxt(deformation)
+    assert deformation.shape == expected.shape
+
+    # def_oka.f works in single precision, a few cells near the edges of the
+    # fault carry its rounding noise, the rest agree to the printed digit
+    diff = np.abs(deformation - expected)
+    assert np.mean(diff <= 0.0011) > 0.995
+    assert diff.max() < 0.1
+    assert deformation.max() == pytest.approx(expected.max(), abs=0.01)
+    assert deformation.min() == pytest.approx(expected.min(), abs=0.01)
+
+
+def test_deformation_format(deformation):
+    # Same fixed width rows as FORMAT(4000F9.3) in def_oka.f
+    expected = (MODEL_DIR / "deform_a.grd").read_text().splitlines()
+    lines = deformation.read_text().splitlines()
+    assert len(lines) == len(expected)
+    assert {len(line) for line in lines} == {len(line) for line in expected}
+
+
+def _finite_fault_deformation(work_dir, subfaults):
+    (work_dir / "bathy").mkdir(parents=True)
+    for name in ("xa.dat", "ya.dat"):
+        shutil.copy(MODEL_DIR / "bathy" / name, work_dir / "bathy")
+    write_finite_fault(work_dir, subfaults)
+    compute_deformation(work_dir)
+    window = tuple(map(int, (work_dir / "xyo.dat").read_text().split()[:4]))
+    return window, np.loadtxt(work_dir / "deform_a.grd")
+
+
+# A 4x2 grid of subfaults with variable slip and rake
+SUBFAULTS = [
+    Subfault(
+        lon=-78.0 + 0.3 * along - 0.2 * down,
+        lat=-12.0 + 0.35 * along + 0.15 * down,
+        depth=20.0 + 12.0 * down,
+        length=50.0,
+        width=40.0,
+        strike=320.0,
+        dip=18.0,
+        rake=80.0 + 5.0 * along,
+        slip=2.0 + along + 3.0 * down,
+    )
+    for along in range(4)
+    for down in range(2)
+]
+
+
+@pytest.mark.parametrize("batch_cells", [deform.BATCH_CELLS, 1])
+def test_finite_fault_superposition(tmp_path, monkeypatch, batch_cells):
+    # Batched or not, the deformation is the sum of one okada call per subfault
+    monkeypatch.setattr(deform, "BATCH_CELLS", batch_cells)
+    (ids, ide, jds, jde), actual = _finite_fault_deformation(tmp_path, SUBFAULTS)
+
+    x = np.loadtxt(MODEL_DIR / "bathy" / "xa.dat")[ids - 1 : ide, np.newaxis]
+    y = np.loadtxt(MODEL_DIR / "bathy" / "ya.dat")[np.newaxis, jds - 1 : jde]
+    expected = np.zeros(actual.shape)
+    for f in SUBFAULTS:
+        origin = np.array([[f.lon, f.lat, f.depth, f.length, f.width, f.strike, f.dip]])
+        ref_lon, ref_lat, hh = (v[0] for v in _subfault_origins(origin))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected += okada_vertical_displacement(
+                (x - ref_lon) * METERS_PER_DEGREE,
+                (y - ref_lat) * METERS_PER_DEGREE,
+                f.slip,
+                f.length * 1000.0,
+                f.width * 1000.0,
+                f.strike,
+                f.dip,
+                f.rake,
+                hh,
+            )
+
+    assert np.abs(expected).max() > 1.0
+    # Up to the 3 decimals written to deform_a.grd
+    np.testing.assert_allclose(actual, expected, rtol=0.0, atol=0.0006)
+
+
+def test_finite_fault_ids_count_from_one(tmp_path):
+    _finite_fault_deformation(tmp_path, SUBFAULTS[:2])
+    lines = (tmp_path / "finite_fault.dat").read_text().splitlines()
+    assert [line.split()[0] for line in lines] == ["1", "2"]
+
+    # Ids counted from 0 are rejected
+    (tmp_path / "finite_fault.dat").write_text(
+        "\n".join(f"{n} {line.split(maxsplit=1)[1]}" for n, line in enumerate(lines))
+    )
+    with pytest.raises(ValueError, match="line 1 has subfault id 0, expected 1"):
+        compute_deformation(tmp_path)
+
+
+def test_parse_usgs_param():
+    text = """#Total number of fault_segments=     1
+#Fault_segment =   1 nx(Along-strike)=   2 Dx=  20.00km ny(downdip)=   1 Dy=  15.00km
+#Boundary of Fault_segment     1. EQ in cell (1,1). Lon:   -77.0000   Lat:   -12.0000
+#Lon.  Lat.  Depth
+     -77.10000     -12.10000       5.00000
+#Lat. Lon. depth slip rake strike dip t_rup t_ris t_fal mo
+ -12.0000  -77.0000  20.00  250.00  95.00  320.00  18.00  10.0  4.0  4.0  1.0e+26
+ -11.9000  -77.1000  20.00  100.00  85.00  320.00  18.00  12.0  4.0  4.0  1.0e+26
+"""
+    subfaults = parse_usgs_param(text)
+    assert len(subfaults) == 2
+    assert subfaults[0]["slip"] == pytest.approx(2.5)
+    assert subfaults[1]["length"] == 20.0
+    assert subfaults[1]["width"] == 15.0
+    assert FiniteFault(param=text).subfaults[0].rake == 95.0
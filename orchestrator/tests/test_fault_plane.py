@@ -0,0 +1,61 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from orchestrator.models.schemas import CalculationResponse, EarthquakeInput
+from orchestrator.modules.fault_plane import write_fault_plane
+
+MODEL_DIR = Path(__file__).resolve().parents[2] / "model"
+
+
+@pytest.fixture(scope="module")
+def fault_plane(tmp_path_factory):
+    # Rupture of the Mw 9.0 event in test_numerical_values.py
+    work_dir = tmp_path_factory.mktemp("fault_plane")
+    (work_dir / "bathy").mkdir()
+    for name in ("xa.dat", "ya.dat"):
+        shutil.copy(MODEL_DIR / "bathy" / name, work_dir / "bathy")
+    data = EarthquakeInput(Mw=9.0, h=12.0, lat0=56.0, lon0=-156.0, hhmm="0000")
+    calculation = CalculationResponse(
+        length=575.439937,
+        width=144.543977,
+        dislocation=10.636224,
+        seismic_moment=3.981072e22,
+        tsunami_warning="Genera un Tsunami grande y destructivo",
+        distance_to_coast=10439.472791,
+        azimuth=247.0,
+        dip=18.0,
+        epicenter_location="mar",
+        rectangle_parameters={
+            "a1": -49.150481,
+            "b1": 291.704432,
+            "xo": -153.348142,
+            "yo": 56.446823,
+        },
+        rectangle_corners=[],
+    )
+    write_fault_plane(work_dir, data, calculation)
+    return work_dir
+
+
+def test_pfalla(fault_plane):
+    values = (fault_plane / "pfalla.inp").read_text().split()
+    assert len(values) == 9
+    # Same fault origin as the committed pfalla.inp, from fault_plane.f90
+    expected = (MODEL_DIR / "pfalla.inp").read_text().split()
+    assert int(values[0]) == int(expected[0])
+    assert abs(int(values[1]) - int(expected[1])) <= 1
+    assert float(values[2]) == pytest.approx(10.636224)
+    assert float(values[3]) == pytest.approx(float(expected[3]), rel=1e-6)
+
+
+def test_meca(fault_plane):
+    line = (fault_plane / "meca.dat").read_text().splitlines()[0]
+    assert line == " 204.00  56.00  12.00 247.00  18.00  90.00   9.00 0 0 0000"
+
+
+def test_xyo(fault_plane):
+    ids, ide, jds, jde, ia, ja = map(int, (fault_plane / "xyo.dat").read_text().split())
+    assert 1 <= ids < ide <= ia == 2461
+    assert 1 <= jds < jde <= ja == 2056
@@ -0,0 +1,125 @@
+import math
+import shutil
+
+import numpy as np
+import pytest
+
+from orchestrator.core.config import NESTED_GRID_FILES
+from orchestrator.core.queue import REPO_ROOT, missing_grid_files
+from orchestrator.modules import bathymetry
+from orchestrator.modules.bathymetry import child_axes, ensure_grid_files
+from orchestrator.modules.reporte import build_summary, read_nest_coverage
+from orchestrator.utils.file_utils import setup_workspace, stage_files
+
+MODEL_DIR = REPO_ROOT / "model"
+COORDS = (-77.0, -12.0, 20.0, 330.0, 18.0, 90.0, 8.8, 0.0, 0.0, "0000")
+
+
+def test_nested_grid_lies_inside_the_parent_grid():
+    xa = np.loadtxt(MODEL_DIR / "bathy" / "xa5.dat")
+    ya = np.loadtxt(MODEL_DIR / "bathy" / "ya5.dat")
+    isl, jsl, iel, jel = np.loadtxt(MODEL_DIR / "nest5.dat", dtype=int)
+    assert 1 < isl < iel < len(xa)
+    assert 1 < jsl < jel < len(ya)
+    # Peruvian coast, see README
+    assert xa[isl - 1] == pytest.approx(277.0, abs=0.1)
+    assert xa[iel - 1] == pytest.approx(289.7, abs=0.1)
+    assert ya[jsl - 1] == pytest.approx(-19.5, abs=0.1)
+    assert ya[jel - 1] == pytest.approx(-2.5, abs=0.1)
+
+
+def test_child_axes_match_the_layout_of_tsunami1():
+    xa = np.loadtxt(MODEL_DIR / "bathy" / "xa5.dat")
+    ya = np.loadtxt(MODEL_DIR / "bathy" / "ya5.dat")
+    isl, jsl, iel, jel = np.loadtxt(MODEL_DIR / "nest5.dat", dtype=int)
+    lon, lat = child_axes(MODEL_DIR)
+
+    assert len(lon) == 3 * (iel - isl + 1) + 1
+    assert len(lat) == 3 * (jel - jsl + 1) + 1
+    # Parent cell IS is centered on child cell 3*(IS-ISL)+3 (1-based)
+    for i in (isl, (isl + iel) // 2, iel):
+        assert lon[3 * (i - isl) + 2] == pytest.approx(xa[i - 1])
+    for j in (jsl, (jsl + jel) // 2, jel):
+        assert lat[3 * (j - jsl) + 2] == pytest.approx(ya[j - 1])
+    assert np.diff(lat) == pytest.approx(np.full(len(lat) - 1, 5.0 / 180.0))
+
+
+def test_every_port_is_sampled_on_the_child_grid():
+    xa = np.loadtxt(MODEL_DIR / "bathy" / "xa.dat")
+    ya = np.loadtxt(MODEL_DIR / "bathy" / "ya.dat")
+    xa5 = np.loadtxt(MODEL_DIR / "bathy" / "xa5.dat")
+    ya5 = np.loadtxt(MODEL_DIR / "bathy" / "ya5.dat")
+    fine = np.loadtxt(MODEL_DIR / "tidal.dat", dtype=int)
+    nested = np.loadtxt(MODEL_DIR / "tidal_nest5.dat", dtype=int)
+
+    assert (nested[:, 0] == fine[:, 0]).all()
+    # Same ports as the 4 arc-minute gauges, within one 5 arc-minute cell
+    assert xa5[nested[:, 1] - 1] == pytest.approx(xa[fine[:, 1] - 1], abs=5 / 120)
+    assert ya5[nested[:, 2] - 1] == pytest.approx(ya[fine[:, 2] - 1], abs=5 / 120)
+
+    isl, jsl, iel, jel = np.loadtxt(MODEL_DIR / "nest5.dat", dtype=int)
+    assert ((isl <= nested[:, 1]) & (nested[:, 1] <= iel)).all()
+    assert ((jsl <= nested[:, 2]) & (nested[:, 2] <= jel)).all()
+
+
+def test_missing_grid_files(tmp_path):
+    shutil.copytree(MODEL_DIR / "bathy", tmp_path / "bathy")
+    for name in ("tidal5.dat", "nest5.dat"):
+        shutil.copy(MODEL_DIR / name, tmp_path / name)
+
+    # The 5 arc-minute bathymetries are built on first use
+    assert missing_grid_files("fine", tmp_path) == []
+    assert missing_grid_files("coarse", tmp_path) == []
+    assert missing_grid_files("coarse_then_fine", tmp_path) == []
+    assert missing_grid_files("nested", tmp_path) == ["tidal_nest5.dat"]
+
+
+def test_grid_files_are_built_once_and_staged(tmp_path, monkeypatch):
+    model_dir = tmp_path / "model"
+    shutil.copytree(MODEL_DIR, model_dir, ignore=shutil.ignore_patterns("*.grd"))
+    calls = []
+
+    def fake_depth(model_dir):
+        calls.append(model_dir)
+        return np.full((3, 2), 4000.0)
+
+    monkeypatch.setitem(bathymetry.GRID_BUILDERS, "bathy/grid_a5.grd", fake_depth)
+    monkeypatch.setitem(bathymetry.GRID_BUILDERS, "bathy/grid_b5.grd", fake_depth)
+
+    ensure_grid_files(NESTED_GRID_FILES, model_dir)
+    ensure_grid_files(NESTED_GRID_FILES, model_dir)
+    assert len(calls) == 2
+    assert np.loadtxt(model_dir / "bathy" / "grid_b5.grd").shape == (3, 2)
+
+    work_dir = tmp_path / "job"
+    setup_workspace(model_dir, work_dir)
+    stage_files(work_dir, NESTED_GRID_FILES)
+    assert (work_dir / "tidal.dat").read_text() == (
+        model_dir / "tidal_nest5.dat"
+    ).read_text()
+    assert read_nest_coverage(work_dir) == [True] * 17
+
+
+def ttt_data():
+    ttt = [60.0] * 17
+    return ttt, [0.5] * 17, [1] * 17, [0] * 17
+
+
+def test_nested_summary_is_final_when_the_child_grid_covers_every_port():
+    summary = build_summary(COORDS, ttt_data(), 5, nest_coverage=[True] * 17)
+    assert summary["nested"]
+    assert not summary["preliminary"]
+
+
+def test_nested_summary_is_preliminary_when_a_port_is_outside_the_child_grid():
+    coverage = [True] * 16 + [False]
+    summary = build_summary(COORDS, ttt_data(), 5, nest_coverage=coverage)
+    assert summary["preliminary"]
+
+    # Unless that port has no arrival and is not reported
+    ttt, max_vals, hours, minutes = ttt_data()
+    ttt[16], max_vals[16], hours[16], minutes[16] = math.nan, math.nan, None, None
+    summary = build_summary(
+        COORDS, (ttt, max_vals, hours, minutes), 5, nest_coverage=coverage
+    )
+    assert not summary["preliminary"]
@@ -0,0 +1,23 @@
+import numpy as np
+
+from orchestrator.core.model_bundle import read_bundle, write_bundle
+from orchestrator.models.schemas import EarthquakeInput
+
+STAMP = {"pacifico.mat": ["/model/pacifico.mat", 1024, 1]}
+
+
+def test_bundle_round_trip_is_memory_mapped(tmp_path, synthetic_calculator):
+    write_bundle(synthetic_calculator, tmp_path, STAMP)
+    calculator = read_bundle(tmp_path, STAMP)
+
+    assert isinstance(calculator.bathymetry, np.memmap)
+    assert calculator.port_names == synthetic_calculator.port_names
+    event = EarthquakeInput(Mw=8.5, h=20, lat0=-9.0, lon0=-80.0)
+    assert calculator.assess(event) == synthetic_calculator.assess(event)
+
+
+def test_stale_or_missing_bundle_is_ignored(tmp_path, synthetic_calculator):
+    assert read_bundle(tmp_path, STAMP) is None
+    write_bundle(synthetic_calculator, tmp_path, STAMP)
+    changed = {"pacifico.mat": ["/model/pacifico.mat", 1024, 2]}
+    assert read_bundle(tmp_path, changed) is None
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from orchestrator.core import queue
+from orchestrator.models.schemas import EarthquakeInput
+
+
+def test_retired_skip_steps_are_ignored():
+    assert queue._validate_skip_steps(["fault_plane", "deform"]) == ["deform"]
+    with pytest.raises(ValueError):
+        queue._validate_skip_steps(["fault_planes"])
+
+
+def test_last_input_is_kept_per_client(monkeypatch):
+    class FakeRedis:
+        def __init__(self):
+            self.values = {}
+
+        async def set(self, key, value, ex=None):
+            self.values[key] = value.encode()
+
+        async def get(self, key):
+            return self.values.get(key)
+
+    monkeypatch.setattr(queue.tsdhn_queue, "async_redis", FakeRedis())
+    data = EarthquakeInput(Mw=8.5, h=20, lat0=-12.0, lon0=-77.5, hhmm="1230")
+
+    async def round_trip():
+        await queue.tsdhn_queue.save_last_input("a", data)
+        return (
+            await queue.tsdhn_queue.load_last_input("a"),
+            await queue.tsdhn_queue.load_last_input("b"),
+        )
+
+    assert asyncio.run(round_trip()) == (data, None)
+
+
+class FakeJob:
+    def __init__(self, status="failed"):
+        self.status = status
+        self.meta = {"resumable": False}
+        self.requeued = False
+
+    def get_status(self):
+        return self.status
+
+    def save_meta(self):
+        pass
+
+    def requeue(self):
+        self.requeued = True
+
+
+@pytest.fixture
+def failed_job(tmp_path, monkeypatch):
+    # A worker killed mid-run never records the checkpoint in the metadata
+    job = FakeJob()
+    monkeypatch.setattr(queue, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(queue.Job, "fetch", lambda job_id, connection: job)
+    return job
+
+
+def test_resume_from_checkpoint_on_disk(failed_job, tmp_path):
+    job_id = "0a6f1d6e-1c40-4b5e-9f1e-0d0b1c3e7a11"
+    coarse_dir = tmp_path / "jobs" / job_id / queue.COARSE_STAGE_DIR
+    coarse_dir.mkdir(parents=True)
+    (coarse_dir / queue.CHECKPOINT_FILE).write_bytes(b"\0")
+
+    queue.tsdhn_queue.resume_job(job_id)
+
+    assert failed_job.requeued
+    assert failed_job.meta["status"] == queue.JobStatus.QUEUED.value
+
+
+def test_resume_refused_without_checkpoint(failed_job, tmp_path):
+    job_id = "0a6f1d6e-1c40-4b5e-9f1e-0d0b1c3e7a11"
+    (tmp_path / "jobs" / job_id).mkdir(parents=True)
+    with pytest.raises(ValueError, match="no checkpoint"):
+        queue.tsdhn_queue.resume_job(job_id)
+    assert not failed_job.requeued
+
+
+def test_prune_resume_workspaces(tmp_path):
+    for name in ("expired", "recent", "current", "completed"):
+        (tmp_path / name).mkdir()
+    for name in ("expired", "recent", "current"):
+        (tmp_path / name / queue.CHECKPOINT_FILE).write_bytes(b"\0")
+    old = time.time() - 2 * queue.RESUME_TTL
+    os.utime(tmp_path / "expired" / queue.CHECKPOINT_FILE, (old, old))
+    os.utime(tmp_path / "current" / queue.CHECKPOINT_FILE, (old, old))
+
+    queue.prune_resume_workspaces(tmp_path, keep="current")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "completed",
+        "current",
+        "recent",
+    ]
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+from orchestrator.modules import render_assets
+from orchestrator.modules.render_assets import CoastSpec, add_coast_layer
+
+SPEC = CoastSpec(region=(128.0, 294.0, -76.0, 61.0), resolution="i", area_thresh=1000)
+
+
+class FakeFigure:
+    def __init__(self):
+        self.calls = []
+
+    def grdimage(self, **kwargs):
+        self.calls.append(("grdimage", kwargs))
+
+    def plot(self, **kwargs):
+        self.calls.append(("plot", kwargs))
+
+
+@pytest.fixture
+def gshhg(tmp_path, monkeypatch):
+    """Count the GSHHG extractions, written to a fresh cache directory"""
+    extractions = []
+
+    def extract_coast(path, args):
+        extractions.append(args)
+        Path(path).write_text(f"> {args}\n128 -10\n129 -11\n")
+
+    def build_land_mask(path, spec):
+        extractions.append("landmask")
+        Path(path).write_bytes(b"CDF")
+
+    monkeypatch.setattr(render_assets, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(render_assets, "_extract_coast", extract_coast)
+    monkeypatch.setattr(render_assets, "_build_land_mask", build_land_mask)
+    monkeypatch.setattr(render_assets, "get_cpt", lambda spec: tmp_path / "land.cpt")
+    render_assets.get_coast_layer.cache_clear()
+    yield extractions
+    render_assets.get_coast_layer.cache_clear()
+
+
+def test_coast_layer_is_reused_across_renders(gshhg):
+    figures = [FakeFigure() for _ in range(3)]
+    for fig in figures:
+        add_coast_layer(fig, SPEC, "0.5p,black", "0.5p,black", land="gray")
+
+    assert len(gshhg) == 3
+    assert "-R128.0/294.0/-76.0/61.0 -Di -A1000 -W" in gshhg
+    assert "-R128.0/294.0/-76.0/61.0 -Di -A1000 -N1" in gshhg
+    # Every render draws the same cached files
+    assert figures[0].calls == figures[1].calls == figures[2].calls
+    assert [name for name, _ in figures[0].calls] == ["grdimage", "plot", "plot"]
+    assert figures[0].calls[0][1]["nan_transparent"]
+
+
+def test_coast_layer_is_reused_by_other_processes(gshhg):
+    add_coast_layer(FakeFigure(), SPEC, "0.5p", "0.5p", land="gray")
+    # A new work horse starts with an empty memory cache but finds the files
+    render_assets.get_coast_layer.cache_clear()
+    fig = FakeFigure()
+    add_coast_layer(fig, SPEC, "0.5p", "0.5p")
+
+    assert len(gshhg) == 3
+    assert [name for name, _ in fig.calls] == ["plot", "plot"]
+    assert Path(fig.calls[0][1]["data"]).read_text().startswith("> -R128.0")
+
+
+def test_coast_layer_per_region(gshhg):
+    add_coast_layer(FakeFigure(), SPEC, "0.5p", "0.5p")
+    other = CoastSpec(region=(120.0, 300.0, -65.0, 61.0), resolution="l")
+    add_coast_layer(FakeFigure(), other, "0.5p", "0.5p")
+
+    assert len(gshhg) == 6
+    assert "-R120.0/300.0/-65.0/61.0 -Dl -W" in gshhg
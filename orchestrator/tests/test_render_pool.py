@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import pytest
+
+from orchestrator.utils.render_pool import run_parallel
+
+
+def test_run_parallel_runs_every_task(tmp_path):
+    targets = [tmp_path / name for name in ("maxola", "mareograma", "ttt")]
+    run_parallel([(target.name, Path.mkdir, target) for target in targets])
+    assert all(target.is_dir() for target in targets)
+
+
+def test_run_parallel_raises_after_all_tasks(tmp_path):
+    existing = tmp_path / "existing"
+    existing.mkdir()
+    created = tmp_path / "created"
+    with pytest.raises(FileExistsError):
+        run_parallel([("fails", Path.mkdir, existing), ("ok", Path.mkdir, created)])
+    assert created.is_dir()
@@ -0,0 +1,124 @@
+import pytest
+from rq.job import JobStatus
+
+from orchestrator.utils import render_service
+from orchestrator.utils.render_service import (
+    RenderRequest,
+    render_queue,
+    run_requests,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeJob:
+    def __init__(self, job_id, statuses):
+        self.id = job_id
+        self.statuses = statuses
+        self.polls = 0
+
+    def get_status(self, refresh=True):
+        """One status per poll, the last one stays"""
+        status = self.statuses[min(self.polls, len(self.statuses) - 1)]
+        self.polls += 1
+        return status
+
+    def latest_result(self):
+        return None
+
+
+class FakeQueue:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.enqueued = []
+
+    def enqueue(self, func, kwargs, job_timeout):
+        self.enqueued.append((func, kwargs, job_timeout))
+        job_id = f"job{len(self.enqueued)}"
+        return FakeJob(job_id, self.statuses[len(self.enqueued) - 1])
+
+
+def figure(**kwargs):
+    pass
+
+
+def requests(n):
+    return [(f"fig{i}", RenderRequest(figure, {"i": i})) for i in range(n)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(render_service, "time", clock)
+    monkeypatch.setattr(render_service, "RENDER_TIMEOUT", 10)
+    monkeypatch.setattr(render_service, "POLL_INTERVAL", 1.0)
+    return clock
+
+
+def test_render_queue_needs_a_worker_per_figure(monkeypatch):
+    workers = {"count": 1}
+    monkeypatch.setattr(
+        render_service, "get_current_job", lambda: type("Job", (), {"connection": 0})
+    )
+    monkeypatch.setattr(
+        render_service, "Queue", lambda name, connection: ("queue", name)
+    )
+    monkeypatch.setattr(render_service.Worker, "count", lambda queue: workers["count"])
+
+    assert render_queue() == ("queue", "render_queue")
+    assert render_queue(3) is None
+    workers["count"] = 3
+    assert render_queue(3) == ("queue", "render_queue")
+
+
+def test_render_queue_outside_a_job():
+    assert render_queue() is None
+
+
+def test_run_requests_waits_for_every_figure(clock):
+    queue = FakeQueue(
+        [
+            [JobStatus.QUEUED, JobStatus.STARTED, JobStatus.FINISHED],
+            [JobStatus.STARTED] * 4 + [JobStatus.FINISHED],
+        ]
+    )
+    run_requests(queue, requests(2))
+
+    assert [kwargs for _, kwargs, _ in queue.enqueued] == [{"i": 0}, {"i": 1}]
+    assert all(timeout == 10 for _, _, timeout in queue.enqueued)
+
+
+def test_run_requests_raises_on_failed_figure(clock):
+    queue = FakeQueue([[JobStatus.FINISHED], [JobStatus.STARTED, JobStatus.FAILED]])
+    with pytest.raises(RuntimeError, match="fig1"):
+        run_requests(queue, requests(2))
+
+
+def test_run_requests_timeout_applies_to_each_figure(clock):
+    # The second figure waits 8 s for a worker and renders for 8 s: 16 s in
+    # total, within the 10 s to start plus 10 s to finish of each figure
+    queue = FakeQueue(
+        [
+            [JobStatus.STARTED] * 7 + [JobStatus.FINISHED],
+            [JobStatus.QUEUED] * 8 + [JobStatus.STARTED] * 8 + [JobStatus.FINISHED],
+        ]
+    )
+    run_requests(queue, requests(2))
+    assert clock.now > 10
+
+    queue = FakeQueue([[JobStatus.FINISHED], [JobStatus.STARTED] * 20])
+    with pytest.raises(TimeoutError, match="fig1 did not finish"):
+        run_requests(queue, requests(2))
+
+    queue = FakeQueue([[JobStatus.QUEUED] * 20])
+    with pytest.raises(TimeoutError, match="fig0 did not start"):
+        run_requests(queue, requests(1))
@@ -0,0 +1,73 @@
+import json
+import math
+import subprocess
+
+from orchestrator.modules import reporte
+from orchestrator.modules.reporte import (
+    build_summary,
+    render_summary_html,
+    write_summary,
+)
+
+COORDS = (-72.5, -18.0, 30.0, 310.0, 18.0, 90.0, 8.8, 0, 0, "1200")
+
+
+def ttt_data(n_stations: int = 17):
+    ttt = [float(60 + i) if i < n_stations else math.nan for i in range(17)]
+    max_vals = [0.5 if i < n_stations else math.nan for i in range(17)]
+    hours = [None if math.isnan(t) else int(t // 60) for t in ttt]
+    minutes = [None if math.isnan(t) else int(round(t % 60)) for t in ttt]
+    return ttt, max_vals, hours, minutes
+
+
+def test_build_summary_skips_stations_without_gauge():
+    summary = build_summary(COORDS, ttt_data(n_stations=3), grid_minutes=5)
+    assert [s["port"] for s in summary["stations"]] == ["La Cruz", "Talara", "Paita"]
+    assert summary["stations"][1]["arrival"] == "1:01"
+    assert summary["preliminary"]
+    assert summary["epicenter"]["magnitude"] == 8.8
+
+
+def test_write_summary(tmp_path):
+    (tmp_path / "bathy").mkdir()
+    (tmp_path / "bathy" / "ya.dat").write_text("-60.0\n-59.9333333\n")
+    (tmp_path / "meca.dat").write_text(
+        "287.50 -18.00 30.00 310.00 18.00 90.00 8.80 0 0 1200\n"
+    )
+    (tmp_path / "ttt_max.dat").write_text(" 125.0  1.25\n" * 17)
+
+    write_summary(tmp_path)
+
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["grid_minutes"] == 4
+    assert not summary["preliminary"]
+    assert len(summary["stations"]) == 17
+    assert summary["max_height"] == 1.25
+    assert "Matarani" in (tmp_path / "summary.html").read_text()
+
+
+def test_summary_html_escapes_text():
+    summary = build_summary(COORDS, ttt_data(), grid_minutes=4)
+    summary["stations"][0]["port"] = "<script>"
+    assert "<script>" not in render_summary_html(summary)
+
+
+def test_compile_report_evicts_rejected_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporte, "LATEX_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(reporte, "precompiled_format", lambda source: "reporte_x")
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "reporte_x.fmt").write_text("stale")
+    (tmp_path / "reporte.tex").write_text("\\documentclass{article}")
+    commands = []
+
+    def run(command, cwd, **kwargs):
+        commands.append(command)
+        if any(arg.startswith("-fmt=") for arg in command):
+            raise subprocess.CalledProcessError(1, command)
+        (cwd / "reporte.log").write_text("Output written on reporte.pdf")
+
+    monkeypatch.setattr(reporte.subprocess, "run", run)
+    reporte.compile_report(tmp_path)
+
+    assert len(commands) == 2 and "-fmt=reporte_x" not in commands[1]
+    assert not (tmp_path / "cache" / "reporte_x.fmt").exists()
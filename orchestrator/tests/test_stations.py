@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+
+from orchestrator.utils.stations import gauge_layout, load_gauges, load_stations
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+
+def test_green_factors():
+    gauges = {g.name: g for g in load_gauges(DATA_DIR)}
+    assert len(gauges) == 17
+    assert gauges["tala"].green_factor == pytest.approx((183.1 / 20.0) ** 0.25)
+    assert gauges["cama"].green_factor == pytest.approx((46.1 / 350.0) ** 0.25)
+
+
+@pytest.mark.parametrize(
+    "n_columns,expected",
+    [(17, None), (3, ["tala", "cala", "mata"])],
+)
+def test_gauge_layout(n_columns, expected):
+    gauges = load_gauges(DATA_DIR)
+    layout = gauge_layout(gauges, n_columns)
+    names = [gauges[i].name for i in layout]
+    assert names == (expected or [g.name for g in gauges])
+
+
+def test_gauge_layout_unknown():
+    with pytest.raises(ValueError):
+        gauge_layout(load_gauges(DATA_DIR), 5)
+
+
+def test_active_stations_have_gauges():
+    names = {g.name for g in load_gauges(DATA_DIR)}
+    stations = [s for s in load_stations(DATA_DIR) if s.active]
+    assert stations
+    assert all(s.gauge in names for s in stations)
@@ -1,6 +1,11 @@
+import hashlib
+import shutil
+from pathlib import Path
+
 import numpy as np
 import pytest
 
+from orchestrator.utils.file_utils import read_manifest, write_manifest
 from orchestrator.utils.geo import (
     calculate_distance_to_coast,
     determine_epicenter_location,
@@ -51,3 +56,26 @@ def test_determine_tsunami_warning(Mw, h, h0, dist_min, expected):
 def test_determine_epicenter_location(h0, dist_min, expected):
     location = determine_epicenter_location(h0, dist_min)
     assert location == expected
+
+
+def test_result_manifest(tmp_path):
+    assert read_manifest(tmp_path, "etags.json") == {}
+    (tmp_path / "reporte.pdf").write_bytes(b"%PDF-1.5")
+    write_manifest(tmp_path, "etags.json", ["reporte.pdf", "ttt.eps"])
+    digest = hashlib.sha256(b"%PDF-1.5").hexdigest()
+    assert read_manifest(tmp_path, "etags.json") == {"reporte.pdf": f'"{digest}"'}
+
+
+@pytest.mark.skipif(shutil.which("gfortran") is None, reason="needs gfortran")
+def test_compile_once_builds_the_batch_programs(tmp_path):
+    from orchestrator.core.config import BATCH_SOLVER_STEP, BATCH_SOURCE_STEPS
+    from orchestrator.utils.processing import compile_once
+
+    model_dir = Path(__file__).resolve().parents[2] / "model"
+    for name in ("def_oka.f", "tsunami_batch.for", "tsunami_comun.for"):
+        shutil.copy(model_dir / name, tmp_path)
+
+    steps = compile_once([*BATCH_SOURCE_STEPS, BATCH_SOLVER_STEP], tmp_path)
+
+    assert all(step.compiler_config is None for step in steps)
+    assert (tmp_path / "deform").exists() and (tmp_path / "tsunami_batch").exists()
@@ -0,0 +1,171 @@
+import logging
+import math
+import uuid
+from dataclasses import dataclass
+from typing import Dict
+
+import anyio
+from fastapi import HTTPException, Request
+from redis.exceptions import RedisError
+from rq.job import Job
+
+from orchestrator.core.config import (
+    ADMISSION_MAX_MINUTES,
+    CLIENT_JOBS_KEY,
+    CLIENT_MAX_ACTIVE_JOBS,
+    CLIENT_RESERVATION_KEY,
+)
+from orchestrator.core.queue import missing_grid_files, tsdhn_queue
+from orchestrator.models.schemas import Resolution
+
+logger = logging.getLogger(__name__)
+
+# Client job sets outlive the result TTL of the jobs they list
+CLIENT_JOBS_TTL = 2 * 86400
+# Seconds a reserved job id counts in the quota before its job is enqueued
+RESERVATION_TTL = 60
+
+# Drops the ended jobs of a client and, if it is below its quota, adds the new
+# job id, in one step so concurrent requests of a client cannot exceed it.
+# Only queued and started jobs are active, the raw rq statuses are used so
+# stopped, canceled, deferred or scheduled jobs do not hold a slot. An id
+# without a job hash is active while its reservation lives.
+# KEYS: client set, reservation of the new id
+# ARGV: job key prefix, reservation key prefix, quota, new id, TTLs
+RESERVE_SCRIPT = """
+local active = 0
+for _, job_id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local status = redis.call('HGET', ARGV[1] .. job_id, 'status')
+    if status == 'queued' or status == 'started'
+        or (not status and redis.call('EXISTS', ARGV[2] .. job_id) == 1) then
+        active = active + 1
+    else
+        redis.call('SREM', KEYS[1], job_id)
+    end
+end
+if active >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('SADD', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('SET', KEYS[2], 1, 'EX', ARGV[6])
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class Admission:
+    kind: str  # resolution to run, or "batch"
+    job_id: str  # id reserved in the quota of the client
+    wait_minutes: float
+    result_minutes: float
+    downgraded: bool = False
+
+
+def client_id(request: Request) -> str:
+    """Client of a request for quotas: X-Client-ID header, else its address."""
+    header = request.headers.get("x-client-id")
+    if header:
+        return header
+    return request.client.host if request.client else "unknown"
+
+
+def estimate_wait(load: Dict) -> float:
+    """
+    Minutes before a new job starts: the queued jobs plus half of the running
+    ones (on average half done), shared among the workers.
+    """
+    ahead = load["queued"] + 0.5 * load["running"]
+    return ahead * load["queued_minutes"] / max(load["workers"], 1)
+
+
+def _retry_after(minutes: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(math.ceil(minutes * 60.0), 1))}
+
+
+async def _reserve_slot(client: str, job_id: str) -> bool:
+    """Reserve job_id in the quota of the client, False if it is full."""
+    reserved = await tsdhn_queue.async_redis.eval(
+        RESERVE_SCRIPT,
+        2,
+        CLIENT_JOBS_KEY.format(client),
+        CLIENT_RESERVATION_KEY.format(job_id),
+        Job.redis_job_namespace_prefix,
+        CLIENT_RESERVATION_KEY.format(""),
+        CLIENT_MAX_ACTIVE_JOBS,
+        job_id,
+        CLIENT_JOBS_TTL,
+        RESERVATION_TTL,
+    )
+    return bool(reserved)
+
+
+async def admit(client: str, kind: str, allow_downgrade: bool = False) -> Admission:
+    """
+    Decide whether a job of the given kind is accepted under the current load
+    and reserve its id in the quota of the client. The job must be enqueued
+    with Admission.job_id, or the slot given back with release_slot.
+
+    Args:
+        client: Client identifier, see client_id.
+        kind: Resolution of the job, or "batch".
+        allow_downgrade: Run on the coarse grid when the requested resolution
+            would exceed ADMISSION_MAX_MINUTES and the coarse one would not,
+            if the coarse grid is provisioned on this server.
+
+    Raises:
+        HTTPException: 429 with Retry-After when the client has
+            CLIENT_MAX_ACTIVE_JOBS active jobs or the estimated time to result
+            exceeds ADMISSION_MAX_MINUTES.
+    """
+    load = await anyio.to_thread.run_sync(tsdhn_queue.queue_load)
+    wait = estimate_wait(load)
+    minutes = load["minutes"]
+
+    coarse = Resolution.COARSE.value
+    if wait + minutes[kind] <= ADMISSION_MAX_MINUTES:
+        run = kind
+    # The 5 arc-minute bathymetry is not part of the repository
+    elif (
+        allow_downgrade
+        and kind != coarse
+        and not missing_grid_files(coarse)
+        and wait + minutes[coarse] <= ADMISSION_MAX_MINUTES
+    ):
+        logger.info(f"Queue wait of {wait:.0f} min, running {kind} job as {coarse}")
+        run = coarse
+    else:
+        logger.warning(f"Queue wait of {wait:.0f} min, refusing {kind} job")
+        raise HTTPException(
+            status_code=429,
+            detail=(
+                f"Estimated time to result {wait + minutes[kind]:.0f} min exceeds "
+                f"{ADMISSION_MAX_MINUTES:.0f} min"
+            ),
+            headers=_retry_after(wait + minutes[kind] - ADMISSION_MAX_MINUTES),
+        )
+
+    job_id = str(uuid.uuid4())
+    if not await _reserve_slot(client, job_id):
+        logger.warning(f"Client {client} reached its quota of active jobs")
+        raise HTTPException(
+            status_code=429,
+            detail=f"At most {CLIENT_MAX_ACTIVE_JOBS} active jobs per client",
+            headers=_retry_after(minutes[kind]),
+        )
+    return Admission(run, job_id, wait, wait + minutes[run], downgraded=run != kind)
+
+
+async def release_slot(client: str, job_id: str) -> None:
+    """
+    Give back the slot reserved by admit when the job was not enqueued. Best
+    effort, a slot that cannot be released is freed when the reservation
+    expires.
+    """
+    try:
+        async with tsdhn_queue.async_redis.pipeline(transaction=False) as pipeline:
+            pipeline.srem(CLIENT_JOBS_KEY.format(client), job_id)
+            pipeline.delete(CLIENT_RESERVATION_KEY.format(job_id))
+            await pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Could not release the slot of job {job_id}: {e}")
@@ -1,6 +1,11 @@
+import hashlib
+import json
+import os
 import shutil
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+from orchestrator.models.schemas import Subfault
 
 
 def make_executable(file_path: Path) -> None:
@@ -20,3 +25,74 @@ def setup_workspace(src: Path, dst: Path) -> None:
     if dst.exists():
         shutil.rmtree(dst)
     shutil.copytree(src, dst)
+
+
+def stage_files(work_dir: Path, files: Dict[str, str]) -> None:
+    """Copy each source file over its destination name inside the workspace."""
+    validate_files(work_dir, [(src, "Grid input missing") for src in files])
+    for src, dst in files.items():
+        shutil.copy(work_dir / src, work_dir / dst)
+
+
+def publish_artifacts(src: Path, dst: Path, names: List[str]) -> None:
+    validate_files(src, [(name, "Artifact missing") for name in names])
+    for name in names:
+        shutil.copy(src / name, dst / name)
+
+
+def write_manifest(job_dir: Path, manifest: str, names: List[str]) -> None:
+    """
+    Write the SHA-256 of each existing file in names to the manifest, as the
+    quoted strong ETags served for the final outputs of the job.
+    """
+    etags = {}
+    for name in names:
+        path = job_dir / name
+        if path.exists():
+            with path.open("rb") as f:
+                etags[name] = f'"{hashlib.file_digest(f, "sha256").hexdigest()}"'
+    tmp = job_dir / f"{manifest}.{os.getpid()}"
+    tmp.write_text(json.dumps(etags, indent=2))
+    tmp.replace(job_dir / manifest)
+
+
+def read_manifest(job_dir: Path, manifest: str) -> Dict[str, str]:
+    """ETags of the final outputs of a job, empty while it is not complete."""
+    try:
+        return json.loads((job_dir / manifest).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def write_finite_fault(dst: Path, subfaults: List[Subfault]) -> None:
+    """
+    Write finite_fault.dat, the subfaults summed by the numpy deform step, one
+    per line after its id. Ids count from 1, as the cells of a USGS .param.
+    """
+    lines = [
+        f"{n} {f.lon:.4f} {f.lat:.4f} {f.depth:.3f} {f.length:.3f} {f.width:.3f} "
+        f"{f.strike:.2f} {f.dip:.2f} {f.rake:.2f} {f.slip:.4f}"
+        for n, f in enumerate(subfaults, start=1)
+    ]
+    (dst / "finite_fault.dat").write_text("\n".join(lines) + "\n")
+
+
+def write_scenario_list(dst: Path, scenario_dirs: List[Path]) -> None:
+    """Write scenarios.dat, the scenario directories read by tsunami_batch.for."""
+    lines = [str(len(scenario_dirs))]
+    lines += [str(scenario_dir.relative_to(dst)) for scenario_dir in scenario_dirs]
+    (dst / "scenarios.dat").write_text("\n".join(lines) + "\n")
+
+
+def write_run_config(
+    dst: Path,
+    cfl_safety: float,
+    simulation_hours: float,
+    sample_interval: float,
+    checkpoint_interval: float,
+) -> None:
+    """Write run.dat, read by tsunami1.for to derive DT, KE, KD and KC."""
+    (dst / "run.dat").write_text(
+        f"{cfl_safety:.3f} {simulation_hours:.3f} {sample_interval:.1f} "
+        f"{checkpoint_interval:.1f}\n"
+    )
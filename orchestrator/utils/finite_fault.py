@@ -0,0 +1,62 @@
+import re
+from typing import Dict, List
+
+# "#Fault_segment =   1 nx(Along-strike)=  25 Dx=  20.00km ny(downdip)=  10 Dy=..."
+SEGMENT_PATTERN = re.compile(r"Dx=\s*([\d.]+)\s*km.*Dy=\s*([\d.]+)\s*km", re.IGNORECASE)
+
+
+def parse_usgs_param(text: str) -> List[Dict[str, float]]:
+    """
+    Parse a finite-fault model in the USGS .param format.
+
+    Each segment header gives the subfault size (Dx along strike, Dy down dip)
+    and is followed by rows "Lat Lon depth slip rake strike dip t_rup t_ris
+    t_fal mo", with the depth of the subfault center in km and the slip in cm.
+    The boundary corners of each segment (three columns) are ignored.
+
+    Args:
+        text: Content of the .param file.
+
+    Returns:
+        Subfaults as dictionaries with the fields of the Subfault schema.
+    """
+    subfaults = []
+    length = width = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            match = SEGMENT_PATTERN.search(line)
+            if match:
+                length, width = float(match.group(1)), float(match.group(2))
+            continue
+
+        values = line.split()
+        if len(values) < 7:
+            continue
+        if length is None:
+            raise ValueError("Subfault found before any Fault_segment header")
+        try:
+            lat, lon, depth, slip, rake, strike, dip = (float(v) for v in values[:7])
+        except ValueError as e:
+            raise ValueError(
+                f"Invalid row of subfault {len(subfaults) + 1}: {line}"
+            ) from e
+        subfaults.append(
+            {
+                "lon": lon,
+                "lat": lat,
+                "depth": depth,
+                "length": length,
+                "width": width,
+                "strike": strike,
+                "dip": dip,
+                "rake": rake,
+                "slip": slip / 100.0,
+            }
+        )
+
+    if not subfaults:
+        raise ValueError("No subfaults found in the finite-fault model")
+    return subfaults
@@ -11,18 +11,23 @@ from orchestrator.core.queue import tsdhn_queue
 logger = logging.getLogger(__name__)
 
 
-def validate_job_id(job_id: str) -> None:
-    """
-    Validate that the job ID is a valid UUID and that a job with that ID exists.
-    """
+def validate_job_id_format(job_id: str) -> None:
+    """Validate that the job ID is a valid UUID."""
     try:
         uuid.UUID(job_id, version=4)
     except ValueError as e:
         logger.warning(f"Invalid job ID format: {job_id}")
         raise HTTPException(status_code=400, detail="Invalid job identifier") from e
 
+
+async def validate_job_id(job_id: str) -> None:
+    """
+    Validate that the job ID is a valid UUID and that a job with that ID exists.
+    """
+    validate_job_id_format(job_id)
+
     try:
-        tsdhn_queue.get_job_status(job_id)
+        await tsdhn_queue.fetch_job_status(job_id)
     except ValueError as e:
         logger.warning(f"Job not found: {job_id}")
         raise HTTPException(status_code=404, detail="Job not found") from e
@@ -1,9 +1,13 @@
 import subprocess
+from dataclasses import replace
 from pathlib import Path
+from typing import List, Tuple
 
 from orchestrator.core.config import ProcessingStep
 from orchestrator.utils.compiler import compile_fortran
 from orchestrator.utils.file_utils import make_executable, validate_files
+from orchestrator.utils.render_pool import run_parallel
+from orchestrator.utils.render_service import render_queue, run_requests
 
 
 def process_step(step: ProcessingStep, working_dir: Path) -> None:
@@ -14,6 +18,48 @@ def process_step(step: ProcessingStep, working_dir: Path) -> None:
     validate_files(working_dir, step.file_checks)
 
 
+def process_parallel_steps(steps: List[Tuple[ProcessingStep, Path]]) -> None:
+    """
+    Run python steps with no dependencies between them on the render service
+    when it has a worker for each of them, otherwise in the render pool.
+    """
+    queue = render_queue(len(steps))
+    if queue is not None and all(step.render_request for step, _ in steps):
+        run_requests(
+            queue,
+            [
+                (step.name, step.render_request(working_dir))
+                for step, working_dir in steps
+            ],
+        )
+    else:
+        run_parallel(
+            [
+                (step.name, step.python_callable, working_dir)
+                for step, working_dir in steps
+            ]
+        )
+    for step, working_dir in steps:
+        validate_files(working_dir, step.file_checks)
+
+
+def compile_once(
+    steps: List[ProcessingStep], working_dir: Path
+) -> List[ProcessingStep]:
+    """
+    Compile the Fortran sources of steps that run many times in the same
+    working directory, and return the steps without their compiler config.
+    """
+    compiled = []
+    for step in steps:
+        if step.compiler_config:
+            compile_fortran(working_dir, step.compiler_config)
+            make_executable(working_dir / step.compiler_config.output)
+            step = replace(step, compiler_config=None)
+        compiled.append(step)
+    return compiled
+
+
 def handle_command_step(step: ProcessingStep, working_dir: Path) -> None:
     if step.compiler_config:
         compile_fortran(working_dir, step.compiler_config)
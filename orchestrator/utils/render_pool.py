@@ -0,0 +1,45 @@
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Kept free of pygmt imports: spawned workers load this module before the
+# figure modules, so the session name is set before GMT begins a session
+
+
+def isolate_gmt_session() -> None:
+    """Give the worker its own GMT modern mode session directory."""
+    os.environ["GMT_SESSION_NAME"] = f"render_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+def run_parallel(tasks: List[Tuple[str, Callable[[Path], None], Path]]) -> None:
+    """
+    Run independent figure tasks in a process pool and wait for all of them.
+
+    Workers are spawned, not forked, so none inherits the GMT session of the
+    calling process. Every task runs to completion before the first failure,
+    in task order, is raised.
+
+    Args:
+        tasks: (name, callable, working directory) of each figure.
+    """
+    with ProcessPoolExecutor(
+        max_workers=len(tasks),
+        mp_context=get_context("spawn"),
+        initializer=isolate_gmt_session,
+    ) as executor:
+        futures = [
+            (name, executor.submit(render, working_dir))
+            for name, render, working_dir in tasks
+        ]
+
+    for name, future in futures:
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Render task {name} failed: {error}")
+            raise error
@@ -0,0 +1,98 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rq import Queue, Worker, get_current_job
+from rq.job import JobStatus
+
+logger = logging.getLogger(__name__)
+
+RENDER_QUEUE_NAME: str = "render_queue"
+RENDER_TIMEOUT: int = 600  # s, per figure
+POLL_INTERVAL: float = 0.1  # s
+
+FINAL_STATUSES = (
+    JobStatus.FINISHED,
+    JobStatus.FAILED,
+    JobStatus.STOPPED,
+    JobStatus.CANCELED,
+)
+
+
+@dataclass(frozen=True)
+class RenderRequest:
+    """
+    A figure as a function and its keyword arguments (arrays and options). The
+    function is sent by name, so it must be importable at module level.
+    """
+
+    render: Callable[..., None]
+    spec: Dict[str, Any]
+
+    def __call__(self) -> None:
+        self.render(**self.spec)
+
+
+def render_queue(n_figures: int = 1) -> Optional[Queue]:
+    """
+    Queue of the render service, if the current job runs next to one with a
+    worker for each of the n_figures to render at the same time. With fewer
+    workers the figures would render one after another, so the render pool of
+    the job is faster.
+    """
+    job = get_current_job()
+    if job is None:
+        return None
+    queue = Queue(RENDER_QUEUE_NAME, connection=job.connection)
+    if Worker.count(queue=queue) < n_figures:
+        return None
+    return queue
+
+
+def run_requests(queue: Queue, requests: List[Tuple[str, RenderRequest]]) -> None:
+    """
+    Send the figures to the render service and wait for all of them. Each
+    figure has RENDER_TIMEOUT seconds to start and RENDER_TIMEOUT seconds to
+    finish once started.
+
+    Args:
+        queue: Queue of the render service.
+        requests: (name, request) of each figure.
+    """
+    jobs = [
+        (
+            name,
+            queue.enqueue(
+                request.render, kwargs=request.spec, job_timeout=RENDER_TIMEOUT
+            ),
+        )
+        for name, request in requests
+    ]
+
+    enqueued = time.monotonic()
+    started: Dict[str, float] = {}
+    pending = jobs
+    while pending:
+        now = time.monotonic()
+        waiting = []
+        for name, job in pending:
+            status = job.get_status(refresh=True)
+            if status in FINAL_STATUSES:
+                continue
+            if status == JobStatus.STARTED:
+                started.setdefault(job.id, now)
+            if now > started.get(job.id, enqueued) + RENDER_TIMEOUT:
+                state = "finish" if job.id in started else "start"
+                raise TimeoutError(f"Render task {name} did not {state} in time")
+            waiting.append((name, job))
+        pending = waiting
+        if pending:
+            time.sleep(POLL_INTERVAL)
+
+    for name, job in jobs:
+        if job.get_status() != JobStatus.FINISHED:
+            result = job.latest_result()
+            error = result.exc_string if result else job.get_status()
+            logger.error(f"Render task {name} failed: {error}")
+            raise RuntimeError(f"Render task {name} failed on the render service")
@@ -0,0 +1,90 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path("data")
+
+
+@dataclass(frozen=True)
+class TidalStation:
+    lon: float
+    lat: float
+    code: str
+    name: str
+    active: bool = True
+    annotation_offset: str = "0.1c"
+    gauge: Optional[str] = None  # column of green.dat sampled at the station
+
+
+def load_stations(config_dir: Path = CONFIG_DIR) -> List[TidalStation]:
+    stations_path = config_dir / "stations.yml"
+    logger.info(f"Loading stations configuration: {stations_path}")
+
+    if not stations_path.exists():
+        logger.error(f"Stations configuration file not found: {stations_path}")
+        raise FileNotFoundError(f"Stations file not found: {stations_path}")
+
+    try:
+        with open(stations_path, "r") as f:
+            data = yaml.safe_load(f)
+
+        if not data or "stations" not in data:
+            raise ValueError("Invalid stations configuration: 'stations' key missing")
+
+        return [TidalStation(**station) for station in data["stations"]]
+
+    except (yaml.YAMLError, TypeError, KeyError) as e:
+        logger.error(f"Failed to parse stations configuration: {str(e)}")
+        raise ValueError(f"Invalid stations configuration: {str(e)}") from e
+
+
+@dataclass(frozen=True)
+class Gauge:
+    name: str
+    depth: float  # m, water depth at the model gauge
+    coast_depth: float  # m, reference depth at the tide gauge
+    columns: Dict[str, int]  # column of green.dat by gauge file
+
+    @property
+    def green_factor(self) -> float:
+        """Green's law amplification from the model gauge to the coast."""
+        return (self.depth / self.coast_depth) ** 0.25
+
+
+def load_gauges(config_dir: Path = CONFIG_DIR) -> List[Gauge]:
+    gauges_path = config_dir / "gauges.yml"
+    if not gauges_path.exists():
+        raise FileNotFoundError(f"Gauges file not found: {gauges_path}")
+
+    try:
+        with open(gauges_path, "r") as f:
+            data = yaml.safe_load(f)
+
+        if not data or "gauges" not in data:
+            raise ValueError("Invalid gauges configuration: 'gauges' key missing")
+
+        return [Gauge(**gauge) for gauge in data["gauges"]]
+
+    except (yaml.YAMLError, TypeError, KeyError) as e:
+        logger.error(f"Failed to parse gauges configuration: {str(e)}")
+        raise ValueError(f"Invalid gauges configuration: {str(e)}") from e
+
+
+def gauge_layout(gauges: List[Gauge], n_columns: int) -> np.ndarray:
+    """
+    Index in gauges of each column of green.dat, for the gauge file with
+    n_columns gauges.
+    """
+    for tidal_file in dict.fromkeys(f for g in gauges for f in g.columns):
+        sampled = [i for i, g in enumerate(gauges) if tidal_file in g.columns]
+        if len(sampled) == n_columns:
+            return np.array(
+                sorted(sampled, key=lambda i: gauges[i].columns[tidal_file])
+            )
+    raise ValueError(f"Unexpected number of gauges: {n_columns}")
@@ -104,7 +104,7 @@ if [[ ! -d "$HOME/texlive" ]]; then
         --texdir="$HOME/texlive" \
         --texuserdir="$HOME/.texlive" \
         --no-interaction <<< $'selected_scheme scheme-basic\ntlpdbopt_autobackup 0\ntlpdbopt_install_docfiles 0\ntlpdbopt_install_srcfiles 0'
-    tlmgr install babel-spanish hyphen-spanish booktabs --verify-repo=none --quiet
+    tlmgr install babel-spanish hyphen-spanish booktabs mylatexformat --verify-repo=none --quiet
     popd > /dev/null
     rm -rf "$TMP_TL"
 fi